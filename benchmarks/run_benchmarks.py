@@ -0,0 +1,165 @@
+import argparse
+import collections
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import kairos_face
+from benchmarks.stub_server import StubKairosProcess
+
+_GALLERY = 'benchmark-gallery'
+
+BenchmarkResult = collections.namedtuple('BenchmarkResult', ['endpoint', 'mode', 'image_size', 'concurrency',
+                                                             'requests', 'errors', 'throughput',
+                                                             'p50', 'p90', 'p99', 'peak_memory'])
+
+
+def stub_client(stub, pool_size=10):
+    return kairos_face.KairosClient(pool_connections=pool_size, pool_maxsize=pool_size, base_url=stub.base_url)
+
+
+def _endpoint_calls(image_path):
+    # Each call gets the client and the index of the request; setups run before timing starts
+    return [
+        ('enroll', True, None,
+         lambda client, i: kairos_face.enroll_face('subject{}'.format(i), _GALLERY, file=image_path, client=client)),
+        ('recognize', True, None,
+         lambda client, i: kairos_face.recognize_face(_GALLERY, file=image_path, client=client)),
+        ('detect', True, None,
+         lambda client, i: kairos_face.detect_face(file=image_path, client=client)),
+        ('verify', True, None,
+         lambda client, i: kairos_face.verify_face('subject0', _GALLERY, file=image_path, client=client)),
+        ('gallery/view', False, None,
+         lambda client, i: kairos_face.get_gallery(_GALLERY, client=client)),
+        ('gallery/list_all', False, None,
+         lambda client, i: kairos_face.get_galleries_names_list(client=client)),
+        ('gallery/remove_subject', False,
+         lambda client, i: kairos_face.enroll_face('removed{}'.format(i), _GALLERY, url='http://image', client=client),
+         lambda client, i: kairos_face.remove_face('removed{}'.format(i), _GALLERY, client=client)),
+        ('gallery/remove', False,
+         lambda client, i: kairos_face.enroll_face('subject', 'removed{}'.format(i), url='http://image', client=client),
+         lambda client, i: kairos_face.remove_gallery('removed{}'.format(i), client=client)),
+    ]
+
+
+def run_scenario(stub, endpoint, mode, image_size, concurrency, requests_count, setup, call):
+    # Memory is measured in a pass of its own, since tracing every allocation slows the client down and would
+    # skew the throughput and latencies. It sends other requests than the timed pass, so removals still find
+    # what they remove.
+    latencies, errors, elapsed = _run_pass(stub, mode, concurrency, range(requests_count), setup, call)
+    try:
+        _run_pass(stub, mode, concurrency, range(requests_count, 2 * requests_count), setup, call,
+                  before_calls=tracemalloc.start)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return BenchmarkResult(endpoint, mode, image_size, concurrency, requests_count, len(errors),
+                           requests_count / elapsed, _percentile(latencies, 50), _percentile(latencies, 90),
+                           _percentile(latencies, 99), peak_memory)
+
+
+def _run_pass(stub, mode, concurrency, indices, setup, call, before_calls=None):
+    shared_client = stub_client(stub, pool_size=concurrency)
+    if setup is not None:
+        for i in indices:
+            setup(shared_client, i)
+    if before_calls is not None:
+        before_calls()
+
+    latencies = []
+    errors = []
+
+    def timed_call(i):
+        # The serial mode opens a new session per request, as every call did before clients were pooled
+        client = stub_client(stub) if mode == 'serial' else shared_client
+        started_at = time.perf_counter()
+        try:
+            call(client, i)
+        except (kairos_face.ServiceRequestError, kairos_face.CircuitOpenError) as e:
+            errors.append(e)
+        finally:
+            latencies.append(time.perf_counter() - started_at)
+            if client is not shared_client:
+                client.close()
+
+    started_at = time.perf_counter()
+    if concurrency == 1:
+        for i in indices:
+            timed_call(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(timed_call, indices))
+    elapsed = time.perf_counter() - started_at
+    shared_client.close()
+
+    return latencies, errors, elapsed
+
+
+def run_benchmarks(image_sizes=(10 * 1000, 1000 * 1000), concurrency_levels=(4, 16), requests_count=100,
+                   latency=0.01, error_rate=0.0, endpoints=None):
+    kairos_face.settings.app_id = kairos_face.settings.app_id or 'benchmark'
+    kairos_face.settings.app_key = kairos_face.settings.app_key or 'benchmark'
+    modes = [('serial', 1), ('pooled', 1)] + [('concurrent', level) for level in concurrency_levels]
+    image_dir = tempfile.mkdtemp()
+    results = []
+    try:
+        with StubKairosProcess(latency=latency, error_rate=error_rate) as stub:
+            with stub_client(stub) as client:
+                kairos_face.enroll_face('subject0', _GALLERY, url='http://image', client=client)
+            for image_size in image_sizes:
+                image_path = os.path.join(image_dir, 'image{}.jpg'.format(image_size))
+                with open(image_path, 'wb') as fp:
+                    fp.write(os.urandom(image_size))
+                for endpoint, uploads_image, setup, call in _endpoint_calls(image_path):
+                    if endpoints is not None and endpoint not in endpoints:
+                        continue
+                    # Calls without an image don't depend on the image size, so they're only run once
+                    if not uploads_image and image_size != image_sizes[0]:
+                        continue
+                    for mode, concurrency in modes:
+                        results.append(run_scenario(stub, endpoint, mode, image_size if uploads_image else None,
+                                                    concurrency, requests_count, setup, call))
+    finally:
+        shutil.rmtree(image_dir)
+    return results
+
+
+def format_results(results):
+    header = '{:<24}{:<12}{:>12}{:>6}{:>8}{:>10}{:>9}{:>9}{:>9}{:>12}'.format(
+        'endpoint', 'mode', 'image bytes', 'conc', 'errors', 'req/s', 'p50 ms', 'p90 ms', 'p99 ms', 'peak KiB')
+    lines = [header, '-' * len(header)]
+    for r in results:
+        lines.append('{:<24}{:<12}{:>12}{:>6}{:>8}{:>10.1f}{:>9.1f}{:>9.1f}{:>9.1f}{:>12.0f}'.format(
+            r.endpoint, r.mode, r.image_size or '-', r.concurrency, r.errors, r.throughput,
+            r.p50 * 1000, r.p90 * 1000, r.p99 * 1000, r.peak_memory / 1024.0))
+    return '\n'.join(lines)
+
+
+def _percentile(ordered, percentile):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100.0))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the client against a local stub of the Kairos API')
+    parser.add_argument('--image-sizes', type=int, nargs='+', default=[10 * 1000, 1000 * 1000])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 16])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.01, help='Stub server latency, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with a 503')
+    parser.add_argument('--endpoints', nargs='+', default=None)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.image_sizes, args.concurrency, args.requests,
+                             args.latency, args.error_rate, args.endpoints)
+    print(format_results(results))
+
+
+if __name__ == '__main__':
+    main()
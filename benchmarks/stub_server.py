@@ -0,0 +1,239 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubKairosServer:
+    def __init__(self, latency=0.0, latency_jitter=0.0, error_rate=0.0, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.galleries = {}
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}/'.format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def handle(self, endpoint, payload):
+        with self._lock:
+            self.requests_served += 1
+        delay = self.latency + random.uniform(0, self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < self.error_rate:
+            return 503, {'Errors': [{'ErrCode': 503, 'Message': 'service unavailable'}]}
+
+        handler = _ENDPOINT_HANDLERS.get(endpoint)
+        if handler is None:
+            return 404, {'Errors': [{'ErrCode': 404, 'Message': 'unknown endpoint'}]}
+        with self._lock:
+            return handler(self.galleries, payload or {})
+
+
+class StubKairosProcess:
+    # Runs the stub in a process of its own, so its threads and allocations don't share the interpreter
+    # with the client being measured
+    def __init__(self, latency=0.0, latency_jitter=0.0, error_rate=0.0):
+        self._command = [sys.executable, '-m', 'benchmarks.stub_server', '--latency', str(latency),
+                         '--latency-jitter', str(latency_jitter), '--error-rate', str(error_rate)]
+        self._process = None
+        self.base_url = None
+
+    def start(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._process = subprocess.Popen(self._command, cwd=root, stdout=subprocess.PIPE, universal_newlines=True)
+        # The server prints its URL once it's listening
+        self.base_url = self._process.stdout.readline().strip()
+        if not self.base_url:
+            self.stop()
+            raise RuntimeError('The stub server exited with status {}'.format(self._process.returncode))
+        return self
+
+    def stop(self):
+        self._process.terminate()
+        self._process.wait()
+        self._process.stdout.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _handler_for(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately; with Nagle's algorithm on, keep-alive connections
+        # would wait on delayed ACKs between them
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length)
+            payload = json.loads(body.decode('utf-8')) if body else None
+            if not self.headers.get('app_id') or not self.headers.get('app_key'):
+                status_code, response = 401, {'Errors': [{'ErrCode': 1002, 'Message': 'missing credentials'}]}
+            else:
+                status_code, response = stub.handle(self.path.lstrip('/'), payload)
+            response_body = json.dumps(response).encode('utf-8')
+            self.send_response(status_code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(response_body)))
+            self.end_headers()
+            self.wfile.write(response_body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _face_id(image):
+    # The stub doesn't look at pixels: images with the same contents (or URL) are the same face
+    if image.startswith(('http://', 'https://')):
+        image_bytes = image.encode('utf-8')
+    else:
+        image_bytes = base64.b64decode(image)
+    return hashlib.sha1(image_bytes).hexdigest()
+
+
+def _face(face_id):
+    return {'topLeftX': 120, 'topLeftY': 80, 'width': 160, 'height': 160,
+            'face_id': face_id, 'attributes': {'gender': {'type': 'F'}}}
+
+
+def _gallery_not_found():
+    return 200, {'Errors': [{'ErrCode': 5004, 'Message': 'gallery name not found'}]}
+
+
+def _enroll(galleries, payload):
+    face_id = _face_id(payload['image'])
+    galleries.setdefault(payload['gallery_name'], {}).setdefault(payload['subject_id'], set()).add(face_id)
+    return 200, {'face_id': face_id,
+                 'images': [{'transaction': {'status': 'success', 'subject_id': payload['subject_id'],
+                                             'face_id': face_id, 'gallery_name': payload['gallery_name']},
+                             'attributes': {}}]}
+
+
+def _recognize(galleries, payload):
+    gallery = galleries.get(payload['gallery_name'])
+    if gallery is None:
+        return _gallery_not_found()
+    face_id = _face_id(payload['image'])
+    candidates = [{'subject_id': subject_id, 'confidence': 1.0, 'enrollment_timestamp': '1416850761'}
+                  for subject_id, face_ids in sorted(gallery.items()) if face_id in face_ids]
+    transaction = dict(_face(face_id), gallery_name=payload['gallery_name'])
+    if candidates:
+        transaction.update(status='success', subject_id=candidates[0]['subject_id'], confidence=1.0)
+        return 200, {'images': [{'transaction': transaction, 'candidates': candidates}]}
+    transaction.update(status='failure', message='No match found')
+    return 200, {'images': [{'transaction': transaction}]}
+
+
+def _detect(galleries, payload):
+    return 200, {'images': [{'status': 'Complete', 'faces': [_face(_face_id(payload['image']))]}]}
+
+
+def _verify(galleries, payload):
+    gallery = galleries.get(payload['gallery_name'])
+    if gallery is None:
+        return _gallery_not_found()
+    if payload['subject_id'] not in gallery:
+        return 200, {'Errors': [{'ErrCode': 5003, 'Message': 'subject id was not found'}]}
+    confidence = 1.0 if _face_id(payload['image']) in gallery[payload['subject_id']] else 0.0
+    return 200, {'images': [{'transaction': {'status': 'success', 'confidence': confidence,
+                                             'subject_id': payload['subject_id'],
+                                             'gallery_name': payload['gallery_name']}}]}
+
+
+def _view_gallery(galleries, payload):
+    gallery = galleries.get(payload['gallery_name'])
+    if gallery is None:
+        return _gallery_not_found()
+    return 200, {'status': 'Complete', 'subject_ids': sorted(gallery)}
+
+
+def _list_galleries(galleries, payload):
+    return 200, {'status': 'Complete', 'gallery_ids': sorted(galleries)}
+
+
+def _remove_gallery(galleries, payload):
+    if galleries.pop(payload['gallery_name'], None) is None:
+        return _gallery_not_found()
+    return 200, {'status': 'Complete', 'message': 'gallery {} was removed'.format(payload['gallery_name'])}
+
+
+def _remove_subject(galleries, payload):
+    gallery = galleries.get(payload['gallery_name'])
+    if gallery is None:
+        return _gallery_not_found()
+    if gallery.pop(payload['subject_id'], None) is None:
+        return 200, {'Errors': [{'ErrCode': 5003, 'Message': 'subject id was not found'}]}
+    return 200, {'status': 'Complete',
+                 'message': 'subject id {} has been successfully removed'.format(payload['subject_id'])}
+
+
+_ENDPOINT_HANDLERS = {
+    'enroll': _enroll,
+    'recognize': _recognize,
+    'detect': _detect,
+    'verify': _verify,
+    'gallery/view': _view_gallery,
+    'gallery/list_all': _list_galleries,
+    'gallery/remove': _remove_gallery,
+    'gallery/remove_subject': _remove_subject,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serves a stub of the Kairos API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='Latency of every request, in seconds')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='Maximum latency added at random')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with a 503')
+    args = parser.parse_args()
+
+    stub = StubKairosServer(args.latency, args.latency_jitter, args.error_rate, args.host, args.port)
+    print(stub.base_url, flush=True)
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
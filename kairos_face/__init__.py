@@ -1,8 +1,81 @@
-from kairos_face import settings
+import importlib
+import importlib.util
+
+from kairos_face import exceptions, settings
 from kairos_face.exceptions import *
-from kairos_face.enroll import *
-from kairos_face.remove import *
-from kairos_face.recognize import *
-from kairos_face.gallery import *
-from kairos_face.detect import *
-from kairos_face.verify import *
+from kairos_face.utils import validate_file_and_url_presence, validate_settings
+
+# Everything else is imported on first access, so importing the package stays cheap
+# (no requests, aiohttp or Pillow) until the client is actually used.
+_LAZY_ATTRIBUTES = {
+    'KairosClient': 'kairos_face.client',
+    'get_default_client': 'kairos_face.client',
+    'set_default_client': 'kairos_face.client',
+    'enroll_face': 'kairos_face.enroll',
+    'remove_face': 'kairos_face.remove',
+    'recognize_face': 'kairos_face.recognize',
+    'recognize_face_object': 'kairos_face.recognize',
+    'get_gallery': 'kairos_face.gallery',
+    'get_galleries_names_list': 'kairos_face.gallery',
+    'remove_gallery': 'kairos_face.gallery',
+    'get_galleries_names_object': 'kairos_face.gallery',
+    'get_gallery_object': 'kairos_face.gallery',
+    'detect_face': 'kairos_face.detect',
+    'detect_face_object': 'kairos_face.detect',
+    'verify_face': 'kairos_face.verify',
+    'verify_face_object': 'kairos_face.verify',
+    'KairosFaceGallery': 'kairos_face.entities',
+    'GalleryDiff': 'kairos_face.entities',
+    'RecognizeResult': 'kairos_face.entities',
+    'Candidate': 'kairos_face.entities',
+    'DetectResult': 'kairos_face.entities',
+    'DetectedFace': 'kairos_face.entities',
+    'VerifyResult': 'kairos_face.entities',
+    'AsyncKairosClient': 'kairos_face.async_client',
+    'BulkItemResult': 'kairos_face.bulk',
+    'enroll_faces': 'kairos_face.bulk',
+    'recognize_stream': 'kairos_face.bulk',
+    'remove_faces': 'kairos_face.bulk',
+    'JobJournal': 'kairos_face.journal',
+    'FrameRecognizer': 'kairos_face.video',
+    'FaceTracker': 'kairos_face.tracking',
+    'plan_gallery_sync': 'kairos_face.sync',
+    'ShardedGallery': 'kairos_face.sharding',
+    'sync_gallery': 'kairos_face.sync',
+    'ImagePreprocessor': 'kairos_face.preprocessing',
+    'MemoryCache': 'kairos_face.cache',
+    'SqliteCache': 'kairos_face.cache',
+    'NearDuplicateFilter': 'kairos_face.dedup',
+    'GalleryMirror': 'kairos_face.mirror',
+    'ImageSource': 'kairos_face.image_source',
+    'Credential': 'kairos_face.credentials',
+    'CredentialPool': 'kairos_face.credentials',
+    'AdaptiveConcurrencyLimiter': 'kairos_face.throttling',
+    'RateLimiter': 'kairos_face.throttling',
+    'CircuitBreaker': 'kairos_face.retry',
+    'RetryPolicy': 'kairos_face.retry',
+    'HedgingPolicy': 'kairos_face.hedging',
+    'Metrics': 'kairos_face.metrics',
+}
+
+
+__all__ = ['settings', 'validate_file_and_url_presence', 'validate_settings'] + \
+    [name for name in dir(exceptions) if not name.startswith('_')] + sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        # Submodules such as kairos_face.gallery stay reachable as attributes, as they were when the
+        # package imported them eagerly
+        if name.startswith('_') or importlib.util.find_spec('kairos_face.' + name) is None:
+            raise AttributeError("module 'kairos_face' has no attribute '{}'".format(name))
+        return importlib.import_module('kairos_face.' + name)
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,177 @@
+import asyncio
+
+from kairos_face import detect, enroll, exceptions, gallery, recognize, remove, settings, verify
+from kairos_face.encoding import encode_file_contents, has_file_contents
+from kairos_face.entities import (DetectResult, KairosFaceGallery, RecognizeResult, VerifyResult, keep_raw_response,
+                                  loads)
+from kairos_face.utils import validate_file_and_url_presence, validate_settings
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncKairosClient:
+    def __init__(self, max_concurrency=100, pool_size=100, base_url=None):
+        if aiohttp is None:
+            raise ImportError('AsyncKairosClient requires the aiohttp package')
+
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.base_url = base_url
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+
+    def url_for(self, endpoint):
+        return (self.base_url or settings.base_url) + endpoint
+
+    async def post(self, endpoint, payload=None, stream_parser=None):
+        # With a stream_parser, the response body is passed to it once received, and what it returns is returned
+        # instead of the decoded response
+        auth_headers = {
+            'app_id': settings.app_id,
+            'app_key': settings.app_key
+        }
+
+        async with self._semaphore:
+            if has_file_contents(payload):
+                # Reading and encoding an image file would block the event loop, so it's done in the default executor
+                loop = asyncio.get_running_loop()
+                payload = await loop.run_in_executor(None, encode_file_contents, payload)
+            if stream_parser is None:
+                status_code, json_response = await self._send(self.url_for(endpoint), payload, auth_headers)
+                result = json_response
+            else:
+                status_code, json_response, result = await self._send_parsed(self.url_for(endpoint), payload,
+                                                                             auth_headers, stream_parser)
+        if status_code != 200 or 'Errors' in json_response:
+            raise exceptions.ServiceRequestError(status_code, json_response, payload)
+
+        return result
+
+    async def _send(self, url, payload, headers):
+        async with self._get_session().post(url, json=payload, headers=headers) as response:
+            return response.status, await response.json(content_type=None)
+
+    async def _send_parsed(self, url, payload, headers, stream_parser):
+        async with self._get_session().post(url, json=payload, headers=headers) as response:
+            content = await response.read()
+        if response.status != 200:
+            return response.status, loads(content), None
+        json_response, result = stream_parser((content,))
+        return response.status, json_response, result
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def enroll_face(self, subject_id, gallery_name,
+                          url=None, file=None, base64_image_contents=None,
+                          multiple_faces=False, additional_arguments={}):
+        validate_settings(self)
+        enroll._validate_image_arguments(url, file, base64_image_contents)
+
+        payload = enroll._build_payload(subject_id, gallery_name, url, file,
+                                        base64_image_contents, multiple_faces, additional_arguments)
+
+        return await self.post(enroll._enroll_endpoint, payload)
+
+    async def recognize_face(self, gallery_name, url=None, file=None, additional_arguments={}):
+        validate_settings(self)
+        validate_file_and_url_presence(file, url)
+
+        payload = recognize._build_payload(gallery_name, url, file, additional_arguments)
+
+        return await self.post(recognize._recognize_endpoint, payload)
+
+    async def detect_face(self, url=None, file=None, additional_arguments={}):
+        validate_settings(self)
+        validate_file_and_url_presence(file, url)
+
+        payload = detect._build_payload(url, file, additional_arguments)
+
+        return await self.post(detect._detect_endpoint, payload)
+
+    async def verify_face(self, subject_id, gallery_name, url=None, file=None, additional_arguments={}):
+        validate_settings(self)
+        validate_file_and_url_presence(file, url)
+
+        payload = verify._build_payload(subject_id, gallery_name, url, file, additional_arguments)
+
+        return await self.post(verify._verify_endpoint, payload)
+
+    async def remove_face(self, subject_id, gallery_name):
+        validate_settings(self)
+        remove._validate_arguments_presence(gallery_name, subject_id)
+
+        payload = remove._build_payload(gallery_name, subject_id)
+
+        return await self.post(remove._remove_endpoint, payload)
+
+    async def get_gallery(self, gallery_name):
+        validate_settings(self)
+        gallery._validate_gallery_name(gallery_name)
+
+        return await self.post(gallery._gallery_endpoint, {'gallery_name': gallery_name})
+
+    async def get_galleries_names_list(self):
+        validate_settings(self)
+
+        return await self.post(gallery._galleries_list_endpoint)
+
+    async def remove_gallery(self, gallery_name):
+        validate_settings(self)
+        gallery._validate_gallery_name(gallery_name)
+
+        return await self.post(gallery._gallery_remove_endpoint, {'gallery_name': gallery_name})
+
+    async def get_galleries_names_object(self):
+        json_response = await self.get_galleries_names_list()
+
+        return json_response['gallery_ids']
+
+    async def get_gallery_object(self, gallery_name):
+        json_response = await self.get_gallery(gallery_name)
+
+        return KairosFaceGallery(gallery_name, json_response['subject_ids'])
+
+    async def recognize_face_object(self, gallery_name, url=None, file=None, additional_arguments={}):
+        validate_settings(self)
+        validate_file_and_url_presence(file, url)
+
+        payload = recognize._build_payload(gallery_name, url, file, additional_arguments)
+        content = await self.post(recognize._recognize_endpoint, payload, stream_parser=keep_raw_response)
+
+        return RecognizeResult(content)
+
+    async def detect_face_object(self, url=None, file=None, additional_arguments={}):
+        validate_settings(self)
+        validate_file_and_url_presence(file, url)
+
+        payload = detect._build_payload(url, file, additional_arguments)
+        content = await self.post(detect._detect_endpoint, payload, stream_parser=keep_raw_response)
+
+        return DetectResult(content)
+
+    async def verify_face_object(self, subject_id, gallery_name, url=None, file=None, additional_arguments={}):
+        validate_settings(self)
+        validate_file_and_url_presence(file, url)
+
+        payload = verify._build_payload(subject_id, gallery_name, url, file, additional_arguments)
+        content = await self.post(verify._verify_endpoint, payload, stream_parser=keep_raw_response)
+
+        return VerifyResult(content)
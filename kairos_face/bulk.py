@@ -0,0 +1,170 @@
+import collections
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from kairos_face import exceptions
+from kairos_face.cache import _contents_digest
+from kairos_face.client import _resolve_client
+from kairos_face.enroll import enroll_face
+from kairos_face.image_source import image_contents
+from kairos_face.recognize import recognize_face
+from kairos_face.remove import remove_face
+from kairos_face.utils import validate_settings
+
+# Errors that only fail the item they happened on
+_ITEM_ERRORS = (exceptions.ServiceRequestError, exceptions.CircuitOpenError, requests.RequestException,
+                OSError, ValueError)
+
+
+class BulkItemResult(collections.namedtuple('BulkItemResult', ['item', 'response', 'error'])):
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
+def enroll_faces(items, max_workers=10, gallery_name=None, journal=None, client=None):
+    client = _resolve_client(client)
+    validate_settings(client)
+
+    def enroll(item):
+        arguments = dict(item)
+        arguments.setdefault('gallery_name', gallery_name)
+        return enroll_face(client=client, **arguments)
+
+    def journal_key(item):
+        return _journal_key('enroll', item.get('gallery_name', gallery_name), item['subject_id'], _image_key(item))
+
+    if journal is not None:
+        return _run_journaled(enroll, ((item, _with_reusable_image(item)) for item in items), max_workers,
+                              journal, journal_key)
+    return _run_bulk(enroll, items, max_workers)
+
+
+def remove_faces(subject_ids, gallery_name, max_workers=10, journal=None, client=None):
+    client = _resolve_client(client)
+    validate_settings(client)
+
+    def remove(subject_id):
+        return remove_face(subject_id, gallery_name, client=client)
+
+    if journal is not None:
+        return _run_journaled(remove, ((subject_id, subject_id) for subject_id in subject_ids), max_workers, journal,
+                              lambda subject_id: _journal_key('remove', gallery_name, subject_id))
+    return _run_bulk(remove, subject_ids, max_workers)
+
+
+def recognize_stream(images, gallery_name, concurrency=10, ordered=False, additional_arguments={}, client=None):
+    client = _resolve_client(client)
+    validate_settings(client)
+
+    def recognize(image):
+        return recognize_face(gallery_name, additional_arguments=additional_arguments, client=client,
+                              **_image_arguments(image))
+
+    return _run_bulk(recognize, images, concurrency, ordered)
+
+
+def _image_arguments(image):
+    if isinstance(image, dict):
+        return image
+    # Only strings can be URLs; paths, bytes, file objects and ImageSources are all files
+    if isinstance(image, str) and image.startswith(('http://', 'https://')):
+        return {'url': image}
+    return {'file': image}
+
+
+def _journal_key(action, gallery_name, subject_id, image=None):
+    return json.dumps([action, gallery_name, subject_id, image])
+
+
+def _image_key(item):
+    # URLs and paths name their image; any other image is known by a digest of its contents, so two
+    # images of the same subject are two items of the journal
+    image = item.get('url') or item.get('file')
+    if isinstance(image, (str, os.PathLike)):
+        return os.fspath(image)
+    if image is not None:
+        return 'sha256:' + _contents_digest(image)
+    if item.get('base64_image_contents') is not None:
+        return 'sha256:' + hashlib.sha256(item['base64_image_contents'].encode('ascii')).hexdigest()
+    return None
+
+
+def _with_reusable_image(item):
+    # Images read to compute their key are read into an ImageSource, which is what's sent then,
+    # so file objects aren't exhausted by the time they're uploaded
+    image = item.get('file')
+    if image is None or isinstance(image, (str, os.PathLike)):
+        return item
+    return dict(item, file=image_contents(image))
+
+
+def _run_journaled(func, items, max_workers, journal, journal_key):
+    # Items come as (item, item to send) pairs. Items that already succeeded in an earlier run are skipped
+    # without being yielded; the others, whether they failed or were never sent, are sent again.
+    keyed_items = ((journal_key(sent_item), item, sent_item) for item, sent_item in items)
+    unfinished_items = (keyed_item for keyed_item in keyed_items if not journal.succeeded(keyed_item[0]))
+    try:
+        for result in _run_bulk(lambda keyed_item: func(keyed_item[2]), unfinished_items, max_workers):
+            key, item, _ = result.item
+            journal.record(key, result.error)
+            yield BulkItemResult(item, result.response, result.error)
+    finally:
+        journal.flush()
+
+
+def _run_bulk(func, items, max_workers, ordered=False):
+    # Only a couple of items per worker are submitted at a time, so arbitrarily large
+    # inputs don't end up with all their payloads queued in memory. Payloads are built
+    # inside the workers, so at most max_workers of them are alive at any moment.
+    items = iter(items)
+    if ordered:
+        return _run_bulk_ordered(func, items, max_workers)
+    return _run_bulk_unordered(func, items, max_workers)
+
+
+def _run_bulk_unordered(func, items, max_workers):
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        try:
+            for item in itertools.islice(items, 2 * max_workers):
+                pending[executor.submit(func, item)] = item
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    yield _to_result(item, future)
+                for item in itertools.islice(items, len(done)):
+                    pending[executor.submit(func, item)] = item
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _run_bulk_ordered(func, items, max_workers):
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = collections.deque()
+        try:
+            for item in itertools.islice(items, 2 * max_workers):
+                pending.append((executor.submit(func, item), item))
+            while pending:
+                future, item = pending.popleft()
+                result = _to_result(item, future)
+                for next_item in itertools.islice(items, 1):
+                    pending.append((executor.submit(func, next_item), next_item))
+                yield result
+        finally:
+            for future, _ in pending:
+                future.cancel()
+
+
+def _to_result(item, future):
+    try:
+        return BulkItemResult(item, future.result(), None)
+    except _ITEM_ERRORS as e:
+        return BulkItemResult(item, None, e)
@@ -0,0 +1,133 @@
+import collections
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from kairos_face.encoding import Base64Contents
+
+_HASH_CHUNK_SIZE = 64 * 1024
+
+
+class _GalleryGenerations:
+    # Each invalidation of a gallery starts a new generation of it. A response read during an older generation
+    # may predate the change, so it isn't stored: it would bring the gallery's old contents back until it expires.
+    def __init__(self):
+        self._generations = collections.Counter()
+        self._lock = threading.Lock()
+
+    def generation(self, gallery_name):
+        with self._lock:
+            return self._generations[gallery_name]
+
+    def _is_current(self, gallery_name, generation):
+        return generation is None or generation == self._generations[gallery_name]
+
+    def _next_generation(self, gallery_name):
+        self._generations[gallery_name] += 1
+
+
+class MemoryCache(_GalleryGenerations):
+    def __init__(self, max_entries=1024, ttl=3600):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, response = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(response)
+
+    def set(self, key, gallery_name, response, generation=None):
+        with self._lock:
+            if not self._is_current(gallery_name, generation):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, gallery_name, copy.deepcopy(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_gallery(self, gallery_name):
+        with self._lock:
+            self._next_generation(gallery_name)
+            stale_keys = [key for key, (_, entry_gallery, _) in self._entries.items()
+                          if entry_gallery == gallery_name]
+            for key in stale_keys:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteCache(_GalleryGenerations):
+    def __init__(self, path, ttl=24 * 3600):
+        super().__init__()
+        self.ttl = ttl
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS responses ('
+                                     'key TEXT PRIMARY KEY, gallery_name TEXT, expires_at REAL, response TEXT)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS responses_gallery ON responses (gallery_name)')
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute('SELECT expires_at, response FROM responses WHERE key = ?',
+                                           (key,)).fetchone()
+        if row is None or row[0] < time.time():
+            return None
+        return json.loads(row[1])
+
+    def set(self, key, gallery_name, response, generation=None):
+        with self._lock, self._connection:
+            if not self._is_current(gallery_name, generation):
+                return
+            self._connection.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                                     (key, gallery_name, time.time() + self.ttl, json.dumps(response)))
+
+    def invalidate_gallery(self, gallery_name):
+        with self._lock, self._connection:
+            self._next_generation(gallery_name)
+            self._connection.execute('DELETE FROM responses WHERE gallery_name = ?', (gallery_name,))
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM responses')
+
+    def close(self):
+        self._connection.close()
+
+
+def cache_key(endpoint, payload):
+    digest = hashlib.sha256(endpoint.encode('utf-8'))
+    arguments = {}
+    for key, value in payload.items():
+        if isinstance(value, Base64Contents):
+            arguments[key] = _contents_digest(value)
+        else:
+            arguments[key] = value
+    digest.update(json.dumps(arguments, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _contents_digest(contents):
+    digest = hashlib.sha256()
+    with contents.open() as fp:
+        chunk = fp.read(_HASH_CHUNK_SIZE)
+        while chunk:
+            digest.update(chunk)
+            chunk = fp.read(_HASH_CHUNK_SIZE)
+    return digest.hexdigest()
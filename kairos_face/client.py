@@ -0,0 +1,308 @@
+import contextlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from kairos_face import exceptions
+from kairos_face import settings
+from kairos_face.cache import cache_key
+from kairos_face.coalescing import SingleFlight
+from kairos_face.credentials import Credential
+from kairos_face.encoding import StreamingJSONBody, add_stage_time, encode_file_contents, has_file_contents
+from kairos_face.metrics import RequestMetrics
+
+_CACHEABLE_ENDPOINTS = ('recognize', 'detect')
+# Also the endpoints retried and hedged by default
+_READ_ONLY_ENDPOINTS = ('recognize', 'detect', 'verify', 'gallery/view', 'gallery/list_all')
+_GALLERY_CHANGING_ENDPOINTS = ('enroll', 'gallery/remove', 'gallery/remove_subject')
+_RESPONSE_CHUNK_SIZE = 64 * 1024
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+class KairosClient:
+    def __init__(self, pool_connections=10, pool_maxsize=10, stream_uploads=False, preprocessor=None,
+                 cache=None, coalesce_requests=False, rate_limiter=None, concurrency_limiter=None,
+                 retry_policy=None, circuit_breaker=None, hedging_policy=None, metrics=None, timeout=None,
+                 base_url=None, prewarm_connections=0, json_decoder=None, duplicate_filter=None,
+                 credential_pool=None):
+        self.stream_uploads = stream_uploads
+        self.preprocessor = preprocessor
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.hedging_policy = hedging_policy
+        if hedging_policy is not None:
+            hedging_policy.reserve_workers(pool_maxsize)
+        self.metrics = metrics
+        self.timeout = timeout
+        self.base_url = base_url
+        self.pool_maxsize = pool_maxsize
+        self.json_decoder = json_decoder
+        self.duplicate_filter = duplicate_filter
+        self.credential_pool = credential_pool
+        self._gallery_observers = []
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if prewarm_connections > 0:
+            self.prewarm(prewarm_connections)
+
+    def url_for(self, endpoint):
+        # settings.base_url is read on every call, so changing it also applies to existing clients
+        return (self.base_url or settings.base_url) + endpoint
+
+    def prewarm(self, connections=1):
+        # Opens connections ahead of the first request, so its latency doesn't include the TCP and TLS handshakes.
+        # Connections are only opened in parallel by concurrent requests, hence one thread per connection.
+        connections = min(connections, self.pool_maxsize)
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(lambda _: self._open_connection(), range(connections)))
+
+    def _open_connection(self):
+        try:
+            self.session.head(self.url_for(''), timeout=self.timeout).close()
+        except requests.RequestException:
+            # Pre-warming is only an optimization, the first request will open the connection instead
+            return False
+        return True
+
+    def post(self, endpoint, payload=None, stream_parser=None):
+        # With a stream_parser, the response body is passed to it chunk by chunk as it's received, and what it
+        # returns is returned instead of the decoded response. Such responses are neither cached nor shared.
+        if self.duplicate_filter is not None and payload is not None and stream_parser is None:
+            json_response = self.duplicate_filter.call(endpoint, payload,
+                                                       lambda: self._fetch(endpoint, payload, stream_parser))
+        else:
+            json_response = self._fetch(endpoint, payload, stream_parser)
+
+        if endpoint in _GALLERY_CHANGING_ENDPOINTS:
+            if self.cache is not None:
+                self.cache.invalidate_gallery(payload['gallery_name'])
+            if self.duplicate_filter is not None:
+                self.duplicate_filter.invalidate_gallery(payload['gallery_name'])
+            for observer in self._gallery_observers:
+                observer.gallery_changed(endpoint, payload)
+
+        return json_response
+
+    def _fetch(self, endpoint, payload, stream_parser):
+        cacheable = self.cache is not None and endpoint in _CACHEABLE_ENDPOINTS and stream_parser is None
+        coalescable = (self.single_flight is not None and endpoint in _READ_ONLY_ENDPOINTS
+                       and stream_parser is None)
+        if cacheable or coalescable:
+            key = cache_key(endpoint, payload or {})
+
+        if cacheable:
+            cached_response = self.cache.get(key)
+            if cached_response is not None:
+                return cached_response
+            generation = self.cache.generation(payload.get('gallery_name'))
+
+        if coalescable:
+            json_response = self.single_flight.do(key, lambda: self._execute(endpoint, payload))
+        else:
+            json_response = self._execute(endpoint, payload, stream_parser)
+
+        if cacheable:
+            self.cache.set(key, payload.get('gallery_name'), json_response, generation)
+
+        return json_response
+
+    def add_gallery_observer(self, observer):
+        self._gallery_observers.append(observer)
+
+    def _execute(self, endpoint, payload, stream_parser=None):
+        # Images are preprocessed once per request, before the retries, hedges and credential retries
+        # that would otherwise each process them again
+        if self.preprocessor is not None and payload is not None:
+            payload = self._preprocess(endpoint, payload)
+
+        def attempt():
+            if self.hedging_policy is None:
+                return self._guarded_send(endpoint, payload, stream_parser)
+            return self.hedging_policy.call(endpoint, lambda: self._guarded_send(endpoint, payload, stream_parser))
+
+        if self.retry_policy is None:
+            return attempt()
+        return self.retry_policy.call(endpoint, attempt)
+
+    def _preprocess(self, endpoint, payload):
+        started_at = time.perf_counter()
+        payload = self.preprocessor.process_payload(payload)
+        if self.metrics is not None:
+            self.metrics.record_stage(endpoint, 'preprocess', time.perf_counter() - started_at)
+        return payload
+
+    def _guarded_send(self, endpoint, payload, stream_parser):
+        if self.circuit_breaker is None:
+            return self._throttled_send(endpoint, payload, stream_parser)
+
+        self.circuit_breaker.before_call(endpoint)
+        try:
+            json_response = self._throttled_send(endpoint, payload, stream_parser)
+        except exceptions.ServiceRequestError as e:
+            if e.status_code >= 500:
+                self.circuit_breaker.record_failure(endpoint)
+            else:
+                self.circuit_breaker.record_success(endpoint)
+            raise
+        except requests.RequestException:
+            self.circuit_breaker.record_failure(endpoint)
+            raise
+        except Exception:
+            self.circuit_breaker.record_inconclusive(endpoint)
+            raise
+        self.circuit_breaker.record_success(endpoint)
+
+        return json_response
+
+    def _throttled_send(self, endpoint, payload, stream_parser):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.concurrency_limiter is None:
+            return self._send(endpoint, payload, stream_parser)
+
+        self.concurrency_limiter.acquire()
+        started_at = time.monotonic()
+        overloaded = False
+        try:
+            return self._send(endpoint, payload, stream_parser)
+        except exceptions.ServiceRequestError as e:
+            overloaded = _is_overload_status(e.status_code)
+            raise
+        except requests.RequestException:
+            overloaded = True
+            raise
+        finally:
+            self.concurrency_limiter.release(time.monotonic() - started_at, overloaded)
+
+    def _send(self, endpoint, payload, stream_parser=None):
+        # Each attempt picks its own credential, so a request retried after being throttled goes out with another one
+        if self.credential_pool is None:
+            return self._send_as(Credential(settings.app_id, settings.app_key), endpoint, payload, stream_parser)
+        return self.credential_pool.call(
+            lambda credential: self._send_as(credential, endpoint, payload, stream_parser))
+
+    def _send_as(self, credential, endpoint, payload, stream_parser):
+        if self.metrics is None:
+            return self._post(credential, endpoint, payload, stream_parser)
+
+        # _post fills in the sizes, status and stage timings as the request goes, so they're known even if it fails
+        observed = {'status_code': None, 'request_bytes': 0, 'response_bytes': 0, 'stages': {}}
+        error = None
+        started_at = time.perf_counter()
+        try:
+            return self._post(credential, endpoint, payload, stream_parser, observed)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.metrics.record(RequestMetrics(endpoint, observed['status_code'], error,
+                                               time.perf_counter() - started_at, observed['request_bytes'],
+                                               observed['response_bytes'], observed['stages']))
+
+    def _post(self, credential, endpoint, payload, stream_parser, observed=None):
+        # Stages are only timed when there's somewhere to put them
+        stages = observed['stages'] if observed is not None else None
+        headers = {
+            'app_id': credential.app_id,
+            'app_key': credential.app_key
+        }
+        payload, body_arguments = self._body_arguments(payload, headers, stages)
+
+        with _timed_stage(stages, 'network'):
+            response = self.session.post(self.url_for(endpoint), headers=headers, timeout=self.timeout,
+                                         stream=stream_parser is not None, **body_arguments)
+        if observed is not None:
+            observed.update(status_code=response.status_code, request_bytes=len(body_arguments.get('data', b'')))
+
+        # A streamed response is received while it's parsed, so both count as parsing
+        with _timed_stage(stages, 'parse'), response:
+            json_response, result = self._parse_response(response, stream_parser)
+            if observed is not None:
+                observed['response_bytes'] = len(response.content) if stream_parser is None else response.raw.tell()
+        if response.status_code != 200 or 'Errors' in json_response:
+            raise exceptions.ServiceRequestError(response.status_code, json_response, payload)
+
+        return result
+
+    def _body_arguments(self, payload, headers, stages):
+        # Returns the payload as sent and the arguments passing it to requests. When stages are timed, the payload is
+        # serialized here rather than by requests, so serialization can be told apart from the network round trip.
+        if payload is None:
+            return payload, {}
+        if self.stream_uploads and has_file_contents(payload):
+            headers['Content-Type'] = 'application/json'
+            return payload, {'data': StreamingJSONBody(payload)}
+
+        payload = encode_file_contents(payload, stages)
+        if stages is None:
+            return payload, {'json': payload}
+        headers['Content-Type'] = 'application/json'
+        with _timed_stage(stages, 'serialize'):
+            body = json.dumps(payload).encode('utf-8')
+        return payload, {'data': body}
+
+    def _parse_response(self, response, stream_parser):
+        # Returns the decoded response, and what stream_parser made of it when there is one
+        if stream_parser is None or response.status_code != 200:
+            json_response = self._decode(response)
+            return json_response, json_response
+        return stream_parser(response.iter_content(_RESPONSE_CHUNK_SIZE))
+
+    def _decode(self, response):
+        if self.json_decoder is None:
+            return response.json()
+        return self.json_decoder(response.content)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_default_client():
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = KairosClient()
+    return _default_client
+
+
+def set_default_client(client):
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+@contextlib.contextmanager
+def _timed_stage(stages, stage):
+    if stages is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    yield
+    add_stage_time(stages, stage, time.perf_counter() - started_at)
+
+
+def _is_overload_status(status_code):
+    return status_code == 429 or status_code >= 500
+
+
+def _resolve_client(client):
+    return client if client is not None else get_default_client()
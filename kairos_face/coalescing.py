@@ -0,0 +1,54 @@
+import copy
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.followers = 0
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls_executed = 0
+        self.calls_coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls_executed += 1
+                leader = True
+            else:
+                call.followers += 1
+                self.calls_coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = func()
+        except BaseException as e:
+            # Interruptions such as KeyboardInterrupt too: the waiting callers must be released either way
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            try:
+                if call.error is None and call.followers > 0:
+                    # Every caller gets its own copy, so one of them mutating its response doesn't affect the others
+                    call.result = copy.deepcopy(result)
+            finally:
+                call.done.set()
+
+        return result
@@ -0,0 +1,103 @@
+import collections
+import threading
+import time
+
+from kairos_face import exceptions
+
+Credential = collections.namedtuple('Credential', ['app_id', 'app_key'])
+CredentialStats = collections.namedtuple('CredentialStats', ['requests', 'in_flight', 'failures', 'throttled',
+                                                             'average_latency', 'available'])
+
+_STRATEGIES = ('least_loaded', 'round_robin')
+
+
+class _CredentialState:
+    __slots__ = ('credential', 'requests', 'in_flight', 'failures', 'throttled', 'total_latency',
+                 'consecutive_throttles', 'available_at')
+
+    def __init__(self, credential):
+        self.credential = credential
+        self.requests = 0
+        self.in_flight = 0
+        self.failures = 0
+        self.throttled = 0
+        self.total_latency = 0.0
+        self.consecutive_throttles = 0
+        self.available_at = 0.0
+
+
+class CredentialPool:
+    # Spreads requests over several Kairos accounts, so throughput isn't capped by the quota of one of them.
+    # A credential that gets throttled is left out of the rotation for `cooldown` seconds, twice as long
+    # every time it's throttled again right after coming back, up to max_cooldown.
+    def __init__(self, credentials, strategy='least_loaded', cooldown=30.0, max_cooldown=300.0,
+                 throttle_status_codes=(429,)):
+        if strategy not in _STRATEGIES:
+            raise ValueError('strategy must be one of {}'.format(', '.join(_STRATEGIES)))
+        self._states = [_CredentialState(Credential(*credential)) for credential in credentials]
+        if not self._states:
+            raise ValueError('At least one credential must be passed')
+
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.throttle_status_codes = throttle_status_codes
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def call(self, func):
+        state = self._acquire()
+        started_at = time.monotonic()
+        error = None
+        try:
+            return func(state.credential)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(state, time.monotonic() - started_at, error)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return {state.credential.app_id: CredentialStats(
+                state.requests, state.in_flight, state.failures, state.throttled,
+                state.total_latency / state.requests if state.requests else 0.0, state.available_at <= now)
+                for state in self._states}
+
+    def _acquire(self):
+        # When every credential is throttled, waits for the first one to come back rather than sending
+        # requests that would be throttled too
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                rotation = self._states[self._next:] + self._states[:self._next]
+                available = [state for state in rotation if state.available_at <= now]
+                if available:
+                    state = available[0] if self.strategy == 'round_robin' else \
+                        min(available, key=lambda candidate: candidate.in_flight)
+                    self._next = (self._states.index(state) + 1) % len(self._states)
+                    state.requests += 1
+                    state.in_flight += 1
+                    return state
+                delay = min(state.available_at for state in self._states) - now
+            time.sleep(delay)
+
+    def _release(self, state, latency, error):
+        throttled = isinstance(error, exceptions.ServiceRequestError) and \
+            error.status_code in self.throttle_status_codes
+        with self._lock:
+            now = time.monotonic()
+            state.in_flight -= 1
+            state.total_latency += latency
+            if error is not None:
+                state.failures += 1
+            if throttled:
+                state.throttled += 1
+                # Requests that were in flight when the credential got throttled don't extend its cooldown
+                if state.available_at <= now:
+                    state.available_at = now + min(self.max_cooldown,
+                                                   self.cooldown * 2 ** state.consecutive_throttles)
+                    state.consecutive_throttles += 1
+            elif error is None:
+                state.consecutive_throttles = 0
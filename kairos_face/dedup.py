@@ -0,0 +1,126 @@
+import collections
+import copy
+import io
+import time
+
+from kairos_face.cache import _GalleryGenerations, cache_key
+from kairos_face.encoding import Base64Contents
+from kairos_face.image_source import _is_frame
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_HASH_WIDTH = 8
+
+_Entry = collections.namedtuple('_Entry', ['fingerprint', 'gallery_name', 'stored_at', 'response'])
+
+
+class NearDuplicateFilter(_GalleryGenerations):
+    # Reuses the response to an earlier image when a new one looks the same, e.g. consecutive frames of a static
+    # camera: images are compared by their difference hash (dHash), which JPEG noise barely changes, and two
+    # images match when their hashes differ in at most `threshold` of 64 bits.
+    def __init__(self, threshold=4, window=1.0, max_entries=64, endpoints=('detect', 'recognize')):
+        if Image is None:
+            raise ImportError('NearDuplicateFilter requires the Pillow package')
+
+        super().__init__()
+        self.threshold = threshold
+        self.window = window
+        self.max_entries = max_entries
+        self.endpoints = endpoints
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._entries = collections.defaultdict(lambda: collections.deque(maxlen=max_entries))
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def call(self, endpoint, payload, func):
+        image = payload.get('image') if endpoint in self.endpoints else None
+        # Only images sent with the request can be hashed; URLs go straight through
+        fingerprint = self._fingerprint(image) if isinstance(image, Base64Contents) else None
+        if fingerprint is None:
+            if endpoint in self.endpoints:
+                with self._lock:
+                    self.skipped += 1
+            return func()
+
+        # Requests only match when everything but the image is the same, e.g. the gallery being searched
+        key = cache_key(endpoint, {name: value for name, value in payload.items() if name != 'image'})
+        response = self._lookup(key, fingerprint)
+        if response is not None:
+            return response
+
+        gallery_name = payload.get('gallery_name')
+        generation = self.generation(gallery_name)
+        response = func()
+        with self._lock:
+            if self._is_current(gallery_name, generation):
+                self._entries[key].append(_Entry(fingerprint, gallery_name, time.monotonic(),
+                                                 copy.deepcopy(response)))
+        return response
+
+    @staticmethod
+    def _fingerprint(image):
+        # The filter is only an optimization: an image Pillow can't decode is sent to the API as it is,
+        # which may well accept it
+        try:
+            return difference_hash(image)
+        except Exception:
+            return None
+
+    def _lookup(self, key, fingerprint):
+        with self._lock:
+            now = time.monotonic()
+            # Entries expire counting from the request that was actually sent, so a scene that never changes
+            # is still sent once per window
+            for entry in reversed(self._entries.get(key, ())):
+                recent = now - entry.stored_at <= self.window
+                if recent and _hamming_distance(entry.fingerprint, fingerprint) <= self.threshold:
+                    self.hits += 1
+                    return copy.deepcopy(entry.response)
+            self.misses += 1
+            return None
+
+    def invalidate_gallery(self, gallery_name):
+        with self._lock:
+            self._next_generation(gallery_name)
+            for key, entries in list(self._entries.items()):
+                self._entries[key] = collections.deque((entry for entry in entries
+                                                        if entry.gallery_name != gallery_name),
+                                                       maxlen=self.max_entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def difference_hash(image):
+    # NumPy frames are hashed as they are, instead of being encoded and decoded again, and only
+    # every few pixels are kept since the image ends up shrunk to 9x8 anyway
+    frame = getattr(image, 'image', None)
+    if _is_frame(frame):
+        step = max(1, min(frame.shape[:2]) // (8 * _HASH_WIDTH))
+        picture = Image.fromarray(frame[::step, ::step])
+    else:
+        with image.open() as fp:
+            picture = Image.open(io.BytesIO(fp.read()))
+        # JPEGs are decoded straight at a reduced scale, which is most of the hashing time saved
+        picture.draft('L', (8 * _HASH_WIDTH, 8 * _HASH_WIDTH))
+    # Each bit tells whether a pixel is brighter than the one to its right, in a 9x8 grayscale thumbnail
+    pixels = picture.convert('L').resize((_HASH_WIDTH + 1, _HASH_WIDTH), Image.BILINEAR).tobytes()
+    fingerprint = 0
+    for row in range(_HASH_WIDTH):
+        for column in range(_HASH_WIDTH):
+            offset = row * (_HASH_WIDTH + 1) + column
+            fingerprint = fingerprint << 1 | (pixels[offset] > pixels[offset + 1])
+    return fingerprint
+
+
+def _hamming_distance(first, second):
+    return bin(first ^ second).count('1')
@@ -0,0 +1,118 @@
+import base64
+import io
+import json
+import os
+import time
+
+# A multiple of 3, so every chunk but the last one encodes without base64 padding
+_CHUNK_SIZE = 3 * 64 * 1024
+
+
+class Base64Contents:
+    def read(self):
+        with self.open() as fp:
+            return fp.read()
+
+    def encode(self):
+        return base64.b64encode(self.read()).decode('ascii')
+
+    def encode_with_timings(self, stages):
+        started_at = time.perf_counter()
+        image_bytes = self.read()
+        read_at = time.perf_counter()
+        encoded = base64.b64encode(image_bytes).decode('ascii')
+        add_stage_time(stages, 'read', read_at - started_at)
+        add_stage_time(stages, 'encode', time.perf_counter() - read_at)
+        return encoded
+
+    def iter_encoded(self):
+        with self.open() as fp:
+            chunk = fp.read(_CHUNK_SIZE)
+            while chunk:
+                yield base64.b64encode(chunk)
+                chunk = fp.read(_CHUNK_SIZE)
+
+    def encoded_length(self):
+        return 4 * ((self.size() + 2) // 3)
+
+    def open(self):
+        raise NotImplementedError
+
+    def size(self):
+        raise NotImplementedError
+
+
+class Base64File(Base64Contents):
+    def __init__(self, path):
+        self.path = path
+
+    def open(self):
+        return open(self.path, 'rb')
+
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def __repr__(self):
+        return 'Base64File({!r})'.format(self.path)
+
+
+class Base64Bytes(Base64Contents):
+    def __init__(self, data):
+        self.data = data
+
+    def open(self):
+        return io.BytesIO(self.data)
+
+    def size(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return '<Base64Bytes of {} bytes>'.format(len(self.data))
+
+
+# Serializes a payload as JSON while encoding its image files chunk by chunk. Since it has a length,
+# requests sends it with a Content-Length header rather than with chunked transfer encoding.
+class StreamingJSONBody:
+    def __init__(self, payload):
+        self._parts = []
+        literal = '{'
+        for i, (key, value) in enumerate(payload.items()):
+            if i > 0:
+                literal += ', '
+            literal += json.dumps(key) + ': '
+            if isinstance(value, Base64Contents):
+                self._parts.append((literal + '"').encode('utf-8'))
+                self._parts.append(value)
+                literal = '"'
+            else:
+                literal += json.dumps(value)
+        self._parts.append((literal + '}').encode('utf-8'))
+
+    def __len__(self):
+        return sum(part.encoded_length() if isinstance(part, Base64Contents) else len(part)
+                   for part in self._parts)
+
+    def __iter__(self):
+        for part in self._parts:
+            if isinstance(part, Base64Contents):
+                yield from part.iter_encoded()
+            else:
+                yield part
+
+
+def add_stage_time(stages, stage, seconds):
+    stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+def has_file_contents(payload):
+    return payload is not None and any(isinstance(value, Base64Contents) for value in payload.values())
+
+
+def encode_file_contents(payload, stages=None):
+    # With stages, the time spent reading and encoding the files is added to them
+    return {key: _encode(value, stages) if isinstance(value, Base64Contents) else value
+            for key, value in payload.items()}
+
+
+def _encode(contents, stages):
+    return contents.encode() if stages is None else contents.encode_with_timings(stages)
@@ -1,4 +1,234 @@
+import collections
+import json
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(content):
+    # orjson decodes responses several times faster than the json module, when it's installed
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def keep_raw_response(chunks):
+    # A stream_parser keeping the response as bytes, for a result object to parse when first read. The client only
+    # needs the decoded response to look for errors, so only responses that may hold some are decoded here.
+    content = b''.join(chunks)
+    json_response = loads(content) if b'"Errors"' in content else {}
+
+    return json_response, content
+
+
+GalleryDiff = collections.namedtuple('GalleryDiff', ['added', 'removed'])
+
+
 class KairosFaceGallery:
+    __slots__ = ('name', 'subjects')
+
     def __init__(self, gallery_name, subject_ids):
         self.name = gallery_name
-        self.subjects = subject_ids
+        # Lists of IDs are interned, so the snapshots of a gallery share one copy of each subject ID.
+        # Sets are assumed to be already interned, as the ones parsed by get_gallery_object are.
+        if isinstance(subject_ids, (set, frozenset)):
+            self.subjects = frozenset(subject_ids)
+        else:
+            self.subjects = frozenset(map(sys.intern, subject_ids))
+
+    def diff(self, other):
+        # Subjects added and removed going from this snapshot of the gallery to the other
+        return GalleryDiff(other.subjects - self.subjects, self.subjects - other.subjects)
+
+    def __contains__(self, subject_id):
+        return subject_id in self.subjects
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def __iter__(self):
+        return iter(self.subjects)
+
+    def __repr__(self):
+        return '<KairosFaceGallery {} with {} subjects>'.format(self.name, len(self.subjects))
+
+
+class _Entity:
+    # Known fields are kept in slots rather than in a dict per object; any other field of the response
+    # is kept in _extra, and _absent tells fields missing from the response apart from null ones,
+    # so to_dict() gives back the response as it was received.
+    __slots__ = ('_extra', '_absent')
+    _FIELDS = ()
+    _NESTED = {}
+
+    @classmethod
+    def from_dict(cls, data):
+        entity = cls.__new__(cls)
+        entity._load(data)
+        return entity
+
+    def _load(self, data):
+        data = dict(data)
+        absent = 0
+        for index, (attribute, key) in enumerate(self._FIELDS):
+            if key in data:
+                value = data.pop(key)
+                nested = self._NESTED.get(key)
+                if nested is not None and value is not None:
+                    value = nested.from_nested(value)
+            else:
+                value = None
+                absent |= 1 << index
+            setattr(self, attribute, value)
+        self._extra = data or None
+        self._absent = absent
+
+    def to_dict(self):
+        data = {}
+        for index, (attribute, key) in enumerate(self._FIELDS):
+            if not self._absent & (1 << index):
+                value = getattr(self, attribute)
+                if key in self._NESTED and value is not None:
+                    value = self._NESTED[key].to_nested(value)
+                data[key] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    @classmethod
+    def from_nested(cls, value):
+        return cls.from_dict(value)
+
+    @staticmethod
+    def to_nested(value):
+        return value.to_dict()
+
+    def __repr__(self):
+        return '<{} {}>'.format(type(self).__name__, self.to_dict())
+
+
+class _EntityList:
+    # Lists of nested objects become tuples, which are smaller than lists
+    def __init__(self, entity_class):
+        self.entity_class = entity_class
+
+    def from_nested(self, items):
+        return tuple(self.entity_class.from_dict(item) for item in items)
+
+    @staticmethod
+    def to_nested(entities):
+        return [entity.to_dict() for entity in entities]
+
+
+class _Response(_Entity):
+    # A whole API response, which is only decoded and parsed the first time one of its fields is read
+    __slots__ = ('_source', '_decoder')
+
+    def __init__(self, response, decoder=None):
+        self._source = response
+        self._decoder = decoder
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data)
+
+    def __getattr__(self, name):
+        # Only called for slots that haven't been set yet, i.e. before the response is parsed
+        source = object.__getattribute__(self, '_source')
+        if source is None:
+            raise AttributeError(name)
+        if not isinstance(source, dict):
+            source = (self._decoder or loads)(source)
+        self._source = None
+        self._load(source)
+        return object.__getattribute__(self, name)
+
+    def to_dict(self):
+        if self._source is not None and not isinstance(self._source, dict):
+            return (self._decoder or loads)(self._source)
+        if self._source is not None:
+            return self._source
+        return super().to_dict()
+
+
+class Transaction(_Entity):
+    __slots__ = ('status', 'message', 'subject_id', 'confidence', 'gallery_name', 'face_id',
+                 'top_left_x', 'top_left_y', 'width', 'height', 'quality')
+    _FIELDS = (('status', 'status'), ('message', 'message'), ('subject_id', 'subject_id'),
+               ('confidence', 'confidence'), ('gallery_name', 'gallery_name'), ('face_id', 'face_id'),
+               ('top_left_x', 'topLeftX'), ('top_left_y', 'topLeftY'), ('width', 'width'), ('height', 'height'),
+               ('quality', 'quality'))
+
+
+class Candidate(_Entity):
+    __slots__ = ('subject_id', 'confidence', 'enrollment_timestamp')
+    _FIELDS = (('subject_id', 'subject_id'), ('confidence', 'confidence'),
+               ('enrollment_timestamp', 'enrollment_timestamp'))
+
+    def _load(self, data):
+        super()._load(data)
+        # Older API versions keyed the confidence by the subject ID: {"<subject_id>": "<confidence>", ...}
+        if self.subject_id is None and self._extra is not None and len(self._extra) == 1:
+            (self.subject_id, confidence), = self._extra.items()
+            self.confidence = float(confidence)
+
+
+class RecognizedFace(_Entity):
+    __slots__ = ('transaction', 'candidates')
+    _FIELDS = (('transaction', 'transaction'), ('candidates', 'candidates'))
+    _NESTED = {'transaction': Transaction, 'candidates': _EntityList(Candidate)}
+
+    @property
+    def best_candidate(self):
+        return self.candidates[0] if self.candidates else None
+
+
+class RecognizeResult(_Response):
+    __slots__ = ('images',)
+    _FIELDS = (('images', 'images'),)
+    _NESTED = {'images': _EntityList(RecognizedFace)}
+
+
+class DetectedFace(_Entity):
+    __slots__ = ('face_id', 'top_left_x', 'top_left_y', 'width', 'height', 'confidence', 'quality',
+                 'roll', 'yaw', 'pitch', 'attributes')
+    _FIELDS = (('face_id', 'face_id'), ('top_left_x', 'topLeftX'), ('top_left_y', 'topLeftY'),
+               ('width', 'width'), ('height', 'height'), ('confidence', 'confidence'), ('quality', 'quality'),
+               ('roll', 'roll'), ('yaw', 'yaw'), ('pitch', 'pitch'), ('attributes', 'attributes'))
+
+
+class DetectedImage(_Entity):
+    __slots__ = ('status', 'file', 'width', 'height', 'faces')
+    _FIELDS = (('status', 'status'), ('file', 'file'), ('width', 'width'), ('height', 'height'),
+               ('faces', 'faces'))
+    _NESTED = {'faces': _EntityList(DetectedFace)}
+
+
+class DetectResult(_Response):
+    __slots__ = ('images',)
+    _FIELDS = (('images', 'images'),)
+    _NESTED = {'images': _EntityList(DetectedImage)}
+
+    @property
+    def faces(self):
+        return tuple(face for image in self.images or () for face in image.faces or ())
+
+
+class VerifiedFace(_Entity):
+    __slots__ = ('transaction',)
+    _FIELDS = (('transaction', 'transaction'),)
+    _NESTED = {'transaction': Transaction}
+
+
+class VerifyResult(_Response):
+    __slots__ = ('images',)
+    _FIELDS = (('images', 'images'),)
+    _NESTED = {'images': _EntityList(VerifiedFace)}
+
+    @property
+    def verified(self):
+        return bool(self.images) and self.images[0].transaction is not None \
+            and self.images[0].transaction.status == 'success'
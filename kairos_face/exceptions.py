@@ -20,3 +20,15 @@ class ServiceRequestError(Exception):
 
     def __str__(self):
         return self.__repr__()
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.msg = 'Requests to {} are failing, the circuit breaker is open'.format(endpoint)
+
+    def __repr__(self):
+        return self.msg
+
+    def __str__(self):
+        return self.__repr__()
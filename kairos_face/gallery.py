@@ -1,99 +1,83 @@
-import requests
+import sys
 
-from kairos_face import exceptions, validate_settings
-from kairos_face import settings
+from kairos_face import exceptions
+from kairos_face.client import _resolve_client
 from kairos_face.entities import KairosFaceGallery
+from kairos_face.streaming import parse_streamed_array
+from kairos_face.utils import validate_settings
 
-_gallery_base_url = settings.base_url + 'gallery/view'
-_galleries_list_url = settings.base_url + 'gallery/list_all'
-_gallery_remove_url = settings.base_url + 'gallery/remove'
+_gallery_endpoint = 'gallery/view'
+_galleries_list_endpoint = 'gallery/list_all'
+_gallery_remove_endpoint = 'gallery/remove'
+_GALLERY_NOT_FOUND_ERROR_CODE = 5004
 
 
-def get_gallery(gallery_name):
-    validate_settings()
+def get_gallery(gallery_name, client=None):
+    validate_settings(client)
     _validate_gallery_name(gallery_name)
 
-    auth_headers = {
-        'app_id': settings.app_id,
-        'app_key': settings.app_key
-    }
-
     payload = {'gallery_name': gallery_name}
-    response = requests.post(_gallery_base_url, json=payload, headers=auth_headers)
-    json_response = response.json()
-    if response.status_code != 200 or 'Errors' in json_response:
-        raise exceptions.ServiceRequestError(response.status_code, json_response, payload)
 
-    return response.json()
+    return _resolve_client(client).post(_gallery_endpoint, payload)
+
 
+def get_galleries_names_list(client=None):
+    validate_settings(client)
 
-def get_galleries_names_list():
-    validate_settings()
+    return _resolve_client(client).post(_galleries_list_endpoint)
 
-    auth_headers = {
-        'app_id': settings.app_id,
-        'app_key': settings.app_key
-    }
 
-    response = requests.post(_galleries_list_url, headers=auth_headers)
-    json_response = response.json()
-    if response.status_code != 200 or 'Errors' in json_response:
-        raise exceptions.ServiceRequestError(response.status_code, json_response, None)
+def remove_gallery(gallery_name, client=None):
+    validate_settings(client)
+    _validate_gallery_name(gallery_name)
 
-    return json_response
+    payload = {'gallery_name': gallery_name}
 
+    return _resolve_client(client).post(_gallery_remove_endpoint, payload)
 
-def remove_gallery(gallery_name):
-    validate_settings()
-    _validate_gallery_name(gallery_name)
 
-    auth_headers = {
-        'app_id': settings.app_id,
-        'app_key': settings.app_key
-    }
+def get_galleries_names_object(client=None):
+    validate_settings(client)
 
-    payload = {'gallery_name': gallery_name}
+    json_response = _resolve_client(client).post(_galleries_list_endpoint)
 
-    response = requests.post(_gallery_remove_url, json=payload, headers=auth_headers)
-    json_response = response.json()
-    if response.status_code != 200 or 'Errors' in json_response:
-        raise exceptions.ServiceRequestError(response.status_code, json_response, payload)
+    return json_response['gallery_ids']
 
-    return json_response
 
+def get_gallery_object(gallery_name, client=None):
+    validate_settings(client)
+    _validate_gallery_name(gallery_name)
 
-def get_galleries_names_object():
-    validate_settings()
+    payload = {'gallery_name': gallery_name}
+    subject_ids = _resolve_client(client).post(_gallery_endpoint, payload, stream_parser=_parse_gallery)
 
-    auth_headers = {
-        'app_id': settings.app_id,
-        'app_key': settings.app_key
-    }
+    return KairosFaceGallery(gallery_name, subject_ids)
 
-    response = requests.post(_galleries_list_url, headers=auth_headers)
-    json_response = response.json()
-    if response.status_code != 200 or 'Errors' in json_response:
-        raise exceptions.ServiceRequestError(response.status_code, json_response, None)
 
-    return json_response['gallery_ids']
+def _parse_gallery(chunks):
+    # Subject IDs are added to a set as they're read, so large galleries never exist as a list of IDs
+    subject_ids = set()
+    json_response = parse_streamed_array(chunks, 'subject_ids',
+                                         lambda subject_id: subject_ids.add(sys.intern(subject_id)))
 
+    return json_response, subject_ids
 
-def get_gallery_object(gallery_name):
-    validate_settings()
-    _validate_gallery_name(gallery_name)
 
-    auth_headers = {
-        'app_id': settings.app_id,
-        'app_key': settings.app_key
-    }
+def _fetch_subject_ids(gallery_name, client):
+    # A gallery that doesn't exist yet is the same as an empty one
+    try:
+        return get_gallery_object(gallery_name, client=client).subjects
+    except exceptions.ServiceRequestError as e:
+        if _error_code(e.response_msg) == _GALLERY_NOT_FOUND_ERROR_CODE:
+            return frozenset()
+        raise
 
-    payload = {'gallery_name': gallery_name}
-    response = requests.post(_gallery_base_url, json=payload, headers=auth_headers)
-    json_response = response.json()
-    if response.status_code != 200 or 'Errors' in json_response:
-        raise exceptions.ServiceRequestError(response.status_code, json_response, payload)
 
-    return KairosFaceGallery(gallery_name, json_response['subject_ids'])
+def _error_code(response_msg):
+    try:
+        return response_msg['Errors'][0]['ErrCode']
+    except (KeyError, IndexError, TypeError):
+        return None
 
 
 def _validate_gallery_name(gallery_name):
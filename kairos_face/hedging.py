@@ -0,0 +1,121 @@
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from kairos_face.client import _READ_ONLY_ENDPOINTS
+
+_DEFAULT_MAX_WORKERS = 32
+
+
+class HedgingPolicy:
+    def __init__(self, percentile=95, budget=0.05, min_delay=0.05, min_samples=20, window=1000,
+                 endpoints=_READ_ONLY_ENDPOINTS, max_workers=None):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.endpoints = endpoints
+        self.requests = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.max_workers = max_workers
+        self._reserved_workers = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def reserve_workers(self, connections):
+        # Called by each client using the policy: without max_workers, there are enough threads for every
+        # connection of those clients to have a hedge in flight
+        with self._lock:
+            self._reserved_workers += connections
+            # A bigger executor is made on the next call; the old one isn't shut down, since a call may be
+            # submitting to it right now, and its threads exit once it's no longer referenced
+            if self.max_workers is None:
+                self._executor = None
+
+    def call(self, endpoint, func):
+        if endpoint not in self.endpoints:
+            return func()
+
+        with self._lock:
+            self.requests += 1
+            delay = self._hedge_delay(endpoint)
+            can_hedge = delay is not None and self._can_spend_budget()
+            executor = self._get_executor() if can_hedge else None
+        # Requests that couldn't be hedged anyway are sent from the caller's thread
+        if not can_hedge:
+            return self._timed(endpoint, func)
+
+        # The first request gets a thread of its own rather than one of the executor's, so it's never queued behind
+        # other callers' requests and hedging doesn't cap how many requests are in flight. It can't be sent from the
+        # caller's thread, which must be free to return the hedge's response if that one arrives first.
+        first = Future()
+        threading.Thread(target=self._run, args=(first, endpoint, func), name='kairos-hedging-first',
+                         daemon=True).start()
+        if wait([first], timeout=delay).done or not self._spend_budget():
+            return first.result()
+
+        hedge = executor.submit(self._timed, endpoint, func)
+        pending = {first, hedge}
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+                    continue
+                # The slower request can't be aborted once it's being sent, it only stops being waited for
+                for other in pending:
+                    other.cancel()
+                if future is hedge:
+                    with self._lock:
+                        self.hedges_won += 1
+                return future.result()
+        raise errors[0]
+
+    def _run(self, future, endpoint, func):
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(self._timed(endpoint, func))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _timed(self, endpoint, func):
+        started_at = time.monotonic()
+        result = func()
+        latency = time.monotonic() - started_at
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+        return result
+
+    def _hedge_delay(self, endpoint):
+        latencies = self._latencies[endpoint]
+        if len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100.0))
+        return max(self.min_delay, ordered[index])
+
+    def _can_spend_budget(self):
+        return self.hedges + 1 <= self.budget * self.requests
+
+    def _spend_budget(self):
+        with self._lock:
+            if not self._can_spend_budget():
+                return False
+            self.hedges += 1
+            return True
+
+    def _get_executor(self):
+        if self._executor is None:
+            max_workers = self.max_workers or self._reserved_workers or _DEFAULT_MAX_WORKERS
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kairos-hedging')
+        return self._executor
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
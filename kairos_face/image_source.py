@@ -0,0 +1,99 @@
+import base64
+import io
+import os
+import threading
+import time
+
+from kairos_face.encoding import _CHUNK_SIZE, Base64Contents, Base64File, add_stage_time
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class ImageSource(Base64Contents):
+    def __init__(self, image, frame_format='JPEG', jpeg_quality=90, channel_order='RGB'):
+        self.image = image
+        self.frame_format = frame_format
+        self.jpeg_quality = jpeg_quality
+        self.channel_order = channel_order
+        self._image_bytes = None
+        self._encoded = None
+        self._lock = threading.Lock()
+
+    def encode(self):
+        with self._lock:
+            if self._encoded is None:
+                self._encoded = base64.b64encode(self._read_image_bytes()).decode('ascii')
+            return self._encoded
+
+    def encode_with_timings(self, stages):
+        # Reading and encoding happen together, and only the first time
+        started_at = time.perf_counter()
+        encoded = self.encode()
+        add_stage_time(stages, 'encode', time.perf_counter() - started_at)
+        return encoded
+
+    def iter_encoded(self):
+        if self._encoded is not None:
+            encoded = self._encoded.encode('ascii')
+            encoded_chunk_size = _CHUNK_SIZE // 3 * 4
+            for start in range(0, len(encoded), encoded_chunk_size):
+                yield encoded[start:start + encoded_chunk_size]
+        else:
+            yield from super().iter_encoded()
+
+    def open(self):
+        with self._lock:
+            return io.BytesIO(self._read_image_bytes())
+
+    def size(self):
+        with self._lock:
+            return len(self._read_image_bytes())
+
+    def _read_image_bytes(self):
+        if self._image_bytes is None:
+            self._image_bytes = _image_bytes(self.image, self.frame_format, self.jpeg_quality, self.channel_order)
+        return self._image_bytes
+
+    def __repr__(self):
+        return '<ImageSource of {}>'.format(type(self.image).__name__)
+
+
+def image_contents(file):
+    if isinstance(file, Base64Contents):
+        return file
+    if isinstance(file, (str, os.PathLike)):
+        return Base64File(file)
+    return ImageSource(file)
+
+
+def _image_bytes(image, frame_format, jpeg_quality, channel_order):
+    if isinstance(image, bytes):
+        return image
+    if hasattr(image, 'read'):
+        return image.read()
+    if _is_frame(image):
+        return _encode_frame(image, frame_format, jpeg_quality, channel_order)
+    return memoryview(image).cast('B').tobytes()
+
+
+def _is_frame(image):
+    # Only arrays are pixels: other buffers, memoryviews with several dimensions included, are image file contents
+    return hasattr(image, '__array_interface__') and image.ndim > 1
+
+
+def _encode_frame(frame, frame_format, jpeg_quality, channel_order):
+    if Image is None:
+        raise ImportError('Encoding image frames requires the Pillow package')
+
+    if channel_order == 'BGR':
+        frame = frame[..., ::-1]
+    output = io.BytesIO()
+    image = Image.fromarray(frame)
+    if frame_format.upper() == 'JPEG':
+        image.save(output, format=frame_format, quality=jpeg_quality)
+    else:
+        image.save(output, format=frame_format)
+    return output.getvalue()
@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+import time
+
+_SUCCEEDED = 'succeeded'
+_FAILED = 'failed'
+
+
+class JobJournal:
+    # Records the outcome of each item of a bulk operation, so a run that was interrupted can be started
+    # again and skip the items that already succeeded. Outcomes are buffered and written in batches; the
+    # ones still buffered when the process dies are lost, so at most batch_size items are sent again.
+    def __init__(self, path, job='default', batch_size=500, flush_interval=1.0):
+        self.path = path
+        self.job = job
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS items ('
+                                     'job TEXT, key TEXT, status TEXT, error TEXT, updated_at REAL, '
+                                     'PRIMARY KEY (job, key))')
+        self._succeeded = {row[0] for row in self._connection.execute(
+            'SELECT key FROM items WHERE job = ? AND status = ?', (job, _SUCCEEDED))}
+
+    def succeeded(self, key):
+        with self._lock:
+            return key in self._succeeded
+
+    def record(self, key, error=None):
+        with self._lock:
+            if error is None:
+                self._succeeded.add(key)
+            else:
+                self._succeeded.discard(key)
+            self._pending.append((self.job, key, _SUCCEEDED if error is None else _FAILED,
+                                  None if error is None else str(error), time.time()))
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._flushed_at >= self.flush_interval:
+                self._flush()
+
+    def failed_keys(self):
+        self.flush()
+        with self._lock:
+            return [row[0] for row in self._connection.execute(
+                'SELECT key FROM items WHERE job = ? AND status = ? ORDER BY key', (self.job, _FAILED))]
+
+    def counts(self):
+        self.flush()
+        with self._lock:
+            return dict(self._connection.execute('SELECT status, COUNT(*) FROM items WHERE job = ? GROUP BY status',
+                                                 (self.job,)).fetchall())
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            with self._connection:
+                self._connection.executemany('INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?)', self._pending)
+            self._pending = []
+        self._flushed_at = time.monotonic()
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._pending = []
+            self._succeeded = set()
+            self._connection.execute('DELETE FROM items WHERE job = ?', (self.job,))
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
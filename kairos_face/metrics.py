@@ -0,0 +1,107 @@
+import bisect
+import collections
+import threading
+
+_DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+RequestMetrics = collections.namedtuple('RequestMetrics', ['endpoint', 'status_code', 'error', 'latency',
+                                                           'request_bytes', 'response_bytes', 'stages'])
+
+
+class _Histogram:
+    def __init__(self, bucket_count):
+        self.counts = [0] * (bucket_count + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    def __init__(self, buckets=_DEFAULT_BUCKETS, hooks=()):
+        self.buckets = tuple(sorted(buckets))
+        self.hooks = list(hooks)
+        self._latencies = {}
+        self._requests = collections.Counter()
+        self._errors = collections.Counter()
+        self._request_bytes = collections.Counter()
+        self._response_bytes = collections.Counter()
+        self._stage_seconds = collections.Counter()
+        self._stage_counts = collections.Counter()
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def record(self, request_metrics):
+        endpoint = request_metrics.endpoint or 'unknown'
+        status = _status_label(request_metrics.status_code)
+        with self._lock:
+            histogram = self._latencies.get(endpoint)
+            if histogram is None:
+                histogram = self._latencies[endpoint] = _Histogram(len(self.buckets))
+            histogram.counts[bisect.bisect_left(self.buckets, request_metrics.latency)] += 1
+            histogram.sum += request_metrics.latency
+            histogram.count += 1
+            self._requests[endpoint, status] += 1
+            if request_metrics.error is not None:
+                self._errors[endpoint, status] += 1
+            self._request_bytes[endpoint] += request_metrics.request_bytes
+            self._response_bytes[endpoint] += request_metrics.response_bytes
+            for stage, seconds in request_metrics.stages.items():
+                self._stage_seconds[endpoint, stage] += seconds
+                self._stage_counts[endpoint, stage] += 1
+
+        for hook in self.hooks:
+            hook(request_metrics)
+
+    def record_stage(self, endpoint, stage, seconds):
+        # For stages that run once per request rather than once per attempt, such as preprocessing.
+        # They're exported with the other stages but aren't passed to the hooks.
+        with self._lock:
+            self._stage_seconds[endpoint, stage] += seconds
+            self._stage_counts[endpoint, stage] += 1
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            lines.append('# HELP kairos_request_duration_seconds Latency of Kairos API requests')
+            lines.append('# TYPE kairos_request_duration_seconds histogram')
+            for endpoint, histogram in sorted(self._latencies.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append('kairos_request_duration_seconds_bucket{{endpoint="{}",le="{}"}} {}'
+                                 .format(endpoint, le, cumulative))
+                lines.append('kairos_request_duration_seconds_sum{{endpoint="{}"}} {}'.format(endpoint, histogram.sum))
+                lines.append('kairos_request_duration_seconds_count{{endpoint="{}"}} {}'
+                             .format(endpoint, histogram.count))
+
+            _append_counter(lines, 'kairos_requests_total', 'Kairos API requests by response status',
+                            ('endpoint', 'status'), self._requests)
+            _append_counter(lines, 'kairos_request_errors_total', 'Failed Kairos API requests by response status',
+                            ('endpoint', 'status'), self._errors)
+            _append_counter(lines, 'kairos_request_bytes_total', 'Bytes sent in Kairos API request bodies',
+                            ('endpoint',), self._request_bytes)
+            _append_counter(lines, 'kairos_response_bytes_total', 'Bytes received in Kairos API response bodies',
+                            ('endpoint',), self._response_bytes)
+            _append_counter(lines, 'kairos_stage_seconds_total', 'Time spent in each stage of Kairos API requests',
+                            ('endpoint', 'stage'), self._stage_seconds)
+            _append_counter(lines, 'kairos_stage_count_total', 'Times each stage of Kairos API requests ran',
+                            ('endpoint', 'stage'), self._stage_counts)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _append_counter(lines, name, description, label_names, counter):
+    lines.append('# HELP {} {}'.format(name, description))
+    lines.append('# TYPE {} counter'.format(name))
+    for labels, value in sorted(counter.items()):
+        if not isinstance(labels, tuple):
+            labels = (labels,)
+        label_pairs = ','.join('{}="{}"'.format(label_name, label_value)
+                               for label_name, label_value in zip(label_names, labels))
+        lines.append('{}{{{}}} {}'.format(name, label_pairs, value))
+
+
+def _status_label(status_code):
+    return 'none' if status_code is None else str(status_code)
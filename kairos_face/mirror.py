@@ -0,0 +1,109 @@
+import threading
+import time
+
+from kairos_face.client import _resolve_client
+from kairos_face.gallery import _fetch_subject_ids
+
+
+class _MirroredGallery:
+    def __init__(self):
+        self.subjects = None
+        self.loaded_at = None
+        self.refreshing = False
+        self.changes_during_refresh = []
+
+
+class GalleryMirror:
+    def __init__(self, client=None, max_staleness=300, background_refresh=True):
+        self.client = _resolve_client(client)
+        self.max_staleness = max_staleness
+        self.background_refresh = background_refresh
+        self._galleries = {}
+        self._lock = threading.Lock()
+        self.client.add_gallery_observer(self)
+
+    def contains(self, gallery_name, subject_id):
+        mirrored = self._loaded_gallery(gallery_name)
+        with self._lock:
+            return subject_id in mirrored.subjects
+
+    def subjects(self, gallery_name):
+        mirrored = self._loaded_gallery(gallery_name)
+        with self._lock:
+            return set(mirrored.subjects)
+
+    def refresh(self, gallery_name):
+        with self._lock:
+            mirrored = self._galleries.setdefault(gallery_name, _MirroredGallery())
+            mirrored.refreshing = True
+            mirrored.changes_during_refresh = []
+        try:
+            subjects = self._fetch_subjects(gallery_name)
+        except Exception:
+            with self._lock:
+                mirrored.refreshing = False
+            raise
+
+        # Enrolls and removals that happened while the gallery was being fetched may or may not
+        # be part of the fetched list, so they're applied again on top of it.
+        with self._lock:
+            for change in mirrored.changes_during_refresh:
+                change(subjects)
+            mirrored.subjects = subjects
+            mirrored.loaded_at = time.monotonic()
+            mirrored.refreshing = False
+            mirrored.changes_during_refresh = []
+
+    def gallery_changed(self, endpoint, payload):
+        gallery_name = payload['gallery_name']
+        if endpoint == 'enroll':
+            change = _adding(payload['subject_id'])
+        elif endpoint == 'gallery/remove_subject':
+            change = _discarding(payload['subject_id'])
+        elif endpoint == 'gallery/remove':
+            change = set.clear
+        else:
+            return
+
+        with self._lock:
+            mirrored = self._galleries.get(gallery_name)
+            if mirrored is None:
+                return
+            if mirrored.subjects is not None:
+                change(mirrored.subjects)
+            if mirrored.refreshing:
+                mirrored.changes_during_refresh.append(change)
+
+    def _loaded_gallery(self, gallery_name):
+        with self._lock:
+            mirrored = self._galleries.get(gallery_name)
+            loaded = mirrored is not None and mirrored.subjects is not None
+            stale = loaded and time.monotonic() - mirrored.loaded_at > self.max_staleness
+            refresh_in_background = stale and self.background_refresh and not mirrored.refreshing
+            if refresh_in_background:
+                mirrored.refreshing = True
+
+        if not loaded or (stale and not self.background_refresh):
+            self.refresh(gallery_name)
+        elif refresh_in_background:
+            threading.Thread(target=self._refresh_quietly, args=(gallery_name,), daemon=True).start()
+
+        return self._galleries[gallery_name]
+
+    def _refresh_quietly(self, gallery_name):
+        # A failed background refresh leaves the current contents in place until the next stale read
+        try:
+            self.refresh(gallery_name)
+        except Exception:
+            pass
+
+    def _fetch_subjects(self, gallery_name):
+        return set(_fetch_subject_ids(gallery_name, self.client))
+
+
+def _adding(subject_id):
+    return lambda subjects: subjects.add(subject_id)
+
+
+def _discarding(subject_id):
+    return lambda subjects: subjects.discard(subject_id)
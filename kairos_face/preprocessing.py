@@ -0,0 +1,68 @@
+import io
+import threading
+
+from kairos_face.encoding import Base64Bytes, Base64File
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+class ImagePreprocessor:
+    def __init__(self, max_dimension=1024, jpeg_quality=85, normalize_orientation=True, on_processed=None):
+        if Image is None:
+            raise ImportError('ImagePreprocessor requires the Pillow package')
+
+        self.max_dimension = max_dimension
+        self.jpeg_quality = jpeg_quality
+        self.normalize_orientation = normalize_orientation
+        self.on_processed = on_processed
+        self.images_processed = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self._stats_lock = threading.Lock()
+
+    def process_payload(self, payload):
+        return {key: self._process_contents(value) if isinstance(value, Base64File) else value
+                for key, value in payload.items()}
+
+    def process(self, image_bytes):
+        image = Image.open(io.BytesIO(image_bytes))
+        rotated = self.normalize_orientation and image.getexif().get(_EXIF_ORIENTATION_TAG, 1) != 1
+        if rotated:
+            image = ImageOps.exif_transpose(image)
+        resized = max(image.size) > self.max_dimension
+        if resized:
+            image.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+        if not rotated and not resized and image.format == 'JPEG':
+            return image_bytes
+
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=self.jpeg_quality)
+        processed = output.getvalue()
+        if not rotated and len(processed) >= len(image_bytes):
+            return image_bytes
+        return processed
+
+    def _process_contents(self, contents):
+        with contents.open() as fp:
+            original = fp.read()
+        try:
+            processed = self.process(original)
+        except Exception:
+            # Files Pillow can't read are uploaded untouched; the API may support formats Pillow doesn't
+            processed = original
+
+        with self._stats_lock:
+            self.images_processed += 1
+            self.bytes_before += len(original)
+            self.bytes_after += len(processed)
+        if self.on_processed is not None:
+            self.on_processed(contents.path, len(original), len(processed))
+
+        return Base64Bytes(processed)
@@ -1,32 +1,34 @@
-from kairos_face import exceptions, validate_settings, validate_file_and_url_presence
-from kairos_face import settings
-import requests
-import base64
+from kairos_face.client import _resolve_client
+from kairos_face.entities import RecognizeResult, keep_raw_response
+from kairos_face.image_source import image_contents
+from kairos_face.utils import validate_file_and_url_presence, validate_settings
 
-_recognize_base_url = settings.base_url + 'recognize'
+_recognize_endpoint = 'recognize'
 
 
-def recognize_face(gallery_name, url=None, file=None, additional_arguments={}):
-    validate_settings()
+def recognize_face(gallery_name, url=None, file=None, additional_arguments={}, client=None):
+    validate_settings(client)
     validate_file_and_url_presence(file, url)
 
-    auth_headers = {
-        'app_id': settings.app_id,
-        'app_key': settings.app_key
-    }
     payload = _build_payload(gallery_name, url, file, additional_arguments)
 
-    response = requests.post(_recognize_base_url, json=payload, headers=auth_headers)
-    json_response = response.json()
-    if response.status_code != 200 or 'Errors' in json_response:
-        raise exceptions.ServiceRequestError(response.status_code, json_response, payload)
+    return _resolve_client(client).post(_recognize_endpoint, payload)
+
+
+def recognize_face_object(gallery_name, url=None, file=None, additional_arguments={}, client=None):
+    client = _resolve_client(client)
+    validate_settings(client)
+    validate_file_and_url_presence(file, url)
+
+    payload = _build_payload(gallery_name, url, file, additional_arguments)
+    content = client.post(_recognize_endpoint, payload, stream_parser=keep_raw_response)
 
-    return json_response
+    return RecognizeResult(content, decoder=client.json_decoder)
 
 
 def _build_payload(gallery_name, url, file, additional_arguments):
     if file is not None:
-        image = _extract_base64_contents(file)
+        image = image_contents(file)
     else:
         image = url
 
@@ -36,8 +38,3 @@ def _build_payload(gallery_name, url, file, additional_arguments):
     }
 
     return dict(required_fields, **additional_arguments)
-
-
-def _extract_base64_contents(image_path):
-    with open(image_path, 'rb') as fp:
-        return base64.b64encode(fp.read()).decode('ascii')
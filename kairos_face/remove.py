@@ -1,27 +1,16 @@
-from kairos_face import exceptions, validate_settings
-from kairos_face import settings
-import requests
+from kairos_face.client import _resolve_client
+from kairos_face.utils import validate_settings
 
-_remove_base_url = settings.base_url + 'gallery/remove_subject'
+_remove_endpoint = 'gallery/remove_subject'
 
 
-def remove_face(subject_id, gallery_name):
-    validate_settings()
+def remove_face(subject_id, gallery_name, client=None):
+    validate_settings(client)
     _validate_arguments_presence(gallery_name, subject_id)
 
-    auth_headers = {
-        'app_id': settings.app_id,
-        'app_key': settings.app_key
-    }
-
     payload = _build_payload(gallery_name, subject_id)
 
-    response = requests.post(_remove_base_url, json=payload, headers=auth_headers)
-    json_response = response.json()
-    if response.status_code != 200 or 'Errors' in json_response:
-        raise exceptions.ServiceRequestError(response.status_code, json_response, payload)
-
-    return json_response
+    return _resolve_client(client).post(_remove_endpoint, payload)
 
 
 def _validate_arguments_presence(gallery_name, subject_id):
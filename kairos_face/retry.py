@@ -0,0 +1,94 @@
+import random
+import threading
+import time
+
+import requests
+
+from kairos_face import exceptions
+from kairos_face.client import _READ_ONLY_ENDPOINTS
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, backoff=0.2, max_backoff=5.0, max_retry_time=30.0,
+                 retry_statuses=(429, 500, 502, 503, 504), endpoints=_READ_ONLY_ENDPOINTS):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_time = max_retry_time
+        self.retry_statuses = retry_statuses
+        self.endpoints = endpoints
+
+    def call(self, endpoint, func):
+        if endpoint not in self.endpoints:
+            return func()
+
+        started_at = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except (exceptions.ServiceRequestError, requests.RequestException) as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e):
+                    raise
+                # Full jitter: concurrent callers that failed together don't all come back at once
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+                if time.monotonic() - started_at + delay > self.max_retry_time:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def is_retryable(self, error):
+        if isinstance(error, exceptions.ServiceRequestError):
+            return error.status_code in self.retry_statuses
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class _Circuit:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def before_call(self, endpoint):
+        with self._lock:
+            circuit = self._circuits.setdefault(endpoint, _Circuit())
+            if circuit.opened_at is None:
+                return
+            # Once the reset timeout is over, a single request is let through to probe whether the API is back
+            if circuit.probing or time.monotonic() - circuit.opened_at < self.reset_timeout:
+                raise exceptions.CircuitOpenError(endpoint)
+            circuit.probing = True
+
+    def record_success(self, endpoint):
+        with self._lock:
+            circuit = self._circuits[endpoint]
+            circuit.failures = 0
+            circuit.opened_at = None
+            circuit.probing = False
+
+    def record_failure(self, endpoint):
+        with self._lock:
+            circuit = self._circuits[endpoint]
+            circuit.failures += 1
+            if circuit.probing or circuit.failures >= self.failure_threshold:
+                circuit.opened_at = time.monotonic()
+            circuit.probing = False
+
+    def record_inconclusive(self, endpoint):
+        # The request failed before it could tell anything about the API, e.g. its image couldn't be read:
+        # the circuit stays as it was, and a probe that failed this way lets the next request probe instead
+        with self._lock:
+            self._circuits[endpoint].probing = False
+
+    def is_open(self, endpoint):
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            return circuit is not None and circuit.opened_at is not None
@@ -0,0 +1,267 @@
+import bisect
+import collections
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from kairos_face import exceptions
+from kairos_face.bulk import BulkItemResult, _image_arguments, _run_bulk
+from kairos_face.client import _resolve_client
+from kairos_face.enroll import enroll_face
+from kairos_face.entities import Candidate, RecognizeResult
+from kairos_face.gallery import _GALLERY_NOT_FOUND_ERROR_CODE, _error_code, _fetch_subject_ids, _validate_gallery_name
+from kairos_face.image_source import ImageSource, image_contents
+from kairos_face.recognize import recognize_face
+from kairos_face.remove import remove_face
+from kairos_face.utils import validate_file_and_url_presence, validate_settings
+
+ShardOperation = collections.namedtuple('ShardOperation', ['action', 'subject_id', 'gallery_name'])
+ShardRebalancePlan = collections.namedtuple('ShardRebalancePlan', ['shard_count', 'to_enroll', 'to_remove',
+                                                                   'unchanged'])
+
+
+class ShardRebalanceResult(collections.namedtuple('ShardRebalanceResult', ['plan', 'enrolled', 'removed',
+                                                                           'failures'])):
+    @property
+    def succeeded(self):
+        return not self.failures
+
+
+class ShardedGallery:
+    # Spreads the subjects of one large gallery over shard_count galleries named <gallery_name>-<index>, so
+    # each recognize call searches a smaller gallery. Subjects are placed by consistent hashing, so changing
+    # the number of shards only moves about 1/shard_count of them.
+    def __init__(self, gallery_name, shard_count, virtual_nodes=64, max_workers=32, client=None):
+        _validate_gallery_name(gallery_name)
+        if shard_count < 1:
+            raise ValueError('shard_count must be at least 1')
+
+        self.gallery_name = gallery_name
+        self.virtual_nodes = virtual_nodes
+        self.client = _resolve_client(client)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kairos-shards')
+        self._set_shard_count(shard_count)
+
+    @property
+    def shard_count(self):
+        return len(self._ring.shard_names)
+
+    @property
+    def shard_names(self):
+        return list(self._ring.shard_names)
+
+    def shard_for(self, subject_id):
+        return self._ring.shard_for(subject_id)
+
+    def enroll_face(self, subject_id, url=None, file=None, multiple_faces=False, additional_arguments={}):
+        return enroll_face(subject_id, self.shard_for(subject_id), url=url, file=file, multiple_faces=multiple_faces,
+                           additional_arguments=additional_arguments, client=self.client)
+
+    def remove_face(self, subject_id):
+        return remove_face(subject_id, self.shard_for(subject_id), client=self.client)
+
+    def recognize_face(self, url=None, file=None, top_k=10, additional_arguments={}):
+        # Every shard is searched at the same time and their candidates are merged into one ranking
+        validate_settings(self.client)
+        validate_file_and_url_presence(file, url)
+
+        image = _shared_image(file)
+        arguments = dict({'max_num_results': top_k}, **additional_arguments)
+        with self._lock:
+            shard_names = self._searched_shards
+        futures = [self._executor.submit(recognize_face, shard_name, url=url, file=image,
+                                         additional_arguments=arguments, client=self.client)
+                   for shard_name in shard_names]
+
+        return _merge_responses(_shard_responses(futures), top_k)
+
+    def recognize_face_object(self, url=None, file=None, top_k=10, additional_arguments={}):
+        return RecognizeResult(self.recognize_face(url, file, top_k, additional_arguments))
+
+    def plan_rebalance(self, shard_count):
+        # Subjects are looked up where they actually are, so a rebalance that was interrupted
+        # is planned from where it stopped
+        validate_settings(self.client)
+        target_ring = _HashRing(self.gallery_name, shard_count, self.virtual_nodes)
+        shard_names = sorted(set(self._ring.shard_names) | set(target_ring.shard_names))
+        locations = collections.defaultdict(set)
+        for shard_name in shard_names:
+            for subject_id in _fetch_subject_ids(shard_name, self.client):
+                locations[subject_id].add(shard_name)
+
+        to_enroll = []
+        to_remove = []
+        unchanged = 0
+        for subject_id in sorted(locations):
+            shards = locations[subject_id]
+            target = target_ring.shard_for(subject_id)
+            if target not in shards:
+                to_enroll.append(ShardOperation('enroll', subject_id, target))
+            to_remove.extend(ShardOperation('remove', subject_id, shard_name)
+                             for shard_name in sorted(shards - {target}))
+            if shards == {target}:
+                unchanged += 1
+
+        return ShardRebalancePlan(shard_count, to_enroll, to_remove, unchanged)
+
+    def rebalance(self, shard_count, images, max_workers=10, on_progress=None):
+        # Kairos can't move a face between galleries, so moved subjects are enrolled again from `images`,
+        # which maps subject IDs to their image like a sync_gallery manifest. A subject is only removed from
+        # its old shard once it's enrolled in the new one, and while the rebalance runs both the old and the
+        # new shards are searched, so every subject can be recognized throughout.
+        plan = self.plan_rebalance(shard_count)
+        target_ring = _HashRing(self.gallery_name, shard_count, self.virtual_nodes)
+        with self._lock:
+            self._searched_shards = sorted(set(self._ring.shard_names) | set(target_ring.shard_names))
+
+        def apply(operation):
+            if operation.action == 'remove':
+                return remove_face(operation.subject_id, operation.gallery_name, client=self.client)
+            return enroll_face(operation.subject_id, operation.gallery_name, client=self.client,
+                               **_image_arguments(images[operation.subject_id]))
+
+        failures = []
+        total = len(plan.to_enroll) + len(plan.to_remove)
+        progress = _Progress(total, failures, on_progress)
+        enrollable = [operation for operation in plan.to_enroll if operation.subject_id in images]
+        for operation in plan.to_enroll:
+            if operation.subject_id not in images:
+                progress.add(BulkItemResult(operation, None, ValueError(
+                    'No image to enroll {} with'.format(operation.subject_id))))
+        enrolled = sum(progress.add(result) for result in _run_bulk(apply, enrollable, max_workers))
+
+        # Subjects whose enrollment failed stay where they are, so they can still be recognized
+        not_moved = {result.item.subject_id for result in failures}
+        removable = [operation for operation in plan.to_remove if operation.subject_id not in not_moved]
+        removed = sum(progress.add(result) for result in _run_bulk(apply, removable, max_workers))
+
+        # After a partial failure both layouts stay searched until a later rebalance completes
+        if not failures:
+            with self._lock:
+                self._set_shard_count(shard_count)
+        return ShardRebalanceResult(plan, enrolled, removed, failures)
+
+    def _set_shard_count(self, shard_count):
+        self._ring = _HashRing(self.gallery_name, shard_count, self.virtual_nodes)
+        self._searched_shards = list(self._ring.shard_names)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _HashRing:
+    # Each shard owns virtual_nodes points of a 64-bit ring and a subject belongs to the shard owning
+    # the first point at or after its own hash. Adding a shard only takes points over, it never moves
+    # subjects between the shards that were already there.
+    def __init__(self, gallery_name, shard_count, virtual_nodes):
+        self.shard_names = ['{}-{}'.format(gallery_name, index) for index in range(shard_count)]
+        points = sorted((_hash('{}#{}'.format(shard_name, node)), shard_name)
+                        for shard_name in self.shard_names for node in range(virtual_nodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard_name for _, shard_name in points]
+
+    def shard_for(self, subject_id):
+        index = bisect.bisect_left(self._hashes, _hash(subject_id))
+        return self._owners[index % len(self._owners)]
+
+
+class _Progress:
+    def __init__(self, total, failures, on_progress):
+        self.total = total
+        self.completed = 0
+        self.failures = failures
+        self.on_progress = on_progress
+
+    def add(self, result):
+        self.completed += 1
+        if not result.succeeded:
+            self.failures.append(result)
+        if self.on_progress is not None:
+            self.on_progress(result, self.completed, self.total)
+        return result.succeeded
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _shared_image(file):
+    # The image is read and encoded once for all the shards
+    if file is None:
+        return None
+    image = image_contents(file)
+    return image if isinstance(image, ImageSource) else ImageSource(image.read())
+
+
+def _shard_responses(futures):
+    # A shard that holds no subjects yet doesn't exist as a gallery, and is the same as an empty one.
+    # Any other error fails the whole call, since a missing shard could hide the best match; it's only raised
+    # once every shard has answered, so no request of the call is still running when it returns.
+    wait(futures)
+    responses = []
+    missing_shard_errors = []
+    for future in futures:
+        try:
+            responses.append(future.result())
+        except exceptions.ServiceRequestError as e:
+            if _error_code(e.response_msg) != _GALLERY_NOT_FOUND_ERROR_CODE:
+                raise
+            missing_shard_errors.append(e)
+    if not responses:
+        raise missing_shard_errors[0]
+    return responses
+
+
+def _merge_responses(responses, top_k):
+    # Shards see the same image, so a face is matched across their responses by its bounding box
+    faces = collections.OrderedDict()
+    for response in responses:
+        for index, image in enumerate(response.get('images') or ()):
+            key = _face_key(image.get('transaction'), index)
+            faces.setdefault(key, _MergedFace()).add(image)
+
+    return {'images': [face.to_dict(top_k) for face in faces.values()]}
+
+
+def _face_key(transaction, index):
+    if not transaction or transaction.get('topLeftX') is None:
+        return index
+    return (transaction.get('topLeftX'), transaction.get('topLeftY'),
+            transaction.get('width'), transaction.get('height'))
+
+
+class _MergedFace:
+    def __init__(self):
+        self.transaction = None
+        self.transaction_confidence = -1.0
+        self.candidates = {}
+
+    def add(self, image):
+        # The transaction of the shard with the best match describes the face; failures only when no shard matched
+        transaction = image.get('transaction')
+        confidence = -1.0
+        if transaction and transaction.get('status') == 'success':
+            confidence = float(transaction.get('confidence') or 0)
+        if self.transaction is None or confidence > self.transaction_confidence:
+            self.transaction = transaction
+            self.transaction_confidence = confidence
+        # A subject is only in two shards in the middle of a rebalance; its best match is kept
+        for candidate in image.get('candidates') or ():
+            parsed = Candidate.from_dict(candidate)
+            known = self.candidates.get(parsed.subject_id)
+            if known is None or float(parsed.confidence or 0) > known[0]:
+                self.candidates[parsed.subject_id] = (float(parsed.confidence or 0), candidate)
+
+    def to_dict(self, top_k):
+        merged = {'transaction': self.transaction}
+        if self.candidates:
+            ranked = sorted(self.candidates.values(), key=lambda candidate: candidate[0], reverse=True)
+            merged['candidates'] = [candidate for _, candidate in ranked[:top_k]]
+        return merged
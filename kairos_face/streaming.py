@@ -0,0 +1,96 @@
+import codecs
+import json
+import re
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',:]}'
+_decoder = json.JSONDecoder()
+# Strings without escapes, followed by the separator after them, are matched directly instead of going through
+# the JSON decoder; subject IDs almost always are such strings.
+_PLAIN_STRING_ITEM = re.compile(r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*([,\]])')
+
+
+class _ChunkReader:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.exhausted = False
+
+    def read_more(self):
+        # Drops what was already parsed, so only the value being parsed is kept in memory
+        chunk = next(self._chunks, None)
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        if chunk is None:
+            self.exhausted = True
+            self.buffer += self._utf8.decode(b'', final=True)
+            return False
+        self.buffer += self._utf8.decode(chunk)
+        return True
+
+    def peek(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in _WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                raise ValueError('Unexpected end of JSON document')
+
+    def expect(self, characters):
+        character = self.peek()
+        if character not in characters:
+            raise ValueError('Expected one of {!r} in JSON document, found {!r}'.format(characters, character))
+        self.position += 1
+        return character
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+                continue
+            # A number is only complete once what follows it is in the buffer: "12." may continue as "12.5"
+            if not self.exhausted and (end == len(self.buffer) or self.buffer[end] not in _DELIMITERS):
+                self.read_more()
+                continue
+            self.position = end
+            return value
+
+
+def parse_streamed_array(chunks, key, on_item):
+    # Parses a JSON object from chunks of bytes, passing each item of its `key` array to on_item as soon as
+    # it's read instead of building the array. Returns the object's other fields.
+    reader = _ChunkReader(chunks)
+    fields = {}
+    reader.expect('{')
+    if reader.peek() == '}':
+        return fields
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.expect(']')
+            else:
+                while True:
+                    match = _PLAIN_STRING_ITEM.match(reader.buffer, reader.position)
+                    if match is not None:
+                        reader.position = match.end()
+                        on_item(match.group(1))
+                        if match.group(2) == ']':
+                            break
+                        continue
+                    on_item(reader.value())
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            fields[name] = reader.value()
+        if reader.expect(',}') == '}':
+            return fields
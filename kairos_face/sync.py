@@ -0,0 +1,60 @@
+import collections
+
+from kairos_face.bulk import _image_arguments, _run_bulk
+from kairos_face.client import _resolve_client
+from kairos_face.enroll import enroll_face
+from kairos_face.gallery import _fetch_subject_ids, _validate_gallery_name
+from kairos_face.remove import remove_face
+from kairos_face.utils import validate_settings
+
+GallerySyncPlan = collections.namedtuple('GallerySyncPlan', ['gallery_name', 'to_enroll', 'to_remove', 'unchanged'])
+SyncOperation = collections.namedtuple('SyncOperation', ['action', 'subject_id'])
+
+
+class GallerySyncResult(collections.namedtuple('GallerySyncResult', ['plan', 'enrolled', 'removed', 'failures'])):
+    @property
+    def succeeded(self):
+        return not self.failures
+
+
+def plan_gallery_sync(gallery_name, manifest, remove_missing=True, client=None):
+    # The manifest maps each subject ID that should be in the gallery to its image: a URL, a file,
+    # or a dict of enroll_face arguments. Subjects are compared by ID only, so a subject whose image
+    # changed has to be removed from the gallery to be enrolled again.
+    validate_settings(client)
+    _validate_gallery_name(gallery_name)
+
+    remote_subjects = _fetch_subject_ids(gallery_name, _resolve_client(client))
+    local_subjects = frozenset(manifest)
+    to_enroll = sorted(local_subjects - remote_subjects)
+    to_remove = sorted(remote_subjects - local_subjects) if remove_missing else []
+
+    return GallerySyncPlan(gallery_name, to_enroll, to_remove, len(local_subjects & remote_subjects))
+
+
+def sync_gallery(gallery_name, manifest, max_workers=10, dry_run=False, remove_missing=True,
+                 on_progress=None, client=None):
+    client = _resolve_client(client)
+    plan = plan_gallery_sync(gallery_name, manifest, remove_missing, client)
+    if dry_run:
+        return GallerySyncResult(plan, 0, 0, [])
+
+    def apply(operation):
+        if operation.action == 'remove':
+            return remove_face(operation.subject_id, gallery_name, client=client)
+        return enroll_face(operation.subject_id, gallery_name, client=client,
+                           **_image_arguments(manifest[operation.subject_id]))
+
+    operations = [SyncOperation('remove', subject_id) for subject_id in plan.to_remove] + \
+        [SyncOperation('enroll', subject_id) for subject_id in plan.to_enroll]
+    applied = collections.Counter()
+    failures = []
+    for completed, result in enumerate(_run_bulk(apply, operations, max_workers), 1):
+        if result.succeeded:
+            applied[result.item.action] += 1
+        else:
+            failures.append(result)
+        if on_progress is not None:
+            on_progress(result, completed, len(operations))
+
+    return GallerySyncResult(plan, applied['enroll'], applied['remove'], failures)
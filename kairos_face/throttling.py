@@ -0,0 +1,108 @@
+import collections
+import threading
+import time
+
+_SECONDS_PER_DAY = 24 * 3600
+
+
+class _TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def reserve(self, now):
+        # Tokens may go negative: each caller reserves its token and waits for the bucket to refill up to it
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+
+class _SlidingWindow:
+    # Remembers when the last limit requests were sent: a request may only be sent once the one limit requests
+    # before it is period seconds old, so no period ever holds more than limit requests. A token bucket would let
+    # a full bucket through and refill another one within the same period.
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+        self.sent_at = collections.deque(maxlen=limit)
+
+    def delay(self, now):
+        if len(self.sent_at) < self.limit:
+            return 0.0
+        return max(0.0, self.sent_at[0] + self.period - now)
+
+    def record(self, sent_at):
+        self.sent_at.append(sent_at)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second=None, requests_per_day=None, burst=None):
+        self._bucket = None
+        self._daily_window = None
+        if requests_per_second is not None:
+            self._bucket = _TokenBucket(requests_per_second, burst or requests_per_second)
+        if requests_per_day is not None:
+            self._daily_window = _SlidingWindow(requests_per_day, _SECONDS_PER_DAY)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self._daily_window is not None:
+                delay = self._daily_window.delay(now)
+            if self._bucket is not None:
+                delay = max(delay, self._bucket.reserve(now))
+            if self._daily_window is not None:
+                self._daily_window.record(now + delay)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, initial_limit=10, min_limit=1, max_limit=200,
+                 backoff_ratio=0.5, latency_tolerance=2.0, smoothing=0.1):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.baseline_latency = None
+        self._last_backoff_at = None
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency, overloaded=False):
+        with self._condition:
+            self.in_flight -= 1
+            slow = self.baseline_latency is not None and latency > self.latency_tolerance * self.baseline_latency
+            if overloaded or slow:
+                self._back_off(latency)
+            else:
+                # Additive increase: the limit grows by about one for every limit requests that succeed
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            if not overloaded:
+                if self.baseline_latency is None:
+                    self.baseline_latency = latency
+                else:
+                    self.baseline_latency += self.smoothing * (latency - self.baseline_latency)
+            self._condition.notify_all()
+
+    def _back_off(self, latency):
+        # Requests that were already in flight when the API got overloaded report it at about the
+        # same time, so the limit is only cut once per round trip.
+        now = time.monotonic()
+        round_trip = self.baseline_latency or latency
+        if self._last_backoff_at is None or now - self._last_backoff_at >= round_trip:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+            self._last_backoff_at = now
@@ -0,0 +1,152 @@
+import collections
+import itertools
+import time
+
+from kairos_face import exceptions
+from kairos_face.client import _resolve_client
+from kairos_face.detect import detect_face_object
+from kairos_face.entities import DetectResult, RecognizeResult
+from kairos_face.gallery import _error_code
+from kairos_face.image_source import image_contents
+from kairos_face.recognize import recognize_face_object
+from kairos_face.utils import validate_settings
+
+_NO_FACES_ERROR_CODE = 5002
+
+TrackedFace = collections.namedtuple('TrackedFace', ['track_id', 'box', 'subject_id', 'confidence', 'recognized'])
+
+
+class _Track:
+    __slots__ = ('track_id', 'box', 'subject_id', 'confidence', 'recognized_at', 'missed_frames')
+
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.box = box
+        self.subject_id = None
+        self.confidence = None
+        self.recognized_at = None
+        self.missed_frames = 0
+
+
+class FaceTracker:
+    # Follows faces from frame to frame by the overlap of the boxes detect_face finds, and only calls
+    # recognize_face when a new face shows up or a face's identity is too old; the other frames of a
+    # track get the identity it was last recognized as.
+    def __init__(self, gallery_name, iou_threshold=0.3, max_missed_frames=5, recognition_ttl=10.0,
+                 retry_interval=1.0, additional_arguments={}, client=None):
+        validate_settings(client)
+        self.gallery_name = gallery_name
+        self.iou_threshold = iou_threshold
+        self.max_missed_frames = max_missed_frames
+        self.recognition_ttl = recognition_ttl
+        self.retry_interval = retry_interval
+        self.additional_arguments = additional_arguments
+        self.client = _resolve_client(client)
+        self.frames_processed = 0
+        self.recognize_calls = 0
+        self._tracks = []
+        self._track_ids = itertools.count(1)
+
+    def process(self, frame, timestamp=None):
+        now = time.monotonic() if timestamp is None else timestamp
+        # Detecting and recognizing share the image, so it's only read and encoded once
+        image = image_contents(frame)
+        boxes = [_box(face) for face in _no_faces_as_empty(DetectResult, detect_face_object,
+                                                           file=image, client=self.client).faces]
+        self.frames_processed += 1
+
+        current_tracks = self._associate(boxes)
+        stale_tracks = [track for track in current_tracks if self._needs_recognition(track, now)]
+        if stale_tracks:
+            self._recognize(image, stale_tracks, now)
+
+        return [TrackedFace(track.track_id, track.box, track.subject_id, track.confidence,
+                            track in stale_tracks) for track in current_tracks]
+
+    def reset(self):
+        self._tracks = []
+
+    def _associate(self, boxes):
+        matches = _match_boxes([track.box for track in self._tracks], boxes, self.iou_threshold)
+        current_tracks = []
+        for track_index, track in enumerate(self._tracks):
+            box_index = matches.get(track_index)
+            if box_index is None:
+                track.missed_frames += 1
+                continue
+            track.box = boxes[box_index]
+            track.missed_frames = 0
+            current_tracks.append(track)
+        matched_boxes = set(matches.values())
+        for box_index, box in enumerate(boxes):
+            if box_index not in matched_boxes:
+                track = _Track(next(self._track_ids), box)
+                self._tracks.append(track)
+                current_tracks.append(track)
+        # Faces that went undetected for a few frames are kept, so a missed detection doesn't start a new track
+        self._tracks = [track for track in self._tracks if track.missed_frames <= self.max_missed_frames]
+        return current_tracks
+
+    def _needs_recognition(self, track, now):
+        if track.recognized_at is None:
+            return True
+        ttl = self.recognition_ttl if track.subject_id is not None else self.retry_interval
+        return now - track.recognized_at >= ttl
+
+    def _recognize(self, image, tracks, now):
+        # One call recognizes every face in the frame; its faces are matched to the tracks by their boxes
+        self.recognize_calls += 1
+        result = _no_faces_as_empty(RecognizeResult, recognize_face_object, self.gallery_name, file=image,
+                                    additional_arguments=self.additional_arguments, client=self.client)
+        transactions = [face.transaction for face in result.images or () if face.transaction is not None]
+        matches = _match_boxes([track.box for track in tracks], [_box(transaction) for transaction in transactions],
+                               self.iou_threshold)
+        for track_index, track in enumerate(tracks):
+            track.recognized_at = now
+            transaction = transactions[matches[track_index]] if track_index in matches else None
+            if transaction is not None and transaction.status == 'success':
+                track.subject_id = transaction.subject_id
+                track.confidence = transaction.confidence
+            else:
+                track.subject_id = None
+                track.confidence = None
+
+
+def _no_faces_as_empty(result_class, func, *args, **kwargs):
+    # The API answers a frame without faces with an error, which for a video stream is just an empty frame
+    try:
+        return func(*args, **kwargs)
+    except exceptions.ServiceRequestError as e:
+        if _error_code(e.response_msg) == _NO_FACES_ERROR_CODE:
+            return result_class({'images': []})
+        raise
+
+
+def _box(face):
+    return face.top_left_x or 0, face.top_left_y or 0, face.width or 0, face.height or 0
+
+
+def _match_boxes(first_boxes, second_boxes, iou_threshold):
+    # Greedily pairs the most overlapping boxes first; returns the index of the matched second box by first box
+    pairs = sorted(((iou(first, second), i, j) for i, first in enumerate(first_boxes)
+                    for j, second in enumerate(second_boxes)), reverse=True)
+    matches = {}
+    matched_second = set()
+    for overlap, i, j in pairs:
+        if overlap < iou_threshold:
+            break
+        if i not in matches and j not in matched_second:
+            matches[i] = j
+            matched_second.add(j)
+    return matches
+
+
+def iou(first, second):
+    # Intersection over union of two (left, top, width, height) boxes
+    left = max(first[0], second[0])
+    top = max(first[1], second[1])
+    right = min(first[0] + first[2], second[0] + second[2])
+    bottom = min(first[1] + first[3], second[1] + second[3])
+    intersection = max(0, right - left) * max(0, bottom - top)
+    union = first[2] * first[3] + second[2] * second[3] - intersection
+    return intersection / float(union) if union > 0 else 0.0
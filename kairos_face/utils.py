@@ -2,14 +2,25 @@ from kairos_face import settings, exceptions
 
 
 def validate_file_and_url_presence(file, url):
-    if not file and not url:
+    if _is_empty(file) and _is_empty(url):
         raise ValueError('An image file or valid URL must be passed')
-    if file and url:
+    if not _is_empty(file) and not _is_empty(url):
         raise ValueError('Cannot receive both a file and URL as arguments')
 
 
-def validate_settings():
+def validate_settings(client=None):
+    # Clients with a credential pool don't use the app_id and app_key in settings
+    if client is None:
+        from kairos_face.client import get_default_client
+        client = get_default_client()
+    if getattr(client, 'credential_pool', None) is not None:
+        return
     if settings.app_id is None:
         raise exceptions.SettingsNotPresentException('Kairos app_id was not set')
     if settings.app_key is None:
         raise exceptions.SettingsNotPresentException('Kairos app_key was not set')
+
+
+def _is_empty(value):
+    # Image sources such as NumPy arrays can't be tested for truthiness
+    return value is None or (isinstance(value, (str, bytes)) and len(value) == 0)
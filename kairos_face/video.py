@@ -0,0 +1,138 @@
+import collections
+import queue
+import threading
+import time
+
+from kairos_face.client import _resolve_client
+from kairos_face.image_source import ImageSource
+from kairos_face.recognize import recognize_face
+from kairos_face.utils import validate_settings
+
+FrameResult = collections.namedtuple('FrameResult', ['timestamp', 'response', 'error', 'latency'])
+
+_CLOSED = object()
+
+
+class _Frame:
+    __slots__ = ('image', 'timestamp', 'sequence', 'submitted_at')
+
+    def __init__(self, image, timestamp, sequence, submitted_at):
+        self.image = image
+        self.timestamp = timestamp
+        self.sequence = sequence
+        self.submitted_at = submitted_at
+
+
+class FrameRecognizer:
+    # Recognizes faces in a live stream of frames. Frames aren't queued: each submitted frame replaces the
+    # one waiting to be sent, so whenever a worker becomes free it sends the newest frame and latency stays
+    # bounded however fast frames arrive.
+    def __init__(self, gallery_name, concurrency=2, min_interval=0.0, max_frame_age=None, on_result=None,
+                 additional_arguments={}, frame_format='JPEG', jpeg_quality=90, channel_order='RGB', client=None):
+        validate_settings(client)
+        self.gallery_name = gallery_name
+        self.min_interval = min_interval
+        self.max_frame_age = max_frame_age
+        self.on_result = on_result
+        self.additional_arguments = additional_arguments
+        self.frame_format = frame_format
+        self.jpeg_quality = jpeg_quality
+        self.channel_order = channel_order
+        self.client = _resolve_client(client)
+        self.frames_submitted = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.results_dropped = 0
+        self._latest = None
+        self._next_send_at = 0.0
+        self._last_delivered = -1
+        self._closed = False
+        self._condition = threading.Condition()
+        self._deliver_lock = threading.Lock()
+        self._results = queue.Queue()
+        self._workers = [threading.Thread(target=self._work, name='kairos-frames-{}'.format(i), daemon=True)
+                         for i in range(concurrency)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, frame, timestamp=None):
+        # Never blocks; timestamp defaults to the time the frame was submitted
+        with self._condition:
+            if self._closed:
+                raise ValueError('Cannot submit frames to a closed FrameRecognizer')
+            if self._latest is not None:
+                self.frames_dropped += 1
+            self._latest = _Frame(frame, time.time() if timestamp is None else timestamp,
+                                  self.frames_submitted, time.monotonic())
+            self.frames_submitted += 1
+            self._condition.notify()
+
+    def results(self):
+        # Yields results until the recognizer is closed; only used when there's no on_result callback
+        while True:
+            result = self._results.get()
+            if result is _CLOSED:
+                return
+            yield result
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+        self._results.put(_CLOSED)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _work(self):
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                return
+            image = ImageSource(frame.image, self.frame_format, self.jpeg_quality, self.channel_order)
+            try:
+                response = recognize_face(self.gallery_name, file=image,
+                                          additional_arguments=self.additional_arguments, client=self.client)
+                error = None
+            except Exception as e:
+                # Any error, including a frame that can't be encoded, is only the error of that frame's result:
+                # letting it end the worker would stop the recognizer
+                response, error = None, e
+            self._deliver(frame, FrameResult(frame.timestamp, response, error, time.monotonic() - frame.submitted_at))
+
+    def _next_frame(self):
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                now = time.monotonic()
+                frame = self._latest
+                if frame is not None and self.max_frame_age is not None \
+                        and now - frame.submitted_at > self.max_frame_age:
+                    self._latest = None
+                    self.frames_dropped += 1
+                elif frame is not None and now >= self._next_send_at:
+                    self._latest = None
+                    self._next_send_at = now + self.min_interval
+                    self.frames_sent += 1
+                    return frame
+                timeout = None if frame is None else self._next_send_at - now
+                self._condition.wait(timeout)
+
+    def _deliver(self, frame, result):
+        # With several requests in flight, a newer frame's result can arrive first; the older one is dropped then.
+        # Results are delivered under their own lock, so a slow on_result never blocks submit.
+        with self._deliver_lock:
+            if frame.sequence < self._last_delivered:
+                self.results_dropped += 1
+                return
+            self._last_delivered = frame.sequence
+            if self.on_result is not None:
+                self.on_result(result)
+            else:
+                self._results.put(result)
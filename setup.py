@@ -11,7 +11,13 @@ setup(
     author='Felipe Martins',
     author_email='',
     description='Kairos Face Recognition API Python Client Library',
+    python_requires='>=3.8',
     install_requires=[
         'requests'
-    ]
+    ],
+    extras_require={
+        'async': ['aiohttp'],
+        'preprocessing': ['Pillow'],
+        'fast-json': ['orjson']
+    }
 )
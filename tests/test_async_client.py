@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import kairos_face
+from kairos_face import async_client
+
+
+class _FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+@unittest.skipIf(async_client.aiohttp is None, 'aiohttp is not installed')
+class AsyncKairosClientTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    async def test_passes_url_payload_and_auth_headers_to_request(self):
+        client = kairos_face.AsyncKairosClient()
+        send_mock = mock.AsyncMock(return_value=(200, {'images': []}))
+
+        with mock.patch.object(client, '_send', send_mock):
+            await client.recognize_face('gallery', url='an_image_url.jpg')
+
+        send_mock.assert_awaited_once_with('https://api.kairos.com/recognize',
+                                           {'image': 'an_image_url.jpg', 'gallery_name': 'gallery'},
+                                           {'app_id': 'app_id', 'app_key': 'app_key'})
+
+    async def test_encodes_image_file_in_payload(self):
+        client = kairos_face.AsyncKairosClient()
+        send_mock = mock.AsyncMock(return_value=(200, {}))
+
+        m = mock.mock_open(read_data=str.encode('test'))
+        with mock.patch.object(client, '_send', send_mock), mock.patch('builtins.open', m, create=True):
+            await client.enroll_face('sub_id', 'gallery', file='/a/image/file.jpg')
+
+        args, _ = send_mock.call_args
+        self.assertEqual('dGVzdA==', args[1]['image'])
+
+    async def test_raises_exception_when_http_response_body_contains_error_field(self):
+        client = kairos_face.AsyncKairosClient()
+        send_mock = mock.AsyncMock(return_value=(200, {'Errors': [{'ErrCode': 5004}]}))
+
+        with mock.patch.object(client, '_send', send_mock):
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                await client.get_gallery('non-existing-gallery')
+
+    async def test_limits_number_of_requests_in_flight(self):
+        client = kairos_face.AsyncKairosClient(max_concurrency=3)
+        in_flight = []
+        peak = []
+
+        async def send(url, payload, headers):
+            in_flight.append(url)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return 200, {}
+
+        with mock.patch.object(client, '_send', send):
+            await asyncio.gather(*[client.detect_face(url='image{}.jpg'.format(i)) for i in range(10)])
+
+        self.assertEqual(3, max(peak))
+
+    async def test_throws_exception_when_app_id_is_not_set(self):
+        kairos_face.settings.app_id = None
+        client = kairos_face.AsyncKairosClient()
+
+        with self.assertRaises(kairos_face.SettingsNotPresentException):
+            await client.verify_face('sub_id', 'gallery', url='an_image_url.jpg')
+
+    async def test_object_functions_keep_the_response_bytes_for_the_result(self):
+        client = kairos_face.AsyncKairosClient()
+        session = mock.Mock()
+        session.post.return_value = _FakeResponse(200, b'{"images": [{"transaction": {"status": "success"}}]}')
+
+        with mock.patch.object(client, '_get_session', return_value=session):
+            result = await client.verify_face_object('sub_id', 'gallery', url='an_image_url.jpg')
+
+        self.assertIsInstance(result._source, bytes)
+        self.assertTrue(result.verified)
+
+    async def test_object_functions_raise_errors_in_the_response(self):
+        client = kairos_face.AsyncKairosClient()
+        session = mock.Mock()
+        session.post.return_value = _FakeResponse(200, b'{"Errors": [{"ErrCode": 5004}]}')
+
+        with mock.patch.object(client, '_get_session', return_value=session):
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                await client.recognize_face_object('gallery', url='an_image_url.jpg')
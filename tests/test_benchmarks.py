@@ -0,0 +1,55 @@
+import unittest
+
+import kairos_face
+from benchmarks.run_benchmarks import run_benchmarks, stub_client
+from benchmarks.stub_server import StubKairosServer
+
+
+class StubKairosServerTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.stub = StubKairosServer().start()
+        self.client = stub_client(self.stub)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+
+    def test_recognizes_enrolled_faces(self):
+        kairos_face.enroll_face('subject1', 'gallery', file=b'face1', client=self.client)
+
+        match = kairos_face.recognize_face('gallery', file=b'face1', client=self.client)
+        no_match = kairos_face.recognize_face('gallery', file=b'face2', client=self.client)
+
+        self.assertEqual('subject1', match['images'][0]['candidates'][0]['subject_id'])
+        self.assertEqual('failure', no_match['images'][0]['transaction']['status'])
+
+    def test_implements_gallery_management(self):
+        kairos_face.enroll_face('subject1', 'gallery', url='http://some.server/image.jpg', client=self.client)
+        kairos_face.enroll_face('subject2', 'gallery', url='http://some.server/image.jpg', client=self.client)
+        kairos_face.remove_face('subject1', 'gallery', client=self.client)
+
+        self.assertEqual(['subject2'], kairos_face.get_gallery('gallery', client=self.client)['subject_ids'])
+        self.assertEqual(['gallery'], kairos_face.get_galleries_names_object(client=self.client))
+        kairos_face.remove_gallery('gallery', client=self.client)
+        with self.assertRaises(kairos_face.ServiceRequestError):
+            kairos_face.get_gallery('gallery', client=self.client)
+
+    def test_fails_requests_at_configured_error_rate(self):
+        self.stub.error_rate = 1.0
+
+        with self.assertRaises(kairos_face.ServiceRequestError) as context:
+            kairos_face.detect_face(url='http://some.server/image.jpg', client=self.client)
+
+        self.assertEqual(503, context.exception.status_code)
+
+
+class RunBenchmarksTest(unittest.TestCase):
+    def test_reports_every_endpoint_and_mode(self):
+        results = run_benchmarks(image_sizes=(100,), concurrency_levels=(2,), requests_count=4, latency=0)
+
+        self.assertEqual(8 * 3, len(results))
+        self.assertTrue(all(result.errors == 0 for result in results))
+        self.assertTrue(all(result.throughput > 0 for result in results))
+        self.assertTrue(all(result.peak_memory > 0 for result in results))
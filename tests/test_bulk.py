@@ -0,0 +1,132 @@
+import json
+import os
+import pathlib
+import tempfile
+import unittest
+
+import responses
+
+import kairos_face
+
+
+class KairosApiBulkEnrollFacesTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    def test_throws_exception_when_app_id_is_not_set(self):
+        kairos_face.settings.app_id = None
+
+        with self.assertRaises(kairos_face.SettingsNotPresentException):
+            kairos_face.enroll_faces([{'subject_id': 'sub_id', 'url': 'image.jpg'}], gallery_name='gallery')
+
+    @responses.activate
+    def test_enrolls_every_item_in_the_given_gallery(self):
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{"face_id": "id"}')
+        items = [{'subject_id': 'sub{}'.format(i), 'url': 'image{}.jpg'.format(i)} for i in range(20)]
+
+        results = list(kairos_face.enroll_faces(items, max_workers=4, gallery_name='gallery'))
+
+        self.assertEqual(20, len(results))
+        self.assertTrue(all(result.succeeded for result in results))
+        sent_payloads = [json.loads(call.request.body) for call in responses.calls]
+        self.assertEqual({'sub{}'.format(i) for i in range(20)}, {p['subject_id'] for p in sent_payloads})
+        self.assertTrue(all(p['gallery_name'] == 'gallery' for p in sent_payloads))
+
+    @responses.activate
+    def test_failed_items_do_not_stop_the_remaining_enrolls(self):
+        def callback(request):
+            if json.loads(request.body)['subject_id'] == 'bad':
+                return 200, {}, '{"Errors": [{"ErrCode": 5002, "Message": "no faces found in the image"}]}'
+            return 200, {}, '{"face_id": "id"}'
+        responses.add_callback(responses.POST, 'https://api.kairos.com/enroll', callback=callback)
+        items = [{'subject_id': 'good1', 'url': 'a.jpg'},
+                 {'subject_id': 'bad', 'url': 'b.jpg'},
+                 {'subject_id': 'good2', 'url': 'c.jpg'}]
+
+        results = {r.item['subject_id']: r for r in kairos_face.enroll_faces(items, gallery_name='gallery')}
+
+        self.assertTrue(results['good1'].succeeded)
+        self.assertTrue(results['good2'].succeeded)
+        self.assertFalse(results['bad'].succeeded)
+        self.assertIsInstance(results['bad'].error, kairos_face.ServiceRequestError)
+
+    @responses.activate
+    def test_enrolls_items_with_base64_image_contents(self):
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{"face_id": "id"}')
+        items = [{'subject_id': 'sub_id', 'base64_image_contents': 'dGVzdA=='}]
+
+        result, = kairos_face.enroll_faces(items, gallery_name='gallery')
+
+        self.assertTrue(result.succeeded)
+        self.assertEqual('dGVzdA==', json.loads(responses.calls[0].request.body)['image'])
+
+    @responses.activate
+    def test_gallery_name_in_item_takes_precedence(self):
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{}')
+
+        list(kairos_face.enroll_faces([{'subject_id': 'sub', 'url': 'a.jpg', 'gallery_name': 'other'}],
+                                      gallery_name='gallery'))
+
+        self.assertEqual('other', json.loads(responses.calls[0].request.body)['gallery_name'])
+
+
+class KairosApiRecognizeStreamTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    @staticmethod
+    def _echo_image_callback(request):
+        return 200, {}, json.dumps({'image': json.loads(request.body)['image']})
+
+    @responses.activate
+    def test_yields_results_in_input_order_when_requested(self):
+        responses.add_callback(responses.POST, 'https://api.kairos.com/recognize', callback=self._echo_image_callback)
+        images = ['http://some.server/image{}.jpg'.format(i) for i in range(30)]
+
+        results = list(kairos_face.recognize_stream(images, 'gallery', concurrency=4, ordered=True))
+
+        self.assertEqual(images, [r.response['image'] for r in results])
+        self.assertEqual(images, [r.item for r in results])
+
+    @responses.activate
+    def test_consumes_input_lazily(self):
+        responses.add_callback(responses.POST, 'https://api.kairos.com/recognize', callback=self._echo_image_callback)
+        consumed = []
+
+        def images():
+            for i in range(100):
+                consumed.append(i)
+                yield {'url': 'image{}.jpg'.format(i)}
+
+        stream = kairos_face.recognize_stream(images(), 'gallery', concurrency=2)
+        next(stream)
+        stream.close()
+
+        self.assertLessEqual(len(consumed), 5)
+
+    @responses.activate
+    def test_accepts_paths_bytes_and_image_sources_as_files(self):
+        responses.add_callback(responses.POST, 'https://api.kairos.com/recognize', callback=self._echo_image_callback)
+        fd, path = tempfile.mkstemp(suffix='.jpg')
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(b'test')
+        self.addCleanup(os.remove, path)
+        images = ['http://some.server/a.jpg', pathlib.Path(path), b'test', kairos_face.ImageSource(b'test')]
+
+        results = list(kairos_face.recognize_stream(images, 'gallery', concurrency=2, ordered=True))
+
+        self.assertTrue(all(r.succeeded for r in results))
+        self.assertEqual(['http://some.server/a.jpg', 'dGVzdA==', 'dGVzdA==', 'dGVzdA=='],
+                         [r.response['image'] for r in results])
+
+    @responses.activate
+    def test_reports_failed_and_unreadable_images_without_stopping(self):
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=500, body='{}')
+
+        results = list(kairos_face.recognize_stream(['http://some.server/a.jpg', '/missing/b.jpg'], 'gallery',
+                                                    concurrency=2))
+
+        self.assertEqual(2, len(results))
+        self.assertFalse(any(r.succeeded for r in results))
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import responses
+
+import kairos_face
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.client = kairos_face.KairosClient(cache=kairos_face.MemoryCache())
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=200, body='{"images": []}')
+        responses.add(responses.POST, 'https://api.kairos.com/detect', status=200, body='{"images": []}')
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{"face_id": "id"}')
+
+    def _write_image(self, contents):
+        fd, path = tempfile.mkstemp(suffix='.jpg')
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(contents)
+        self.addCleanup(os.remove, path)
+        return path
+
+    @responses.activate
+    def test_identical_recognize_requests_are_served_from_cache(self):
+        kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+        response = kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual({'images': []}, response)
+        self.assertEqual(1, len(responses.calls))
+
+    @responses.activate
+    def test_files_with_same_contents_share_cache_entry(self):
+        kairos_face.detect_face(file=self._write_image(b'image'), client=self.client)
+        kairos_face.detect_face(file=self._write_image(b'image'), client=self.client)
+        kairos_face.detect_face(file=self._write_image(b'other image'), client=self.client)
+
+        self.assertEqual(2, len(responses.calls))
+
+    @responses.activate
+    def test_gallery_and_additional_arguments_are_part_of_cache_key(self):
+        kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+        kairos_face.recognize_face('other-gallery', url='an_image_url.jpg', client=self.client)
+        kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client,
+                                   additional_arguments={'max_num_results': '5'})
+
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_enrolling_in_gallery_invalidates_its_recognize_entries(self):
+        kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+        kairos_face.detect_face(url='an_image_url.jpg', client=self.client)
+        kairos_face.enroll_face('sub_id', 'gallery', url='an_image_url.jpg', client=self.client)
+        kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+        kairos_face.detect_face(url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual(['recognize', 'detect', 'enroll', 'recognize'],
+                         [call.request.url.rsplit('/', 1)[1] for call in responses.calls])
+
+    @responses.activate
+    def test_recognitions_overlapping_a_change_of_their_gallery_are_not_cached(self):
+        recognitions = []
+
+        def recognize(request):
+            recognitions.append(request)
+            if len(recognitions) == 1:
+                # The enroll completes while this first recognition is still in flight
+                kairos_face.enroll_face('sub_id', 'gallery', url='an_image_url.jpg', client=self.client)
+                return 200, {}, '{"images": [{"transaction": {"status": "failure"}}]}'
+            return 200, {}, '{"images": [{"transaction": {"status": "success"}}]}'
+        responses.remove(responses.POST, 'https://api.kairos.com/recognize')
+        responses.add_callback(responses.POST, 'https://api.kairos.com/recognize', callback=recognize)
+
+        stale = kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+        current = kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual('failure', stale['images'][0]['transaction']['status'])
+        self.assertEqual('success', current['images'][0]['transaction']['status'])
+
+    @responses.activate
+    def test_error_responses_are_not_cached(self):
+        responses.replace(responses.POST, 'https://api.kairos.com/recognize', status=500, body='{}')
+
+        for _ in range(2):
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual(2, len(responses.calls))
+
+
+class MemoryCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used_entries(self):
+        cache = kairos_face.MemoryCache(max_entries=2)
+        cache.set('a', None, 1)
+        cache.set('b', None, 2)
+        cache.get('a')
+        cache.set('c', None, 3)
+
+        self.assertEqual(1, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(3, cache.get('c'))
+
+    def test_expired_entries_are_not_returned(self):
+        cache = kairos_face.MemoryCache(ttl=10)
+
+        with mock.patch('kairos_face.cache.time.monotonic', return_value=100):
+            cache.set('a', None, 1)
+        with mock.patch('kairos_face.cache.time.monotonic', return_value=111):
+            self.assertIsNone(cache.get('a'))
+
+
+class SqliteCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = kairos_face.SqliteCache(':memory:')
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_stores_responses(self):
+        self.cache.set('a', 'gallery', {'images': [{'candidates': []}]})
+
+        self.assertEqual({'images': [{'candidates': []}]}, self.cache.get('a'))
+
+    def test_invalidates_gallery_entries(self):
+        self.cache.set('a', 'gallery', {})
+        self.cache.set('b', 'other-gallery', {})
+
+        self.cache.invalidate_gallery('gallery')
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual({}, self.cache.get('b'))
+
+    def test_responses_read_before_an_invalidation_are_not_stored(self):
+        generation = self.cache.generation('gallery')
+        self.cache.invalidate_gallery('gallery')
+
+        self.cache.set('a', 'gallery', {}, generation)
+        self.cache.set('b', 'other-gallery', {}, self.cache.generation('other-gallery'))
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual({}, self.cache.get('b'))
@@ -0,0 +1,104 @@
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+import requests
+import responses
+
+import kairos_face
+
+
+class KairosClientTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    def test_default_client_is_reused_between_calls(self):
+        self.assertIs(kairos_face.get_default_client(), kairos_face.get_default_client())
+
+    def test_mounts_adapter_with_configured_pool_size(self):
+        client = kairos_face.KairosClient(pool_connections=4, pool_maxsize=32)
+
+        adapter = client.session.get_adapter('https://api.kairos.com/')
+        self.assertEqual(4, adapter._pool_connections)
+        self.assertEqual(32, adapter._pool_maxsize)
+
+    @mock.patch('requests.Session.post')
+    def test_module_functions_route_through_passed_client(self, post_mock):
+        post_mock.return_value.status_code = 200
+        client = kairos_face.KairosClient()
+
+        with mock.patch.object(client, 'post', wraps=client.post) as client_post:
+            kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=client)
+
+        client_post.assert_called_once_with('recognize', {'image': 'an_image_url.jpg', 'gallery_name': 'gallery'})
+
+    @responses.activate
+    def test_raises_exception_when_http_status_response_is_error(self):
+        responses.add(responses.POST, 'https://api.kairos.com/detect', status=500,
+                      body='{"error_message": "internal error"}')
+
+        with kairos_face.KairosClient() as client:
+            with self.assertRaises(kairos_face.ServiceRequestError) as context:
+                client.post('detect', {'image': 'an_image_url.jpg'})
+
+        self.assertEqual(500, context.exception.status_code)
+        self.assertEqual({'image': 'an_image_url.jpg'}, context.exception.payload)
+
+    @responses.activate
+    def test_sends_requests_to_client_base_url(self):
+        responses.add(responses.POST, 'http://mirror.local/detect', status=200, body='{"images": []}')
+
+        with kairos_face.KairosClient(base_url='http://mirror.local/') as client:
+            kairos_face.detect_face(url='an_image_url.jpg', client=client)
+
+        self.assertEqual('http://mirror.local/detect', responses.calls[0].request.url)
+
+    @responses.activate
+    def test_reads_settings_base_url_on_every_call(self):
+        responses.add(responses.POST, 'http://mirror.local/detect', status=200, body='{"images": []}')
+        client = kairos_face.KairosClient()
+
+        with mock.patch.object(kairos_face.settings, 'base_url', 'http://mirror.local/'):
+            kairos_face.detect_face(url='an_image_url.jpg', client=client)
+
+        self.assertEqual('http://mirror.local/detect', responses.calls[0].request.url)
+
+    @responses.activate
+    def test_prewarms_connections_on_creation(self):
+        responses.add(responses.HEAD, 'https://api.kairos.com/', status=200)
+
+        kairos_face.KairosClient(prewarm_connections=3)
+
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_prewarm_failures_are_ignored(self):
+        responses.add(responses.HEAD, 'https://api.kairos.com/', body=requests.ConnectionError())
+
+        client = kairos_face.KairosClient()
+
+        self.assertEqual(0, client.prewarm(2))
+
+    def test_package_import_does_not_load_http_libraries(self):
+        code = 'import sys, kairos_face; print(sorted(m for m in ("requests", "aiohttp", "PIL") if m in sys.modules))'
+
+        output = subprocess.check_output([sys.executable, '-c', code])
+
+        self.assertEqual('[]', output.decode('utf-8').strip())
+
+    def test_loads_public_names_on_first_access(self):
+        self.assertIs(kairos_face.client.KairosClient, kairos_face.KairosClient)
+        with self.assertRaises(AttributeError):
+            kairos_face.not_a_public_name
+
+    def test_star_import_and_submodule_attributes_keep_working(self):
+        code = ('import kairos_face; print(kairos_face.gallery.get_gallery.__name__); '
+                'from kairos_face import *; print(enroll_face.__name__, recognize_face.__name__, '
+                'ServiceRequestError.__name__, settings.__name__)')
+
+        output = subprocess.check_output([sys.executable, '-c', code])
+
+        self.assertEqual(['get_gallery', 'enroll_face recognize_face ServiceRequestError kairos_face.settings'],
+                         output.decode('utf-8').split('\n')[:2])
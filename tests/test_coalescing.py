@@ -0,0 +1,120 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import kairos_face
+from kairos_face.coalescing import SingleFlight
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_calls_with_same_key_run_once(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            release.wait(5)
+            return {'images': []}
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(single_flight.do, 'key', func) for _ in range(5)]
+            _wait_until(lambda: single_flight.calls_coalesced >= 4)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual([{'images': []}] * 5, results)
+        self.assertEqual(1, single_flight.calls_executed)
+        self.assertEqual(4, single_flight.calls_coalesced)
+        self.assertEqual(5, len({id(result) for result in results}))
+
+    def test_waiting_callers_receive_the_error(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def func():
+            started.set()
+            release.wait(5)
+            raise kairos_face.ServiceRequestError(500, {}, None)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(single_flight.do, 'key', func)
+            started.wait(5)
+            follower = executor.submit(single_flight.do, 'key', func)
+            _wait_until(lambda: single_flight.calls_coalesced >= 1)
+            release.set()
+
+        self.assertIsInstance(leader.exception(), kairos_face.ServiceRequestError)
+        self.assertIsInstance(follower.exception(), kairos_face.ServiceRequestError)
+
+    def test_waiting_callers_are_released_when_the_call_is_interrupted(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def func():
+            started.set()
+            release.wait(5)
+            raise KeyboardInterrupt()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(single_flight.do, 'key', func)
+            started.wait(5)
+            follower = executor.submit(single_flight.do, 'key', func)
+            _wait_until(lambda: single_flight.calls_coalesced >= 1)
+            release.set()
+
+        self.assertIsInstance(leader.exception(timeout=5), KeyboardInterrupt)
+        self.assertIsInstance(follower.exception(timeout=5), KeyboardInterrupt)
+
+    def test_sequential_calls_are_not_coalesced(self):
+        single_flight = SingleFlight()
+
+        single_flight.do('key', lambda: 1)
+        single_flight.do('key', lambda: 2)
+
+        self.assertEqual(2, single_flight.calls_executed)
+        self.assertEqual(0, single_flight.calls_coalesced)
+
+
+class KairosClientCoalescingTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    def test_identical_read_only_requests_share_one_http_call(self):
+        client = kairos_face.KairosClient(coalesce_requests=True)
+        release = threading.Event()
+
+        def send(endpoint, payload, stream_parser=None):
+            release.wait(5)
+            return {'images': []}
+
+        with mock.patch.object(client, '_send', side_effect=send) as send_mock:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [executor.submit(kairos_face.recognize_face, 'gallery', url='an_image_url.jpg',
+                                           client=client) for _ in range(3)]
+                _wait_until(lambda: client.single_flight.calls_coalesced >= 2)
+                release.set()
+                [future.result() for future in futures]
+
+        self.assertEqual(1, send_mock.call_count)
+
+    def test_gallery_changing_requests_are_never_coalesced(self):
+        client = kairos_face.KairosClient(coalesce_requests=True)
+
+        with mock.patch.object(client, '_send', return_value={}) as send_mock:
+            kairos_face.enroll_face('sub_id', 'gallery', url='an_image_url.jpg', client=client)
+
+        self.assertEqual(1, send_mock.call_count)
+        self.assertEqual(0, client.single_flight.calls_executed)
@@ -0,0 +1,162 @@
+import json
+import unittest
+from unittest import mock
+
+import responses
+
+import kairos_face
+from kairos_face import exceptions
+
+
+def _throttled(credential):
+    raise exceptions.ServiceRequestError(429, {'Errors': [{'Message': 'too many requests'}]}, {})
+
+
+class CredentialPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.credentials = [('id1', 'key1'), ('id2', 'key2'), ('id3', 'key3')]
+
+    def _app_ids(self, pool, count):
+        return [pool.call(lambda credential: credential.app_id) for _ in range(count)]
+
+    def test_round_robin_takes_turns(self):
+        pool = kairos_face.CredentialPool(self.credentials, strategy='round_robin')
+
+        self.assertEqual(['id1', 'id2', 'id3', 'id1'], self._app_ids(pool, 4))
+
+    def test_least_loaded_picks_the_credential_with_fewest_requests_in_flight(self):
+        pool = kairos_face.CredentialPool(self.credentials[:2])
+        used = []
+
+        def nested(credential):
+            used.append(credential.app_id)
+            if len(used) < 3:
+                pool.call(nested)
+
+        pool.call(nested)
+
+        self.assertEqual(['id1', 'id2', 'id1'], used)
+        self.assertEqual([0, 0], [stats.in_flight for stats in pool.stats().values()])
+
+    @mock.patch('kairos_face.credentials.time.monotonic')
+    def test_throttled_credentials_leave_the_rotation_for_their_cooldown(self, monotonic_mock):
+        monotonic_mock.return_value = 100.0
+        pool = kairos_face.CredentialPool(self.credentials[:2], strategy='round_robin', cooldown=10)
+
+        with self.assertRaises(exceptions.ServiceRequestError):
+            pool.call(_throttled)
+
+        self.assertEqual(['id2', 'id2'], self._app_ids(pool, 2))
+        self.assertFalse(pool.stats()['id1'].available)
+        monotonic_mock.return_value = 110.0
+        self.assertEqual(['id1', 'id2'], self._app_ids(pool, 2))
+
+    @mock.patch('kairos_face.credentials.time.monotonic')
+    def test_cooldown_doubles_while_a_credential_keeps_being_throttled(self, monotonic_mock):
+        monotonic_mock.return_value = 100.0
+        pool = kairos_face.CredentialPool(self.credentials[:2], strategy='round_robin', cooldown=10,
+                                          max_cooldown=15)
+        with self.assertRaises(exceptions.ServiceRequestError):
+            pool.call(_throttled)
+        self._app_ids(pool, 1)
+
+        monotonic_mock.return_value = 110.0
+        with self.assertRaises(exceptions.ServiceRequestError):
+            pool.call(_throttled)
+
+        monotonic_mock.return_value = 124.0
+        self.assertEqual(['id2', 'id2'], self._app_ids(pool, 2))
+        monotonic_mock.return_value = 125.0
+        self.assertEqual(['id1'], self._app_ids(pool, 1))
+
+    @mock.patch('kairos_face.credentials.time.sleep')
+    @mock.patch('kairos_face.credentials.time.monotonic')
+    def test_waits_for_a_credential_when_all_are_throttled(self, monotonic_mock, sleep_mock):
+        monotonic_mock.return_value = 100.0
+        pool = kairos_face.CredentialPool(self.credentials[:1], cooldown=10)
+        with self.assertRaises(exceptions.ServiceRequestError):
+            pool.call(_throttled)
+
+        def sleep(delay):
+            monotonic_mock.return_value += delay
+        sleep_mock.side_effect = sleep
+
+        monotonic_mock.return_value = 104.0
+        self.assertEqual(['id1'], self._app_ids(pool, 1))
+        sleep_mock.assert_called_once_with(6.0)
+
+    def test_other_errors_do_not_take_credentials_out(self):
+        pool = kairos_face.CredentialPool(self.credentials[:1])
+
+        def fail(credential):
+            raise exceptions.ServiceRequestError(500, {}, {})
+
+        with self.assertRaises(exceptions.ServiceRequestError):
+            pool.call(fail)
+
+        stats = pool.stats()['id1']
+        self.assertEqual((1, 1, 0, True), (stats.requests, stats.failures, stats.throttled, stats.available))
+
+    def test_rejects_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            kairos_face.CredentialPool([])
+        with self.assertRaises(ValueError):
+            kairos_face.CredentialPool(self.credentials, strategy='random')
+
+
+class KairosClientCredentialPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.settings = kairos_face.settings.app_id, kairos_face.settings.app_key
+        kairos_face.settings.app_id = None
+        kairos_face.settings.app_key = None
+
+    def tearDown(self):
+        kairos_face.settings.app_id, kairos_face.settings.app_key = self.settings
+
+    @responses.activate
+    def test_requests_are_sent_with_the_pool_credentials(self):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/remove_subject', status=200, body='{}')
+        pool = kairos_face.CredentialPool([('id1', 'key1'), ('id2', 'key2')], strategy='round_robin')
+        client = kairos_face.KairosClient(credential_pool=pool)
+
+        kairos_face.remove_face('sub_id', 'gallery', client=client)
+        kairos_face.remove_face('sub_id', 'gallery', client=client)
+
+        self.assertEqual([('id1', 'key1'), ('id2', 'key2')],
+                         [(call.request.headers['app_id'], call.request.headers['app_key'])
+                          for call in responses.calls])
+
+    @responses.activate
+    def test_throttled_requests_are_retried_with_another_credential(self):
+        def recognize(request):
+            if request.headers['app_id'] == 'id1':
+                return 429, {}, json.dumps({'Errors': [{'Message': 'too many requests'}]})
+            return 200, {}, json.dumps({'images': []})
+
+        responses.add_callback(responses.POST, 'https://api.kairos.com/recognize', callback=recognize)
+        pool = kairos_face.CredentialPool([('id1', 'key1'), ('id2', 'key2')], strategy='round_robin')
+        client = kairos_face.KairosClient(credential_pool=pool,
+                                          retry_policy=kairos_face.RetryPolicy(max_attempts=2, backoff=0))
+
+        response = kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=client)
+
+        self.assertEqual({'images': []}, response)
+        stats = pool.stats()
+        self.assertEqual((1, False), (stats['id1'].throttled, stats['id1'].available))
+        self.assertEqual((1, 0), (stats['id2'].requests, stats['id2'].failures))
+
+    @responses.activate
+    def test_metrics_are_recorded_with_pool_credentials(self):
+        responses.add(responses.POST, 'https://api.kairos.com/detect', status=200, body='{"images": []}')
+        metrics = kairos_face.Metrics()
+        client = kairos_face.KairosClient(credential_pool=kairos_face.CredentialPool([('id1', 'key1')]),
+                                          metrics=metrics)
+
+        kairos_face.detect_face(url='an_image_url.jpg', client=client)
+
+        self.assertEqual('id1', responses.calls[0].request.headers['app_id'])
+        self.assertIn('kairos_requests_total{endpoint="detect",status="200"} 1', metrics.to_prometheus())
+
+    def test_clients_without_a_pool_still_need_settings(self):
+        with self.assertRaises(kairos_face.SettingsNotPresentException):
+            kairos_face.detect_face(url='an_image_url.jpg', client=kairos_face.KairosClient())
@@ -0,0 +1,96 @@
+import io
+import unittest
+from unittest import mock
+
+import kairos_face
+from kairos_face import dedup
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _jpeg(frame, quality):
+    output = io.BytesIO()
+    dedup.Image.fromarray(frame).save(output, format='JPEG', quality=quality)
+    return output.getvalue()
+
+
+@unittest.skipIf(dedup.Image is None or numpy is None, 'Pillow and NumPy are required')
+class NearDuplicateFilterTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.duplicate_filter = kairos_face.NearDuplicateFilter(threshold=4, window=10)
+        self.client = kairos_face.KairosClient(duplicate_filter=self.duplicate_filter)
+        columns, rows = numpy.meshgrid(numpy.arange(64), numpy.arange(48))
+        pattern = (127 + 100 * numpy.sin(columns / 7.0 + rows / 11.0)).astype(numpy.uint8)
+        self.scene = numpy.stack([pattern] * 3, axis=-1)
+        self.other_scene = self.scene[:, ::-1].copy()
+
+    def test_near_identical_images_hash_alike(self):
+        first = dedup.difference_hash(kairos_face.ImageSource(_jpeg(self.scene, 95)))
+        recompressed = dedup.difference_hash(kairos_face.ImageSource(_jpeg(self.scene, 60)))
+        other = dedup.difference_hash(kairos_face.ImageSource(_jpeg(self.other_scene, 95)))
+
+        self.assertLessEqual(dedup._hamming_distance(first, recompressed), 4)
+        self.assertGreater(dedup._hamming_distance(first, other), 4)
+
+    def test_reuses_response_of_near_duplicate_image(self):
+        with mock.patch.object(self.client, '_send', return_value={'images': []}) as send_mock:
+            first = kairos_face.recognize_face('gallery', file=_jpeg(self.scene, 95), client=self.client)
+            second = kairos_face.recognize_face('gallery', file=_jpeg(self.scene, 60), client=self.client)
+            kairos_face.recognize_face('gallery', file=_jpeg(self.other_scene, 95), client=self.client)
+            kairos_face.recognize_face('another-gallery', file=self.scene, client=self.client)
+
+        self.assertEqual(first, second)
+        self.assertEqual(3, send_mock.call_count)
+        self.assertEqual((1, 3), (self.duplicate_filter.hits, self.duplicate_filter.misses))
+        self.assertEqual(0.25, self.duplicate_filter.hit_rate)
+
+    def test_responses_expire_after_window(self):
+        with mock.patch.object(self.client, '_send', return_value={'images': []}) as send_mock:
+            with mock.patch('kairos_face.dedup.time.monotonic', return_value=100):
+                kairos_face.detect_face(file=self.scene, client=self.client)
+            with mock.patch('kairos_face.dedup.time.monotonic', return_value=111):
+                kairos_face.detect_face(file=self.scene, client=self.client)
+
+        self.assertEqual(2, send_mock.call_count)
+
+    def test_enrolling_in_gallery_forgets_its_responses(self):
+        with mock.patch.object(self.client, '_send', return_value={'images': []}) as send_mock:
+            kairos_face.recognize_face('gallery', file=self.scene, client=self.client)
+            kairos_face.enroll_face('subject', 'gallery', url='http://some.server/image.jpg', client=self.client)
+            kairos_face.recognize_face('gallery', file=self.scene, client=self.client)
+
+        self.assertEqual(3, send_mock.call_count)
+
+    def test_responses_overlapping_a_change_of_their_gallery_are_not_reused(self):
+        def send(endpoint, payload, stream_parser=None):
+            if endpoint == 'recognize' and send_mock.call_count == 1:
+                # The enroll completes while this first recognition is still in flight
+                kairos_face.enroll_face('subject', 'gallery', url='http://some.server/image.jpg', client=self.client)
+            return {'images': []}
+
+        with mock.patch.object(self.client, '_send', side_effect=send) as send_mock:
+            kairos_face.recognize_face('gallery', file=self.scene, client=self.client)
+            kairos_face.recognize_face('gallery', file=self.scene, client=self.client)
+
+        self.assertEqual(3, send_mock.call_count)
+
+    def test_images_that_cannot_be_decoded_are_sent_unfiltered(self):
+        with mock.patch.object(self.client, '_send', return_value={'images': []}) as send_mock:
+            response = kairos_face.detect_face(file=b'not an image', client=self.client)
+
+        self.assertEqual({'images': []}, response)
+        self.assertEqual(1, send_mock.call_count)
+        self.assertEqual(1, self.duplicate_filter.skipped)
+
+    def test_images_passed_by_url_are_not_filtered(self):
+        with mock.patch.object(self.client, '_send', return_value={'images': []}) as send_mock:
+            kairos_face.detect_face(url='http://some.server/image.jpg', client=self.client)
+            kairos_face.detect_face(url='http://some.server/image.jpg', client=self.client)
+
+        self.assertEqual(2, send_mock.call_count)
+        self.assertEqual(2, self.duplicate_filter.skipped)
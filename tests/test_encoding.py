@@ -0,0 +1,71 @@
+import base64
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import kairos_face
+from kairos_face.encoding import Base64File, StreamingJSONBody, encode_file_contents
+
+
+class StreamingJSONBodyTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.image_path = tempfile.mkstemp()
+        self.image_contents = os.urandom(1000 * 1000 + 1)
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(self.image_contents)
+
+    def tearDown(self):
+        os.remove(self.image_path)
+
+    def test_body_is_the_json_serialization_of_the_encoded_payload(self):
+        payload = {'image': Base64File(self.image_path), 'gallery_name': 'gallery', 'selector': 'SETPOSE'}
+
+        body = b''.join(StreamingJSONBody(payload))
+
+        self.assertEqual(json.dumps(encode_file_contents(payload)).encode('utf-8'), body)
+
+    def test_length_matches_streamed_body(self):
+        payload = {'gallery_name': 'gallery', 'image': Base64File(self.image_path), 'multiple_faces': False}
+        body = StreamingJSONBody(payload)
+
+        self.assertEqual(len(b''.join(body)), len(body))
+
+    def test_encodes_image_in_bounded_chunks(self):
+        chunks = list(Base64File(self.image_path).iter_encoded())
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 4 * 64 * 1024 for chunk in chunks))
+        self.assertEqual(self.image_contents, base64.b64decode(b''.join(chunks)))
+
+    def test_client_streams_file_uploads_to_server(self):
+        received = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received['headers'] = self.headers
+                received['body'] = self.rfile.read(int(self.headers['Content-Length']))
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b'{"images": []}')
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.handle_request, daemon=True).start()
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+        base_url = 'http://127.0.0.1:{}/'.format(server.server_port)
+        with kairos_face.KairosClient(stream_uploads=True, base_url=base_url) as client:
+            client.post('recognize', {'image': Base64File(self.image_path), 'gallery_name': 'gallery'})
+        server.server_close()
+
+        self.assertEqual('application/json', received['headers']['Content-Type'])
+        self.assertEqual('app_id', received['headers']['app_id'])
+        sent_payload = json.loads(received['body'].decode('utf-8'))
+        self.assertEqual(self.image_contents, base64.b64decode(sent_payload['image']))
+        self.assertEqual('gallery', sent_payload['gallery_name'])
@@ -41,7 +41,16 @@ class KairosApiEnrollFacesTest(unittest.TestCase):
             kairos_face.enroll_face('subject_id', 'gallery',
                                     url='an_image_url.jpg', base64_image_contents='aBase64EncodedImageContents')
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
+    def test_base64_image_contents_are_sent_without_file_or_url(self, post_mock):
+        post_mock.return_value.status_code = 200
+
+        kairos_face.enroll_face('sub_id', 'gallery', base64_image_contents='aBase64EncodedImageContents')
+
+        _, kwargs = post_mock.call_args
+        self.assertEqual('aBase64EncodedImageContents', kwargs['json']['image'])
+
+    @mock.patch('requests.Session.post')
     def test_passes_api_url_in_post_request(self, post_mock):
         post_mock.return_value.status_code = 200
 
@@ -51,7 +60,7 @@ class KairosApiEnrollFacesTest(unittest.TestCase):
         self.assertEqual(1, len(args), 'No positional arguments were passed to post request')
         self.assertEqual('https://api.kairos.com/enroll', args[0])
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_passes_app_id_and_key_in_post_header(self, post_mock):
         post_mock.return_value.status_code = 200
 
@@ -65,7 +74,7 @@ class KairosApiEnrollFacesTest(unittest.TestCase):
         self.assertTrue('headers' in kwargs)
         self.assertEqual(expected_headers, kwargs['headers'])
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_passes_required_arguments_in_payload_as_json_when_image_is_url(self, post_mock):
         post_mock.return_value.status_code = 200
 
@@ -81,7 +90,7 @@ class KairosApiEnrollFacesTest(unittest.TestCase):
         self.assertTrue('json' in kwargs)
         self.assertEqual(expected_payload, kwargs['json'])
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_passes_required_arguments_in_payload_as_json_when_image_is_file(self, post_mock):
         post_mock.return_value.status_code = 200
 
@@ -99,7 +108,7 @@ class KairosApiEnrollFacesTest(unittest.TestCase):
         self.assertTrue('json' in kwargs)
         self.assertEqual(expected_payload, kwargs['json'])
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_passes_multiple_faces_argument_in_payload_when_flag_is_set(self, post_mock):
         post_mock.return_value.status_code = 200
 
@@ -117,7 +126,7 @@ class KairosApiEnrollFacesTest(unittest.TestCase):
         self.assertTrue('json' in kwargs)
         self.assertEqual(expected_payload, kwargs['json'])
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_passes_additional_arguments_in_payload(self, post_mock):
         post_mock.return_value.status_code = 200
         additional_arguments = {
@@ -0,0 +1,124 @@
+import json
+import sys
+import unittest
+from unittest import mock
+
+import responses
+
+import kairos_face
+from kairos_face.entities import DetectResult, RecognizeResult, VerifyResult
+
+_RECOGNIZE_RESPONSE = {
+    'images': [{
+        'transaction': {'status': 'success', 'subject_id': 'subject1', 'confidence': 0.91,
+                        'gallery_name': 'gallery', 'topLeftX': 10, 'topLeftY': 20, 'width': 30, 'height': 40,
+                        'eyeDistance': 12},
+        'candidates': [{'subject_id': 'subject1', 'confidence': 0.91, 'enrollment_timestamp': '1416850761'},
+                       {'subject_id': 'subject2', 'confidence': 0.62, 'enrollment_timestamp': '1417207485'}]
+    }],
+    'uploaded_image_url': 'https://kairos.com/image.jpg'
+}
+
+
+class RecognizeResultTest(unittest.TestCase):
+    def test_parses_candidates_from_response_bytes(self):
+        result = RecognizeResult(json.dumps(_RECOGNIZE_RESPONSE).encode('utf-8'))
+
+        face = result.images[0]
+        self.assertEqual('success', face.transaction.status)
+        self.assertEqual(10, face.transaction.top_left_x)
+        self.assertEqual(['subject1', 'subject2'], [candidate.subject_id for candidate in face.candidates])
+        self.assertEqual(0.91, face.best_candidate.confidence)
+
+    def test_is_only_parsed_on_first_field_access(self):
+        decoder = mock.Mock(side_effect=json.loads)
+        result = RecognizeResult(json.dumps(_RECOGNIZE_RESPONSE), decoder=decoder)
+        decoder.assert_not_called()
+
+        result.images
+        result.images
+
+        decoder.assert_called_once()
+
+    def test_to_dict_gives_back_original_response(self):
+        result = RecognizeResult(json.dumps(_RECOGNIZE_RESPONSE))
+        result.images
+
+        self.assertEqual(_RECOGNIZE_RESPONSE, result.to_dict())
+
+    def test_keeps_null_fields_apart_from_missing_ones(self):
+        response = {'images': [{'transaction': {'status': 'failure', 'subject_id': None}}]}
+        result = RecognizeResult(response)
+        result.images
+
+        self.assertEqual(response, result.to_dict())
+        self.assertIsNone(result.images[0].candidates)
+
+    def test_reads_candidates_keyed_by_subject_id(self):
+        result = RecognizeResult({'images': [{'candidates': [{'test2': '0.80', 'enrollment_timestamp': '14'}]}]})
+
+        candidate = result.images[0].candidates[0]
+        self.assertEqual('test2', candidate.subject_id)
+        self.assertEqual(0.8, candidate.confidence)
+        self.assertEqual({'test2': '0.80', 'enrollment_timestamp': '14'}, candidate.to_dict())
+
+    def test_entities_have_no_instance_dict(self):
+        candidate = RecognizeResult(_RECOGNIZE_RESPONSE).images[0].candidates[0]
+
+        self.assertFalse(hasattr(candidate, '__dict__'))
+        self.assertLess(sys.getsizeof(candidate), sys.getsizeof(_RECOGNIZE_RESPONSE['images'][0]['candidates'][0]))
+
+
+class DetectAndVerifyResultTest(unittest.TestCase):
+    def test_lists_detected_faces_of_every_image(self):
+        result = DetectResult({'images': [{'status': 'Complete', 'faces': [
+            {'topLeftX': 1, 'topLeftY': 2, 'width': 3, 'height': 4, 'attributes': {'age': 30}},
+            {'topLeftX': 5, 'topLeftY': 6, 'width': 7, 'height': 8}]}]})
+
+        self.assertEqual([(1, 2, 3, 4), (5, 6, 7, 8)],
+                         [(face.top_left_x, face.top_left_y, face.width, face.height) for face in result.faces])
+        self.assertEqual({'age': 30}, result.faces[0].attributes)
+
+    def test_verified_when_transaction_succeeds(self):
+        self.assertTrue(VerifyResult({'images': [{'transaction': {'status': 'success'}}]}).verified)
+        self.assertFalse(VerifyResult({'images': [{'transaction': {'status': 'failure'}}]}).verified)
+
+
+class ObjectFunctionsTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    @responses.activate
+    def test_recognize_face_object_returns_typed_result(self):
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=200,
+                      body=json.dumps(_RECOGNIZE_RESPONSE))
+
+        with kairos_face.KairosClient(json_decoder=json.loads) as client:
+            result = kairos_face.recognize_face_object('gallery', url='an_image_url.jpg', client=client)
+
+        self.assertIsInstance(result, kairos_face.RecognizeResult)
+        self.assertEqual('subject1', result.images[0].best_candidate.subject_id)
+
+    @responses.activate
+    def test_object_functions_parse_the_response_bytes_when_first_read(self):
+        responses.add(responses.POST, 'https://api.kairos.com/detect', status=200,
+                      body='{"images": [{"faces": [{"topLeftX": 10, "attributes": {"age": 30}}]}]}')
+        decoder = mock.Mock(side_effect=json.loads)
+
+        with kairos_face.KairosClient(json_decoder=decoder) as client:
+            result = kairos_face.detect_face_object(url='an_image_url.jpg', client=client)
+            decoder.assert_not_called()
+
+            self.assertEqual(10, result.faces[0].top_left_x)
+        self.assertIsInstance(decoder.call_args[0][0], bytes)
+
+    @responses.activate
+    def test_object_functions_raise_errors_in_the_response(self):
+        responses.add(responses.POST, 'https://api.kairos.com/verify', status=200,
+                      body='{"Errors": [{"ErrCode": 5004, "Message": "gallery name not found"}]}')
+
+        with self.assertRaises(kairos_face.ServiceRequestError) as context:
+            kairos_face.verify_face_object('subject1', 'gallery', url='an_image_url.jpg')
+
+        self.assertEqual(5004, context.exception.response_msg['Errors'][0]['ErrCode'])
@@ -23,7 +23,7 @@ class KairosApiGalleryTest(unittest.TestCase):
         with self.assertRaises(kairos_face.SettingsNotPresentException):
             kairos_face.get_gallery(gallery_name='gallery')
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_passes_app_id_and_key_in_post_header(self, post_mock):
         post_mock.return_value.status_code = 200
 
@@ -37,7 +37,7 @@ class KairosApiGalleryTest(unittest.TestCase):
         self.assertTrue('headers' in kwargs)
         self.assertEqual(expected_headers, kwargs['headers'])
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_payload_with_gallery_name_is_passed_in_request(self, post_mock):
         post_mock.return_value.status_code = 200
 
@@ -136,3 +136,40 @@ class KairosApiGetGalleriesListTest(unittest.TestCase):
         self.assertEqual(2, len(actual_response['gallery_ids']))
         self.assertTrue('gallery1' in actual_response['gallery_ids'])
         self.assertTrue('gallery2' in actual_response['gallery_ids'])
+
+
+class KairosApiGalleryObjectTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    @responses.activate
+    def test_returned_gallery_object_indexes_subjects(self):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                      body=json.dumps({'status': 'Complete', 'subject_ids': ['subject1', 'subject2']}))
+
+        gallery = kairos_face.get_gallery_object('a-gallery')
+
+        self.assertEqual('a-gallery', gallery.name)
+        self.assertEqual(frozenset(['subject1', 'subject2']), gallery.subjects)
+        self.assertIn('subject1', gallery)
+        self.assertEqual(2, len(gallery))
+
+    @responses.activate
+    def test_getting_non_existing_gallery_object_raises_an_exception(self):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                      body=json.dumps({'Errors': [{'ErrCode': 5004, 'Message': 'gallery name not found'}]}))
+
+        with self.assertRaises(kairos_face.ServiceRequestError) as context:
+            kairos_face.get_gallery_object('non-existing-gallery')
+
+        self.assertEqual(5004, context.exception.response_msg['Errors'][0]['ErrCode'])
+
+    def test_diff_lists_added_and_removed_subjects(self):
+        before = kairos_face.KairosFaceGallery('a-gallery', ['subject1', 'subject2'])
+        after = kairos_face.KairosFaceGallery('a-gallery', ['subject2', 'subject3'])
+
+        diff = before.diff(after)
+
+        self.assertEqual({'subject3'}, diff.added)
+        self.assertEqual({'subject1'}, diff.removed)
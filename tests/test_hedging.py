@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import kairos_face
+
+
+class HedgingPolicyTest(unittest.TestCase):
+    def _warm_up(self, policy, latency=0.001, samples=20):
+        for _ in range(samples):
+            policy.call('recognize', lambda: time.sleep(latency))
+
+    def test_no_hedge_is_sent_before_enough_latencies_are_known(self):
+        policy = kairos_face.HedgingPolicy(budget=1.0, min_delay=0.001)
+        func = mock.Mock(return_value='response')
+
+        self.assertEqual('response', policy.call('recognize', func))
+        self.assertEqual(1, func.call_count)
+        self.assertEqual(0, policy.hedges)
+
+    def test_slow_request_is_hedged_and_fastest_response_is_returned(self):
+        policy = kairos_face.HedgingPolicy(budget=1.0, min_delay=0.001)
+        self._warm_up(policy)
+        release_first = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                release_first.wait(5)
+                return 'slow'
+            return 'fast'
+
+        self.assertEqual('fast', policy.call('recognize', func))
+        release_first.set()
+        self.assertEqual(1, policy.hedges)
+        self.assertEqual(1, policy.hedges_won)
+
+    def test_hedges_are_limited_by_budget(self):
+        policy = kairos_face.HedgingPolicy(budget=0.5)
+        func = mock.Mock(side_effect=lambda: time.sleep(0.05) or 'response')
+
+        with mock.patch.object(policy, '_hedge_delay', return_value=0.001):
+            for _ in range(3):
+                policy.call('recognize', func)
+
+        self.assertEqual(3, policy.requests)
+        self.assertEqual(1, policy.hedges)
+        self.assertEqual(4, func.call_count)
+
+    def test_error_of_one_attempt_waits_for_the_other(self):
+        policy = kairos_face.HedgingPolicy(budget=1.0, min_delay=0.001)
+        self._warm_up(policy)
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.05)
+                return 'response'
+            raise kairos_face.ServiceRequestError(502, {}, None)
+
+        self.assertEqual('response', policy.call('recognize', func))
+
+    def test_gallery_changing_endpoints_are_never_hedged(self):
+        policy = kairos_face.HedgingPolicy(budget=1.0, min_delay=0.001)
+        func = mock.Mock(return_value='response')
+
+        policy.call('enroll', func)
+
+        self.assertEqual(0, policy.requests)
+
+
+class KairosClientHedgingTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    def test_read_only_requests_go_through_hedging_policy(self):
+        policy = kairos_face.HedgingPolicy()
+        client = kairos_face.KairosClient(hedging_policy=policy)
+
+        with mock.patch.object(client, '_send', return_value={'images': []}):
+            kairos_face.verify_face('sub_id', 'gallery', url='an_image_url.jpg', client=client)
+
+        self.assertEqual(1, policy.requests)
+
+    def test_hedging_does_not_cap_the_client_concurrency(self):
+        policy = kairos_face.HedgingPolicy(budget=1.0, min_delay=10, min_samples=1)
+        client = kairos_face.KairosClient(pool_maxsize=2, hedging_policy=policy)
+        lock = threading.Lock()
+        all_in_flight = threading.Event()
+        in_flight = []
+        peak = []
+
+        def send(endpoint, payload, stream_parser=None):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+                if len(in_flight) == 16:
+                    all_in_flight.set()
+            all_in_flight.wait(2)
+            with lock:
+                in_flight.pop()
+            return {'images': []}
+
+        with mock.patch.object(client, '_send', side_effect=lambda *args: {'images': []}):
+            kairos_face.detect_face(url='an_image_url.jpg', client=client)
+        with mock.patch.object(client, '_send', side_effect=send):
+            threads = [threading.Thread(target=kairos_face.detect_face, kwargs={'url': 'image.jpg', 'client': client})
+                       for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(16, max(peak))
+        self.assertEqual(0, policy.hedges)
@@ -0,0 +1,90 @@
+import array
+import base64
+import io
+import unittest
+from unittest import mock
+
+import kairos_face
+from kairos_face import image_source
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ImageSourceTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    def test_encodes_raw_bytes(self):
+        self.assertEqual('dGVzdA==', kairos_face.ImageSource(b'test').encode())
+
+    def test_encodes_buffer_protocol_objects(self):
+        self.assertEqual('dGVzdA==', kairos_face.ImageSource(bytearray(b'test')).encode())
+        self.assertEqual('dGVzdA==', kairos_face.ImageSource(memoryview(b'test')).encode())
+        self.assertEqual('dGVzdA==', kairos_face.ImageSource(array.array('B', b'test')).encode())
+        self.assertEqual('dGVzdA==', kairos_face.ImageSource(memoryview(b'test').cast('B', (2, 2))).encode())
+
+    def test_encodes_file_objects(self):
+        self.assertEqual('dGVzdA==', kairos_face.ImageSource(io.BytesIO(b'test')).encode())
+
+    def test_file_object_is_read_only_once(self):
+        fp = io.BytesIO(b'test')
+        source = kairos_face.ImageSource(fp)
+
+        source.encode()
+        self.assertEqual(b'test', source.open().read())
+        self.assertEqual(4, source.size())
+
+    def test_encoded_contents_are_memoized(self):
+        source = kairos_face.ImageSource(b'test')
+
+        with mock.patch('kairos_face.image_source.base64.b64encode', wraps=base64.b64encode) as b64encode:
+            source.encode()
+            source.encode()
+
+        self.assertEqual(1, b64encode.call_count)
+
+    @unittest.skipIf(numpy is None or image_source.Image is None, 'NumPy and Pillow are not installed')
+    def test_encodes_numpy_frames_as_jpeg(self):
+        frame = numpy.zeros((48, 64, 3), dtype=numpy.uint8)
+
+        contents = base64.b64decode(kairos_face.ImageSource(frame).encode())
+
+        self.assertEqual(b'\xff\xd8', contents[:2])
+        self.assertEqual((64, 48), image_source.Image.open(io.BytesIO(contents)).size)
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_one_dimensional_numpy_arrays_are_encoded_image_buffers(self):
+        buffer = numpy.frombuffer(b'test', dtype=numpy.uint8)
+
+        self.assertEqual('dGVzdA==', kairos_face.ImageSource(buffer).encode())
+
+    @mock.patch('requests.Session.post')
+    def test_same_source_is_encoded_once_across_endpoints(self, post_mock):
+        post_mock.return_value.status_code = 200
+        source = kairos_face.ImageSource(b'test')
+
+        with mock.patch('kairos_face.image_source.base64.b64encode', wraps=base64.b64encode) as b64encode:
+            kairos_face.detect_face(file=source)
+            kairos_face.recognize_face('gallery', file=source)
+            kairos_face.verify_face('sub_id', 'gallery', file=source)
+
+        self.assertEqual(1, b64encode.call_count)
+        sent_images = [kwargs['json']['image'] for _, kwargs in post_mock.call_args_list]
+        self.assertEqual(['dGVzdA=='] * 3, sent_images)
+
+    @mock.patch('requests.Session.post')
+    def test_endpoints_accept_raw_bytes_as_file(self, post_mock):
+        post_mock.return_value.status_code = 200
+
+        kairos_face.enroll_face('sub_id', 'gallery', file=b'test')
+
+        _, kwargs = post_mock.call_args
+        self.assertEqual('dGVzdA==', kwargs['json']['image'])
+
+    def test_throws_exception_when_both_image_source_and_url_are_passed(self):
+        with self.assertRaises(ValueError):
+            kairos_face.detect_face(url='an_image_url.jpg', file=kairos_face.ImageSource(b'test'))
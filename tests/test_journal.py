@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import responses
+
+import kairos_face
+
+
+class JobJournalTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'journal.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_outcomes_survive_reopening_the_journal(self):
+        with kairos_face.JobJournal(self.path, job='job1') as journal:
+            journal.record('item1')
+            journal.record('item2', error=ValueError('failed'))
+
+        with kairos_face.JobJournal(self.path, job='job1') as journal:
+            self.assertTrue(journal.succeeded('item1'))
+            self.assertFalse(journal.succeeded('item2'))
+            self.assertEqual(['item2'], journal.failed_keys())
+        with kairos_face.JobJournal(self.path, job='job2') as journal:
+            self.assertFalse(journal.succeeded('item1'))
+
+    def test_writes_outcomes_in_batches(self):
+        journal = kairos_face.JobJournal(self.path, batch_size=3, flush_interval=3600)
+        reader = kairos_face.JobJournal(self.path)
+
+        journal.record('item1')
+        journal.record('item2')
+        self.assertEqual({}, reader.counts())
+        journal.record('item3')
+        self.assertEqual({'succeeded': 3}, reader.counts())
+
+        journal.close()
+        reader.close()
+
+    @responses.activate
+    def test_restarted_enrollment_only_sends_unfinished_items(self):
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{"face_id": "id"}')
+        items = [{'subject_id': 'sub{}'.format(i), 'url': 'http://some.server/{}.jpg'.format(i)} for i in range(10)]
+        with kairos_face.JobJournal(self.path) as journal:
+            list(kairos_face.enroll_faces(items[:6], gallery_name='gallery', journal=journal))
+        responses.calls.reset()
+
+        with kairos_face.JobJournal(self.path) as journal:
+            results = list(kairos_face.enroll_faces(items, gallery_name='gallery', journal=journal))
+
+        self.assertEqual(4, len(results))
+        sent = {json.loads(call.request.body)['subject_id'] for call in responses.calls}
+        self.assertEqual({'sub6', 'sub7', 'sub8', 'sub9'}, sent)
+
+    @responses.activate
+    def test_images_of_the_same_subject_are_journaled_separately(self):
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{"face_id": "id"}')
+        items = [{'subject_id': 'alice', 'file': b'one'}] + \
+            [{'subject_id': 'sub{}'.format(i), 'url': 'http://some.server/{}.jpg'.format(i)} for i in range(5)] + \
+            [{'subject_id': 'alice', 'file': b'two'}]
+        with kairos_face.JobJournal(self.path) as journal:
+            results = list(kairos_face.enroll_faces(items, max_workers=1, gallery_name='gallery', journal=journal))
+            rerun = list(kairos_face.enroll_faces(items, max_workers=1, gallery_name='gallery', journal=journal))
+
+        self.assertEqual(7, len(results))
+        self.assertTrue(any(result.item is items[-1] for result in results))
+        alice_images = [json.loads(call.request.body)['image'] for call in responses.calls
+                        if json.loads(call.request.body)['subject_id'] == 'alice']
+        self.assertEqual(['b25l', 'dHdv'], sorted(alice_images))
+        self.assertEqual([], rerun)
+
+    @responses.activate
+    def test_failed_removals_are_retried(self):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/remove_subject', status=500, body='{}')
+        with kairos_face.JobJournal(self.path) as journal:
+            results = list(kairos_face.remove_faces(['sub1', 'sub2'], 'gallery', journal=journal))
+        self.assertFalse(any(result.succeeded for result in results))
+        responses.replace(responses.POST, 'https://api.kairos.com/gallery/remove_subject', status=200, body='{}')
+
+        with kairos_face.JobJournal(self.path) as journal:
+            results = list(kairos_face.remove_faces(['sub1', 'sub2'], 'gallery', journal=journal))
+            retried = list(kairos_face.remove_faces(['sub1', 'sub2'], 'gallery', journal=journal))
+
+        self.assertEqual({'sub1', 'sub2'}, {result.item for result in results if result.succeeded})
+        self.assertEqual([], retried)
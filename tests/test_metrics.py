@@ -0,0 +1,68 @@
+import json
+import unittest
+
+import responses
+
+import kairos_face
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.records = []
+        self.metrics = kairos_face.Metrics(hooks=[self.records.append])
+        self.client = kairos_face.KairosClient(metrics=self.metrics)
+
+    @responses.activate
+    def test_hooks_receive_sizes_status_and_stage_timings(self):
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=200, body='{"images": []}')
+
+        kairos_face.recognize_face('gallery', file=kairos_face.ImageSource(b'test'), client=self.client)
+
+        record, = self.records
+        sent_body = responses.calls[0].request.body
+        self.assertEqual('recognize', record.endpoint)
+        self.assertEqual(200, record.status_code)
+        self.assertIsNone(record.error)
+        self.assertEqual(len(sent_body), record.request_bytes)
+        self.assertEqual(len('{"images": []}'), record.response_bytes)
+        self.assertEqual({'encode', 'serialize', 'network', 'parse'}, set(record.stages))
+        self.assertEqual({'image': 'dGVzdA==', 'gallery_name': 'gallery'}, json.loads(sent_body.decode('utf-8')))
+
+    @responses.activate
+    def test_request_headers_are_kept(self):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/list_all', status=200,
+                      body='{"gallery_ids": []}')
+
+        kairos_face.get_galleries_names_list(client=self.client)
+
+        headers = responses.calls[0].request.headers
+        self.assertEqual('app_id', headers['app_id'])
+        self.assertEqual('app_key', headers['app_key'])
+
+    @responses.activate
+    def test_errors_are_counted_by_status_code(self):
+        responses.add(responses.POST, 'https://api.kairos.com/detect', status=503, body='{}')
+
+        with self.assertRaises(kairos_face.ServiceRequestError):
+            kairos_face.detect_face(url='an_image_url.jpg', client=self.client)
+
+        exported = self.metrics.to_prometheus()
+        self.assertIn('kairos_requests_total{endpoint="detect",status="503"} 1', exported)
+        self.assertIn('kairos_request_errors_total{endpoint="detect",status="503"} 1', exported)
+
+    def test_exports_latency_histogram_in_prometheus_text_format(self):
+        metrics = kairos_face.Metrics(buckets=(0.1, 1.0))
+        for latency in (0.05, 0.5, 5.0):
+            metrics.record(kairos_face.metrics.RequestMetrics('enroll', 200, None, latency, 10, 20, {'network': 0.1}))
+
+        exported = metrics.to_prometheus()
+
+        self.assertIn('kairos_request_duration_seconds_bucket{endpoint="enroll",le="0.1"} 1', exported)
+        self.assertIn('kairos_request_duration_seconds_bucket{endpoint="enroll",le="1.0"} 2', exported)
+        self.assertIn('kairos_request_duration_seconds_bucket{endpoint="enroll",le="+Inf"} 3', exported)
+        self.assertIn('kairos_request_duration_seconds_count{endpoint="enroll"} 3', exported)
+        self.assertIn('kairos_request_bytes_total{endpoint="enroll"} 30', exported)
+        self.assertIn('kairos_response_bytes_total{endpoint="enroll"} 60', exported)
+        self.assertIn('kairos_stage_count_total{endpoint="enroll",stage="network"} 3', exported)
@@ -0,0 +1,106 @@
+import json
+import threading
+import unittest
+from unittest import mock
+
+import responses
+
+import kairos_face
+
+
+class GalleryMirrorTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.client = kairos_face.KairosClient()
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                      body=json.dumps({'status': 'Complete', 'subject_ids': ['subject1', 'subject2']}))
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{"face_id": "id"}')
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/remove_subject', status=200,
+                      body='{"status": "Complete"}')
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/remove', status=200,
+                      body='{"status": "Complete"}')
+
+    def _gallery_view_calls(self):
+        return [call for call in responses.calls if call.request.url.endswith('/gallery/view')]
+
+    @responses.activate
+    def test_gallery_is_fetched_once(self):
+        mirror = kairos_face.GalleryMirror(self.client)
+
+        self.assertTrue(mirror.contains('gallery', 'subject1'))
+        self.assertFalse(mirror.contains('gallery', 'subject3'))
+        self.assertEqual({'subject1', 'subject2'}, mirror.subjects('gallery'))
+        self.assertEqual(1, len(self._gallery_view_calls()))
+
+    @responses.activate
+    def test_enrolls_and_removals_through_client_update_mirror(self):
+        mirror = kairos_face.GalleryMirror(self.client)
+        mirror.subjects('gallery')
+
+        kairos_face.enroll_face('subject3', 'gallery', url='an_image_url.jpg', client=self.client)
+        kairos_face.remove_face('subject1', 'gallery', client=self.client)
+
+        self.assertEqual({'subject2', 'subject3'}, mirror.subjects('gallery'))
+        kairos_face.remove_gallery('gallery', client=self.client)
+        self.assertEqual(set(), mirror.subjects('gallery'))
+        self.assertEqual(1, len(self._gallery_view_calls()))
+
+    @responses.activate
+    def test_failed_enroll_does_not_update_mirror(self):
+        responses.replace(responses.POST, 'https://api.kairos.com/enroll', status=200,
+                          body='{"Errors": [{"ErrCode": 5002}]}')
+        mirror = kairos_face.GalleryMirror(self.client)
+        mirror.subjects('gallery')
+
+        with self.assertRaises(kairos_face.ServiceRequestError):
+            kairos_face.enroll_face('subject3', 'gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertFalse(mirror.contains('gallery', 'subject3'))
+
+    @responses.activate
+    def test_non_existing_gallery_is_mirrored_as_empty(self):
+        responses.replace(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                          body='{"Errors": [{"ErrCode": 5004, "Message": "gallery name not found"}]}')
+        mirror = kairos_face.GalleryMirror(self.client)
+
+        self.assertEqual(set(), mirror.subjects('new-gallery'))
+        kairos_face.enroll_face('subject1', 'new-gallery', url='an_image_url.jpg', client=self.client)
+        self.assertTrue(mirror.contains('new-gallery', 'subject1'))
+
+    @responses.activate
+    def test_stale_gallery_is_refreshed_in_background(self):
+        mirror = kairos_face.GalleryMirror(self.client, max_staleness=60)
+        with mock.patch('kairos_face.mirror.time.monotonic', return_value=1000):
+            mirror.subjects('gallery')
+        stale_read_done = threading.Event()
+        refreshed = threading.Event()
+        original_refresh = mirror.refresh
+
+        def refresh(gallery_name):
+            stale_read_done.wait(5)
+            original_refresh(gallery_name)
+            refreshed.set()
+
+        responses.replace(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                          body=json.dumps({'subject_ids': ['subject1', 'subject2', 'subject3']}))
+        # The clock stays pinned until the last read, which would otherwise depend on the host's uptime
+        with mock.patch.object(mirror, 'refresh', refresh), \
+                mock.patch('kairos_face.mirror.time.monotonic', return_value=1100):
+            self.assertFalse(mirror.contains('gallery', 'subject3'))
+            stale_read_done.set()
+            self.assertTrue(refreshed.wait(5))
+            self.assertTrue(mirror.contains('gallery', 'subject3'))
+
+        self.assertEqual(2, len(self._gallery_view_calls()))
+
+    @responses.activate
+    def test_stale_gallery_is_refreshed_before_read_without_background_refresh(self):
+        mirror = kairos_face.GalleryMirror(self.client, max_staleness=60, background_refresh=False)
+        with mock.patch('kairos_face.mirror.time.monotonic', return_value=1000):
+            mirror.subjects('gallery')
+
+        responses.replace(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                          body=json.dumps({'subject_ids': ['subject3']}))
+        with mock.patch('kairos_face.mirror.time.monotonic', return_value=1100):
+            self.assertEqual({'subject3'}, mirror.subjects('gallery'))
@@ -0,0 +1,124 @@
+import base64
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import responses
+
+import kairos_face
+from kairos_face import preprocessing
+from kairos_face.encoding import Base64File
+
+if preprocessing.Image is not None:
+    from PIL import Image
+
+
+def _jpeg_bytes(size, orientation=None):
+    image = Image.new('RGB', size, color=(200, 120, 40))
+    output = io.BytesIO()
+    if orientation is None:
+        image.save(output, format='JPEG', quality=95)
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(output, format='JPEG', quality=95, exif=exif)
+    return output.getvalue()
+
+
+@unittest.skipIf(preprocessing.Image is None, 'Pillow is not installed')
+class ImagePreprocessorTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    def _write_image(self, contents):
+        fd, path = tempfile.mkstemp(suffix='.jpg')
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(contents)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_downscales_images_larger_than_max_dimension(self):
+        preprocessor = kairos_face.ImagePreprocessor(max_dimension=200)
+
+        processed = Image.open(io.BytesIO(preprocessor.process(_jpeg_bytes((1600, 1200)))))
+
+        self.assertEqual((200, 150), processed.size)
+
+    def test_keeps_small_jpeg_images_untouched(self):
+        original = _jpeg_bytes((100, 80))
+        preprocessor = kairos_face.ImagePreprocessor(max_dimension=200)
+
+        self.assertEqual(original, preprocessor.process(original))
+
+    def test_applies_exif_orientation(self):
+        preprocessor = kairos_face.ImagePreprocessor(max_dimension=1000)
+
+        processed = Image.open(io.BytesIO(preprocessor.process(_jpeg_bytes((300, 100), orientation=6))))
+
+        self.assertEqual((100, 300), processed.size)
+
+    @mock.patch('requests.Session.post')
+    def test_client_uploads_processed_image_and_leaves_original_file_untouched(self, post_mock):
+        post_mock.return_value.status_code = 200
+        original = _jpeg_bytes((2000, 1000))
+        path = self._write_image(original)
+        reports = []
+        preprocessor = kairos_face.ImagePreprocessor(max_dimension=500,
+                                                     on_processed=lambda *args: reports.append(args))
+
+        with kairos_face.KairosClient(preprocessor=preprocessor) as client:
+            kairos_face.recognize_face('gallery', file=path, client=client)
+
+        _, kwargs = post_mock.call_args
+        uploaded = base64.b64decode(kwargs['json']['image'])
+        self.assertEqual((500, 250), Image.open(io.BytesIO(uploaded)).size)
+        with open(path, 'rb') as fp:
+            self.assertEqual(original, fp.read())
+        self.assertEqual([(path, len(original), len(uploaded))], reports)
+        self.assertEqual(len(original), preprocessor.bytes_before)
+        self.assertEqual(len(uploaded), preprocessor.bytes_after)
+
+    @responses.activate
+    @mock.patch('kairos_face.retry.time.sleep')
+    def test_images_are_processed_once_however_many_attempts_are_sent(self, sleep_mock):
+        for status in (503, 503, 200):
+            responses.add(responses.POST, 'https://api.kairos.com/recognize', status=status, body='{"images": []}')
+        preprocessor = kairos_face.ImagePreprocessor(max_dimension=500)
+        metrics = kairos_face.Metrics()
+        client = kairos_face.KairosClient(preprocessor=preprocessor, metrics=metrics,
+                                          retry_policy=kairos_face.RetryPolicy(max_attempts=3))
+
+        kairos_face.recognize_face('gallery', file=self._write_image(_jpeg_bytes((2000, 1000))), client=client)
+
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual(1, preprocessor.images_processed)
+        self.assertIn('kairos_stage_count_total{endpoint="recognize",stage="preprocess"} 1', metrics.to_prometheus())
+
+    def test_files_that_are_not_images_are_uploaded_untouched(self):
+        path = self._write_image(b'not an image')
+        preprocessor = kairos_face.ImagePreprocessor()
+
+        processed = preprocessor.process_payload({'image': Base64File(path), 'gallery_name': 'gallery'})
+
+        self.assertEqual(b'not an image', processed['image'].read())
+        self.assertEqual((1, 12, 12), (preprocessor.images_processed, preprocessor.bytes_before,
+                                       preprocessor.bytes_after))
+
+    def test_urls_are_not_processed(self):
+        preprocessor = kairos_face.ImagePreprocessor()
+        payload = {'image': 'http://some.server/image.jpg', 'gallery_name': 'gallery'}
+
+        self.assertEqual(payload, preprocessor.process_payload(payload))
+        self.assertEqual(0, preprocessor.images_processed)
+
+    def test_processes_file_contents_only(self):
+        path = self._write_image(_jpeg_bytes((50, 50)))
+        preprocessor = kairos_face.ImagePreprocessor()
+
+        processed = preprocessor.process_payload({'image': Base64File(path), 'subject_id': 'sub'})
+
+        self.assertEqual('sub', processed['subject_id'])
+        self.assertEqual(1, preprocessor.images_processed)
@@ -37,7 +37,7 @@ class KairosApiRecognizeFaceTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             kairos_face.recognize_face('gallery', url='an_image_url.jpg', file='/path/tp/image.jpg')
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_passes_required_arguments_in_payload_as_json_when_image_is_file(self, post_mock):
         post_mock.return_value.status_code = 200
 
@@ -54,7 +54,7 @@ class KairosApiRecognizeFaceTest(unittest.TestCase):
         self.assertTrue('json' in kwargs)
         self.assertEqual(expected_payload, kwargs['json'])
 
-    @mock.patch('kairos_face.requests.post')
+    @mock.patch('requests.Session.post')
     def test_passes_additional_arguments_in_payload(self, post_mock):
         post_mock.return_value.status_code = 200
         additional_arguments = {
@@ -0,0 +1,160 @@
+import unittest
+from unittest import mock
+
+import requests
+import responses
+
+import kairos_face
+
+
+@mock.patch('kairos_face.retry.time.sleep')
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.client = kairos_face.KairosClient(retry_policy=kairos_face.RetryPolicy(max_attempts=3))
+
+    @responses.activate
+    def test_transient_errors_on_read_only_endpoints_are_retried(self, sleep_mock):
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=502, body='{}')
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=200, body='{"images": []}')
+
+        response = kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual({'images': []}, response)
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual(1, sleep_mock.call_count)
+
+    @responses.activate
+    def test_connection_errors_are_retried(self, sleep_mock):
+        responses.add(responses.POST, 'https://api.kairos.com/detect', body=requests.ConnectionError())
+        responses.add(responses.POST, 'https://api.kairos.com/detect', status=200, body='{}')
+
+        kairos_face.detect_face(url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual(2, len(responses.calls))
+
+    @responses.activate
+    def test_gives_up_after_max_attempts(self, sleep_mock):
+        responses.add(responses.POST, 'https://api.kairos.com/verify', status=503, body='{}')
+
+        with self.assertRaises(kairos_face.ServiceRequestError):
+            kairos_face.verify_face('sub_id', 'gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_enroll_is_not_retried_by_default(self, sleep_mock):
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=502, body='{}')
+
+        with self.assertRaises(kairos_face.ServiceRequestError):
+            kairos_face.enroll_face('sub_id', 'gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual(1, len(responses.calls))
+
+    @responses.activate
+    def test_client_errors_are_not_retried(self, sleep_mock):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                      body='{"Errors": [{"ErrCode": 5004}]}')
+
+        with self.assertRaises(kairos_face.ServiceRequestError):
+            kairos_face.get_gallery('gallery', client=self.client)
+
+        self.assertEqual(1, len(responses.calls))
+
+    def test_backoff_grows_exponentially_with_jitter(self, sleep_mock):
+        policy = kairos_face.RetryPolicy(max_attempts=4, backoff=1.0, max_backoff=3.0, max_retry_time=100)
+        error = kairos_face.ServiceRequestError(503, {}, None)
+
+        with mock.patch('kairos_face.retry.random.uniform', side_effect=lambda low, high: high) as uniform_mock:
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                policy.call('recognize', mock.Mock(side_effect=error))
+
+        self.assertEqual([(0, 1.0), (0, 2.0), (0, 3.0)], [call[0] for call in uniform_mock.call_args_list])
+
+    def test_stops_retrying_when_total_retry_time_would_be_exceeded(self, sleep_mock):
+        policy = kairos_face.RetryPolicy(max_attempts=10, backoff=4.0, max_backoff=4.0, max_retry_time=3.0)
+        func = mock.Mock(side_effect=kairos_face.ServiceRequestError(503, {}, None))
+
+        with mock.patch('kairos_face.retry.random.uniform', side_effect=lambda low, high: high):
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                policy.call('recognize', func)
+
+        self.assertEqual(1, func.call_count)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.breaker = kairos_face.CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        self.client = kairos_face.KairosClient(circuit_breaker=self.breaker)
+
+    @responses.activate
+    def test_fails_fast_once_endpoint_keeps_failing(self):
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=500, body='{}')
+
+        for _ in range(2):
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+        with self.assertRaises(kairos_face.CircuitOpenError):
+            kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual(2, len(responses.calls))
+
+    @responses.activate
+    def test_circuits_are_kept_per_endpoint(self):
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=500, body='{}')
+        responses.add(responses.POST, 'https://api.kairos.com/detect', status=200, body='{}')
+
+        for _ in range(2):
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+
+        self.assertEqual({}, kairos_face.detect_face(url='an_image_url.jpg', client=self.client))
+
+    @responses.activate
+    def test_request_errors_do_not_open_circuit(self):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                      body='{"Errors": [{"ErrCode": 5004}]}')
+
+        for _ in range(3):
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                kairos_face.get_gallery('gallery', client=self.client)
+
+        self.assertFalse(self.breaker.is_open('gallery/view'))
+
+    @mock.patch('kairos_face.retry.time.monotonic')
+    def test_single_probe_is_let_through_after_reset_timeout(self, monotonic_mock):
+        monotonic_mock.return_value = 100.0
+        for _ in range(2):
+            self.breaker.before_call('recognize')
+            self.breaker.record_failure('recognize')
+
+        monotonic_mock.return_value = 131.0
+        self.breaker.before_call('recognize')
+        with self.assertRaises(kairos_face.CircuitOpenError):
+            self.breaker.before_call('recognize')
+
+        self.breaker.record_success('recognize')
+        self.assertFalse(self.breaker.is_open('recognize'))
+
+    @responses.activate
+    @mock.patch('kairos_face.retry.time.monotonic')
+    def test_probe_failing_before_being_sent_does_not_keep_circuit_open(self, monotonic_mock):
+        for _ in range(2):
+            responses.add(responses.POST, 'https://api.kairos.com/recognize', status=503, body='{}')
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=200, body='{"images": []}')
+        monotonic_mock.return_value = 100.0
+        for _ in range(2):
+            with self.assertRaises(kairos_face.ServiceRequestError):
+                kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client)
+
+        monotonic_mock.return_value = 131.0
+        with self.assertRaises(OSError):
+            kairos_face.recognize_face('gallery', file='/missing.jpg', client=self.client)
+        self.assertTrue(self.breaker.is_open('recognize'))
+
+        self.assertEqual({'images': []},
+                         kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=self.client))
+        self.assertFalse(self.breaker.is_open('recognize'))
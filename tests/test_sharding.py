@@ -0,0 +1,199 @@
+import collections
+import json
+import unittest
+
+import responses
+
+import kairos_face
+from kairos_face import exceptions
+
+
+class _FakeKairos:
+    # Keeps galleries in memory; recognize finds the subjects named in the image URL, with confidences from the URL
+    def __init__(self):
+        self.galleries = collections.defaultdict(set)
+        self.recognized_galleries = []
+        self.failing_gallery = None
+
+    def register(self):
+        for endpoint, handler in (('enroll', self._enroll), ('gallery/remove_subject', self._remove),
+                                  ('gallery/view', self._view), ('recognize', self._recognize)):
+            responses.add_callback(responses.POST, 'https://api.kairos.com/' + endpoint,
+                                   callback=lambda request, handler=handler: handler(json.loads(request.body)))
+
+    def _enroll(self, payload):
+        self.galleries[payload['gallery_name']].add(payload['subject_id'])
+        return 200, {}, json.dumps({'face_id': 'id'})
+
+    def _remove(self, payload):
+        self.galleries[payload['gallery_name']].discard(payload['subject_id'])
+        return 200, {}, json.dumps({'status': 'Complete'})
+
+    def _view(self, payload):
+        if payload['gallery_name'] not in self.galleries:
+            return 200, {}, json.dumps({'Errors': [{'ErrCode': 5004, 'Message': 'gallery name not found'}]})
+        subject_ids = sorted(self.galleries[payload['gallery_name']])
+        return 200, {}, json.dumps({'status': 'Complete', 'subject_ids': subject_ids})
+
+    def _recognize(self, payload):
+        gallery_name = payload['gallery_name']
+        self.recognized_galleries.append(gallery_name)
+        if gallery_name == self.failing_gallery:
+            return 500, {}, json.dumps({'Errors': [{'ErrCode': 1000, 'Message': 'internal error'}]})
+        if gallery_name not in self.galleries:
+            return 200, {}, json.dumps({'Errors': [{'ErrCode': 5004, 'Message': 'gallery name not found'}]})
+        scores = dict(item.split('=') for item in payload['image'].split('?')[1].split('&'))
+        candidates = sorted(({'subject_id': subject_id, 'confidence': float(scores[subject_id])}
+                             for subject_id in self.galleries[gallery_name] if subject_id in scores),
+                            key=lambda candidate: candidate['confidence'], reverse=True)
+        candidates = candidates[:payload['max_num_results']]
+        transaction = {'topLeftX': 10, 'topLeftY': 20, 'width': 100, 'height': 100, 'gallery_name': gallery_name}
+        if candidates:
+            transaction.update(status='success', subject_id=candidates[0]['subject_id'],
+                               confidence=candidates[0]['confidence'])
+            image = {'transaction': transaction, 'candidates': candidates}
+        else:
+            image = {'transaction': dict(transaction, status='failure', message='No match found')}
+        return 200, {}, json.dumps({'images': [image]})
+
+
+class ShardedGalleryTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.client = kairos_face.KairosClient()
+        self.kairos = _FakeKairos()
+        self.gallery = kairos_face.ShardedGallery('gallery', 4, client=self.client)
+
+    def tearDown(self):
+        self.gallery.close()
+        self.client.close()
+
+    def _enroll(self, subject_ids):
+        for subject_id in subject_ids:
+            self.gallery.enroll_face(subject_id, url='http://some.server/{}.jpg'.format(subject_id))
+
+    @responses.activate
+    def test_routes_each_subject_to_its_shard(self):
+        self.kairos.register()
+        subject_ids = ['subject{}'.format(i) for i in range(200)]
+
+        self._enroll(subject_ids)
+        self.gallery.remove_face('subject0')
+
+        self.assertEqual(['gallery-0', 'gallery-1', 'gallery-2', 'gallery-3'], sorted(self.kairos.galleries))
+        for shard_name, shard_subjects in self.kairos.galleries.items():
+            self.assertTrue(20 < len(shard_subjects) < 80)
+            for subject_id in shard_subjects:
+                self.assertEqual(shard_name, self.gallery.shard_for(subject_id))
+        self.assertEqual(set(subject_ids[1:]), set.union(*self.kairos.galleries.values()))
+
+    @responses.activate
+    def test_merges_the_candidates_of_every_shard_into_one_ranking(self):
+        self.kairos.register()
+        self._enroll(['subject{}'.format(i) for i in range(40)])
+
+        response = self.gallery.recognize_face(url='http://some.server/image.jpg?subject3=0.7&subject17=0.95&'
+                                                   'subject21=0.8&subject30=0.6', top_k=3)
+
+        self.assertEqual(sorted(self.gallery.shard_names), sorted(self.kairos.recognized_galleries))
+        face, = response['images']
+        self.assertEqual(['subject17', 'subject21', 'subject3'],
+                         [candidate['subject_id'] for candidate in face['candidates']])
+        self.assertEqual(('success', 'subject17', self.gallery.shard_for('subject17')),
+                         (face['transaction']['status'], face['transaction']['subject_id'],
+                          face['transaction']['gallery_name']))
+        self.assertEqual('subject17', self.gallery.recognize_face_object(
+            url='http://some.server/image.jpg?subject17=0.95').images[0].best_candidate.subject_id)
+
+    @responses.activate
+    def test_returns_a_failed_transaction_when_no_shard_matches(self):
+        self.kairos.register()
+        self._enroll(['subject{}'.format(i) for i in range(10)])
+
+        face, = self.gallery.recognize_face(url='http://some.server/image.jpg?unknown=0.9')['images']
+
+        self.assertEqual('failure', face['transaction']['status'])
+        self.assertNotIn('candidates', face)
+
+    @responses.activate
+    def test_shards_that_do_not_exist_yet_are_empty(self):
+        self.kairos.register()
+        self._enroll(['subject1'])
+
+        face, = self.gallery.recognize_face(url='http://some.server/image.jpg?subject1=0.9')['images']
+
+        self.assertEqual('subject1', face['transaction']['subject_id'])
+
+    @responses.activate
+    def test_fails_when_a_shard_fails(self):
+        self.kairos.register()
+        self._enroll(['subject{}'.format(i) for i in range(40)])
+        self.kairos.failing_gallery = 'gallery-2'
+
+        with self.assertRaises(exceptions.ServiceRequestError):
+            self.gallery.recognize_face(url='http://some.server/image.jpg?subject1=0.9')
+        self.assertEqual(4, len(self.kairos.recognized_galleries))
+
+    @responses.activate
+    def test_sends_the_same_encoded_image_to_every_shard(self):
+        images = []
+        responses.add_callback(responses.POST, 'https://api.kairos.com/recognize',
+                               callback=lambda request: (images.append(json.loads(request.body)['image']) or
+                                                         (200, {}, json.dumps({'images': []}))))
+
+        self.gallery.recognize_face(file=b'image bytes')
+
+        self.assertEqual(4, len(images))
+        self.assertEqual(1, len(set(images)))
+
+    @responses.activate
+    def test_rebalancing_only_moves_subjects_to_new_shards(self):
+        self.kairos.register()
+        subject_ids = ['subject{}'.format(i) for i in range(200)]
+        self._enroll(subject_ids)
+        images = {subject_id: 'http://some.server/{}.jpg'.format(subject_id) for subject_id in subject_ids}
+
+        plan = self.gallery.plan_rebalance(5)
+        result = self.gallery.rebalance(5, images)
+
+        self.assertTrue(result.succeeded)
+        self.assertEqual(plan, result.plan)
+        self.assertTrue(20 < len(plan.to_enroll) < 80)
+        self.assertEqual(200, len(plan.to_enroll) + plan.unchanged)
+        self.assertEqual({'gallery-4'}, {operation.gallery_name for operation in plan.to_enroll})
+        self.assertEqual((len(plan.to_enroll), len(plan.to_remove)), (result.enrolled, result.removed))
+        self.assertEqual(5, self.gallery.shard_count)
+        for shard_name, shard_subjects in self.kairos.galleries.items():
+            for subject_id in shard_subjects:
+                self.assertEqual(shard_name, self.gallery.shard_for(subject_id))
+        self.assertEqual(set(subject_ids), set.union(*self.kairos.galleries.values()))
+
+    @responses.activate
+    def test_subjects_without_an_image_stay_in_their_shard(self):
+        self.kairos.register()
+        subject_ids = ['subject{}'.format(i) for i in range(100)]
+        self._enroll(subject_ids)
+        plan = self.gallery.plan_rebalance(5)
+        missing = plan.to_enroll[0].subject_id
+        images = {subject_id: 'http://some.server/{}.jpg'.format(subject_id)
+                  for subject_id in subject_ids if subject_id != missing}
+
+        result = self.gallery.rebalance(5, images)
+
+        failure, = result.failures
+        self.assertEqual(missing, failure.item.subject_id)
+        self.assertIn(missing, self.kairos.galleries[self.gallery.shard_for(missing)])
+        self.assertEqual(4, self.gallery.shard_count)
+        self.kairos.recognized_galleries = []
+        self.gallery.recognize_face(url='http://some.server/image.jpg?subject1=0.9')
+        self.assertEqual(5, len(self.kairos.recognized_galleries))
+
+        result = self.gallery.rebalance(5, dict(images, **{missing: 'http://some.server/missing.jpg'}))
+
+        self.assertEqual((1, 1), (result.enrolled, result.removed))
+        self.assertEqual(5, self.gallery.shard_count)
+
+    def test_rejects_invalid_shard_counts(self):
+        with self.assertRaises(ValueError):
+            kairos_face.ShardedGallery('gallery', 0, client=self.client)
@@ -0,0 +1,41 @@
+import json
+import unittest
+
+from kairos_face.streaming import parse_streamed_array
+
+
+def _chunks(document, size):
+    body = json.dumps(document).encode('utf-8')
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class ParseStreamedArrayTest(unittest.TestCase):
+    def test_passes_array_items_and_returns_other_fields(self):
+        document = {'time': 12.5, 'subject_ids': ['subject1', 'sub"ject2', 'sújeito3', 7], 'status': 'Complete'}
+        for size in (1, 3, 64 * 1024):
+            items = []
+
+            fields = parse_streamed_array(_chunks(document, size), 'subject_ids', items.append)
+
+            self.assertEqual(['subject1', 'sub"ject2', 'sújeito3', 7], items)
+            self.assertEqual({'time': 12.5, 'status': 'Complete'}, fields)
+
+    def test_parses_objects_without_the_array(self):
+        items = []
+
+        fields = parse_streamed_array(_chunks({'Errors': [{'ErrCode': 5004}]}, 2), 'subject_ids', items.append)
+
+        self.assertEqual([], items)
+        self.assertEqual({'Errors': [{'ErrCode': 5004}]}, fields)
+
+    def test_parses_empty_array(self):
+        items = []
+
+        fields = parse_streamed_array(_chunks({'subject_ids': []}, 4), 'subject_ids', items.append)
+
+        self.assertEqual([], items)
+        self.assertEqual({}, fields)
+
+    def test_raises_on_truncated_document(self):
+        with self.assertRaises(ValueError):
+            parse_streamed_array([b'{"subject_ids": ["subject1", "subj'], 'subject_ids', lambda item: None)
@@ -0,0 +1,86 @@
+import json
+import unittest
+
+import responses
+
+import kairos_face
+
+
+class SyncGalleryTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.client = kairos_face.KairosClient()
+        self.manifest = {'subject2': 'http://some.server/subject2.jpg',
+                         'subject3': {'url': 'http://some.server/subject3.jpg', 'multiple_faces': True}}
+
+    def tearDown(self):
+        self.client.close()
+
+    def _add_gallery(self, subject_ids):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                      body=json.dumps({'status': 'Complete', 'subject_ids': subject_ids}))
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{"face_id": "id"}')
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/remove_subject', status=200, body='{}')
+
+    def _requests_to(self, endpoint):
+        return [json.loads(call.request.body) for call in responses.calls
+                if call.request.url == 'https://api.kairos.com/' + endpoint]
+
+    @responses.activate
+    def test_enrolls_and_removes_only_the_differences(self):
+        self._add_gallery(['subject1', 'subject2'])
+
+        result = kairos_face.sync_gallery('gallery', self.manifest, client=self.client)
+
+        self.assertTrue(result.succeeded)
+        self.assertEqual((1, 1), (result.enrolled, result.removed))
+        self.assertEqual(1, len(self._requests_to('gallery/view')))
+        enrolled, = self._requests_to('enroll')
+        self.assertEqual(('subject3', 'http://some.server/subject3.jpg', True),
+                         (enrolled['subject_id'], enrolled['image'], enrolled['multiple_faces']))
+        removed, = self._requests_to('gallery/remove_subject')
+        self.assertEqual('subject1', removed['subject_id'])
+
+    @responses.activate
+    def test_dry_run_only_returns_the_plan(self):
+        self._add_gallery(['subject1', 'subject2'])
+
+        result = kairos_face.sync_gallery('gallery', self.manifest, dry_run=True, client=self.client)
+
+        self.assertEqual(kairos_face.sync.GallerySyncPlan('gallery', ['subject3'], ['subject1'], 1), result.plan)
+        self.assertEqual(1, len(responses.calls))
+
+    @responses.activate
+    def test_subjects_are_kept_when_not_removing_missing_ones(self):
+        self._add_gallery(['subject1', 'subject2'])
+
+        plan = kairos_face.plan_gallery_sync('gallery', self.manifest, remove_missing=False, client=self.client)
+
+        self.assertEqual([], plan.to_remove)
+
+    @responses.activate
+    def test_missing_gallery_is_synced_from_scratch(self):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/view', status=200,
+                      body=json.dumps({'Errors': [{'ErrCode': 5004, 'Message': 'gallery name not found'}]}))
+        responses.add(responses.POST, 'https://api.kairos.com/enroll', status=200, body='{"face_id": "id"}')
+
+        result = kairos_face.sync_gallery('gallery', self.manifest, client=self.client)
+
+        self.assertEqual(2, result.enrolled)
+
+    @responses.activate
+    def test_reports_progress_and_failures(self):
+        self._add_gallery(['subject1'])
+        responses.replace(responses.POST, 'https://api.kairos.com/gallery/remove_subject', status=500, body='{}')
+        progress = []
+
+        def on_progress(result, completed, total):
+            progress.append((completed, total))
+
+        result = kairos_face.sync_gallery('gallery', self.manifest, on_progress=on_progress, client=self.client)
+
+        self.assertEqual([(1, 3), (2, 3), (3, 3)], progress)
+        self.assertFalse(result.succeeded)
+        self.assertEqual([kairos_face.sync.SyncOperation('remove', 'subject1')],
+                         [failure.item for failure in result.failures])
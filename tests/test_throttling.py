@@ -0,0 +1,143 @@
+import unittest
+from unittest import mock
+
+import responses
+
+import kairos_face
+
+
+class RateLimiterTest(unittest.TestCase):
+    @mock.patch('kairos_face.throttling.time.sleep')
+    @mock.patch('kairos_face.throttling.time.monotonic', return_value=100.0)
+    def test_burst_is_allowed_then_requests_are_spaced_at_the_rate(self, monotonic_mock, sleep_mock):
+        limiter = kairos_face.RateLimiter(requests_per_second=2)
+
+        limiter.acquire()
+        limiter.acquire()
+        self.assertFalse(sleep_mock.called)
+
+        limiter.acquire()
+        sleep_mock.assert_called_once_with(0.5)
+        limiter.acquire()
+        sleep_mock.assert_called_with(1.0)
+
+    @mock.patch('kairos_face.throttling.time.sleep')
+    @mock.patch('kairos_face.throttling.time.monotonic')
+    def test_tokens_refill_over_time(self, monotonic_mock, sleep_mock):
+        monotonic_mock.return_value = 100.0
+        limiter = kairos_face.RateLimiter(requests_per_second=1)
+        limiter.acquire()
+
+        monotonic_mock.return_value = 101.0
+        limiter.acquire()
+
+        self.assertFalse(sleep_mock.called)
+
+    @mock.patch('kairos_face.throttling.time.sleep')
+    @mock.patch('kairos_face.throttling.time.monotonic', return_value=100.0)
+    def test_daily_quota_is_enforced(self, monotonic_mock, sleep_mock):
+        limiter = kairos_face.RateLimiter(requests_per_second=100, requests_per_day=3)
+
+        for _ in range(3):
+            limiter.acquire()
+        self.assertFalse(sleep_mock.called)
+
+        limiter.acquire()
+        delay, = sleep_mock.call_args[0]
+        self.assertAlmostEqual(24 * 3600, delay)
+
+    @mock.patch('kairos_face.throttling.time.sleep')
+    @mock.patch('kairos_face.throttling.time.monotonic')
+    def test_no_day_holds_more_than_the_daily_quota(self, monotonic_mock, sleep_mock):
+        monotonic_mock.return_value = 100.0
+
+        def sleep(delay):
+            monotonic_mock.return_value += delay
+        sleep_mock.side_effect = sleep
+        limiter = kairos_face.RateLimiter(requests_per_day=1000)
+        sent_at = []
+
+        while monotonic_mock.return_value < 100.0 + 2 * 24 * 3600:
+            limiter.acquire()
+            sent_at.append(monotonic_mock.return_value)
+            monotonic_mock.return_value += 30.0
+
+        for start in (100.0, 100.0 + 12 * 3600, 100.0 + 24 * 3600):
+            self.assertEqual(1000, len([t for t in sent_at if start <= t < start + 24 * 3600]))
+
+
+class AdaptiveConcurrencyLimiterTest(unittest.TestCase):
+    def test_limit_increases_additively_on_success(self):
+        limiter = kairos_face.AdaptiveConcurrencyLimiter(initial_limit=4)
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(0.1)
+
+        self.assertAlmostEqual(5, limiter.limit, delta=0.1)
+
+    @mock.patch('kairos_face.throttling.time.monotonic')
+    def test_limit_is_cut_once_per_round_trip_when_overloaded(self, monotonic_mock):
+        monotonic_mock.return_value = 100.0
+        limiter = kairos_face.AdaptiveConcurrencyLimiter(initial_limit=16)
+        limiter.acquire()
+        limiter.release(1.0)
+
+        for _ in range(3):
+            limiter.acquire()
+            limiter.release(1.0, overloaded=True)
+        self.assertAlmostEqual(8, limiter.limit, delta=0.1)
+
+        monotonic_mock.return_value = 102.0
+        limiter.acquire()
+        limiter.release(1.0, overloaded=True)
+        self.assertAlmostEqual(4, limiter.limit, delta=0.1)
+
+    def test_rising_latency_cuts_limit(self):
+        limiter = kairos_face.AdaptiveConcurrencyLimiter(initial_limit=10, latency_tolerance=2.0)
+        limiter.acquire()
+        limiter.release(0.1)
+
+        limiter.acquire()
+        limiter.release(0.5)
+
+        self.assertLess(limiter.limit, 6)
+
+    def test_limit_never_goes_below_minimum(self):
+        limiter = kairos_face.AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1)
+
+        with mock.patch('kairos_face.throttling.time.monotonic', side_effect=range(100, 200, 10)):
+            for _ in range(5):
+                limiter.acquire()
+                limiter.release(1.0, overloaded=True)
+
+        self.assertEqual(1, limiter.limit)
+
+
+class KairosClientThrottlingTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+
+    @responses.activate
+    def test_throttled_responses_reduce_concurrency(self):
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=429, body='{}')
+        limiter = kairos_face.AdaptiveConcurrencyLimiter(initial_limit=8)
+        client = kairos_face.KairosClient(concurrency_limiter=limiter)
+
+        with self.assertRaises(kairos_face.ServiceRequestError):
+            kairos_face.recognize_face('gallery', url='an_image_url.jpg', client=client)
+
+        self.assertEqual(4, limiter.limit)
+        self.assertEqual(0, limiter.in_flight)
+
+    @responses.activate
+    def test_every_request_goes_through_rate_limiter(self):
+        responses.add(responses.POST, 'https://api.kairos.com/gallery/remove_subject', status=200, body='{}')
+        rate_limiter = mock.Mock()
+        client = kairos_face.KairosClient(rate_limiter=rate_limiter)
+
+        kairos_face.remove_face('sub_id', 'gallery', client=client)
+        kairos_face.remove_face('sub_id', 'gallery', client=client)
+
+        self.assertEqual(2, rate_limiter.acquire.call_count)
@@ -0,0 +1,154 @@
+import unittest
+from unittest import mock
+
+import kairos_face
+from kairos_face import exceptions
+from kairos_face.tracking import iou
+
+
+def _face(x, y, size=100):
+    return {'topLeftX': x, 'topLeftY': y, 'width': size, 'height': size}
+
+
+def _recognized(x, y, subject_id, confidence=0.9, size=100):
+    transaction = dict(_face(x, y, size), status='success', subject_id=subject_id, confidence=confidence)
+    return {'transaction': transaction, 'candidates': [{'subject_id': subject_id, 'confidence': confidence}]}
+
+
+class FaceTrackerTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.client = kairos_face.KairosClient()
+        self.detected = []
+        self.recognized = []
+        self.sent = []
+
+    def _send(self, endpoint, payload, stream_parser=None):
+        self.sent.append(endpoint)
+        if endpoint == 'detect':
+            return {'images': [{'faces': list(self.detected)}]}
+        return {'images': list(self.recognized)}
+
+    def _tracker(self, **kwargs):
+        return kairos_face.FaceTracker('gallery', client=self.client, **kwargs)
+
+    def test_recognizes_a_track_once_and_propagates_its_identity(self):
+        with mock.patch.object(self.client, '_send', side_effect=self._send):
+            tracker = self._tracker()
+            self.detected = [_face(100, 100)]
+            self.recognized = [_recognized(102, 98, 'alice')]
+            first = tracker.process(b'frame', timestamp=0)
+            self.recognized = []
+            later = []
+            for i in range(1, 5):
+                self.detected = [_face(100 + 5 * i, 100)]
+                later.append(tracker.process(b'frame', timestamp=i * 0.1))
+
+        self.assertEqual(1, tracker.recognize_calls)
+        self.assertEqual(5, tracker.frames_processed)
+        self.assertEqual(['detect', 'recognize', 'detect', 'detect', 'detect', 'detect'], self.sent)
+        self.assertTrue(first[0].recognized)
+        for faces in later:
+            self.assertEqual(1, len(faces))
+            self.assertEqual(first[0].track_id, faces[0].track_id)
+            self.assertEqual('alice', faces[0].subject_id)
+            self.assertEqual(0.9, faces[0].confidence)
+            self.assertFalse(faces[0].recognized)
+
+    def test_recognizes_only_the_new_track_when_a_face_appears(self):
+        with mock.patch.object(self.client, '_send', side_effect=self._send):
+            tracker = self._tracker()
+            self.detected = [_face(100, 100)]
+            self.recognized = [_recognized(100, 100, 'alice')]
+            tracker.process(b'frame', timestamp=0)
+            self.detected = [_face(100, 100), _face(500, 100)]
+            self.recognized = [_recognized(100, 100, 'carol'), _recognized(500, 100, 'bob')]
+            faces = tracker.process(b'frame', timestamp=1)
+
+        self.assertEqual(2, tracker.recognize_calls)
+        self.assertEqual(['alice', 'bob'], [face.subject_id for face in faces])
+        self.assertEqual([False, True], [face.recognized for face in faces])
+
+    def test_recognizes_again_once_the_identity_is_stale(self):
+        with mock.patch.object(self.client, '_send', side_effect=self._send):
+            tracker = self._tracker(recognition_ttl=5.0)
+            self.detected = [_face(100, 100)]
+            self.recognized = [_recognized(100, 100, 'alice', confidence=0.6)]
+            tracker.process(b'frame', timestamp=0)
+            tracker.process(b'frame', timestamp=4.9)
+            self.recognized = [_recognized(100, 100, 'alice', confidence=0.95)]
+            faces = tracker.process(b'frame', timestamp=5.0)
+
+        self.assertEqual(2, tracker.recognize_calls)
+        self.assertEqual(0.95, faces[0].confidence)
+
+    def test_retries_unrecognized_faces_after_the_retry_interval(self):
+        with mock.patch.object(self.client, '_send', side_effect=self._send):
+            tracker = self._tracker(retry_interval=1.0)
+            self.detected = [_face(100, 100)]
+            self.recognized = [{'transaction': dict(_face(100, 100), status='failure')}]
+            first = tracker.process(b'frame', timestamp=0)
+            tracker.process(b'frame', timestamp=0.5)
+            self.recognized = [_recognized(100, 100, 'alice')]
+            faces = tracker.process(b'frame', timestamp=1.0)
+
+        self.assertIsNone(first[0].subject_id)
+        self.assertEqual(2, tracker.recognize_calls)
+        self.assertEqual('alice', faces[0].subject_id)
+
+    def test_keeps_tracks_through_missed_detections(self):
+        with mock.patch.object(self.client, '_send', side_effect=self._send):
+            tracker = self._tracker(max_missed_frames=2)
+            self.detected = [_face(100, 100)]
+            self.recognized = [_recognized(100, 100, 'alice')]
+            first = tracker.process(b'frame', timestamp=0)
+            self.detected = []
+            tracker.process(b'frame', timestamp=0.1)
+            tracker.process(b'frame', timestamp=0.2)
+            self.detected = [_face(100, 100)]
+            kept = tracker.process(b'frame', timestamp=0.3)
+            self.detected = []
+            for i in range(3):
+                tracker.process(b'frame', timestamp=0.4 + i * 0.1)
+            self.detected = [_face(100, 100)]
+            restarted = tracker.process(b'frame', timestamp=1.0)
+
+        self.assertEqual(first[0].track_id, kept[0].track_id)
+        self.assertNotEqual(first[0].track_id, restarted[0].track_id)
+        self.assertEqual(2, tracker.recognize_calls)
+
+    def test_treats_frames_without_faces_as_empty(self):
+        error = exceptions.ServiceRequestError(200, {'Errors': [{'ErrCode': 5002, 'Message': 'no faces found'}]}, {})
+        with mock.patch.object(self.client, '_send', side_effect=error):
+            faces = self._tracker().process(b'frame', timestamp=0)
+
+        self.assertEqual([], faces)
+
+    def test_raises_other_errors(self):
+        error = exceptions.ServiceRequestError(200, {'Errors': [{'ErrCode': 5004, 'Message': 'gallery'}]}, {})
+        with mock.patch.object(self.client, '_send', side_effect=error):
+            with self.assertRaises(exceptions.ServiceRequestError):
+                self._tracker().process(b'frame', timestamp=0)
+
+    def test_encodes_the_frame_once_for_detect_and_recognize(self):
+        images = []
+
+        def send(endpoint, payload, stream_parser=None):
+            images.append(payload['image'])
+            return self._send(endpoint, payload, stream_parser)
+
+        with mock.patch.object(self.client, '_send', side_effect=send):
+            self.detected = [_face(100, 100)]
+            self._tracker().process(b'frame', timestamp=0)
+
+        self.assertEqual(2, len(images))
+        self.assertIs(images[0], images[1])
+
+
+class IouTest(unittest.TestCase):
+    def test_iou(self):
+        self.assertEqual(1.0, iou((0, 0, 10, 10), (0, 0, 10, 10)))
+        self.assertEqual(0.0, iou((0, 0, 10, 10), (20, 20, 10, 10)))
+        self.assertAlmostEqual(50 / 150.0, iou((0, 0, 10, 10), (5, 0, 10, 10)))
+        self.assertEqual(0.0, iou((0, 0, 0, 0), (0, 0, 0, 0)))
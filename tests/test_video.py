@@ -0,0 +1,107 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import responses
+
+import kairos_face
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Condition not met in {} seconds'.format(timeout))
+        time.sleep(0.001)
+
+
+class FrameRecognizerTest(unittest.TestCase):
+    def setUp(self):
+        kairos_face.settings.app_id = 'app_id'
+        kairos_face.settings.app_key = 'app_key'
+        self.client = kairos_face.KairosClient()
+        self.sent_frames = []
+        self.releases = {}
+
+    def _send(self, endpoint, payload, stream_parser=None):
+        frame = payload['image'].image
+        self.sent_frames.append(frame)
+        self.releases.setdefault(frame, threading.Event()).wait(5)
+        return {'images': [{'frame': frame.decode('ascii')}]}
+
+    def _release(self, frame):
+        self.releases.setdefault(frame, threading.Event()).set()
+
+    def test_sends_only_the_newest_frame_when_a_worker_frees_up(self):
+        with mock.patch.object(self.client, '_send', side_effect=self._send):
+            recognizer = kairos_face.FrameRecognizer('gallery', concurrency=1, client=self.client)
+            recognizer.submit(b'frame0', timestamp=0)
+            _wait_until(lambda: self.sent_frames == [b'frame0'])
+            for i in range(1, 10):
+                recognizer.submit('frame{}'.format(i).encode('ascii'), timestamp=i)
+            self._release(b'frame0')
+            _wait_until(lambda: len(self.sent_frames) == 2)
+            self._release(b'frame9')
+            results = recognizer.results()
+            first, last = next(results), next(results)
+            recognizer.close()
+
+        self.assertEqual([b'frame0', b'frame9'], self.sent_frames)
+        self.assertEqual((0, 9), (first.timestamp, last.timestamp))
+        self.assertEqual('frame9', last.response['images'][0]['frame'])
+        self.assertEqual(8, recognizer.frames_dropped)
+        self.assertEqual(2, recognizer.frames_sent)
+
+    def test_drops_results_of_frames_older_than_a_delivered_one(self):
+        delivered = []
+        with mock.patch.object(self.client, '_send', side_effect=self._send):
+            recognizer = kairos_face.FrameRecognizer('gallery', concurrency=2, on_result=delivered.append,
+                                                     client=self.client)
+            recognizer.submit(b'frame0', timestamp=0)
+            _wait_until(lambda: len(self.sent_frames) == 1)
+            recognizer.submit(b'frame1', timestamp=1)
+            _wait_until(lambda: len(self.sent_frames) == 2)
+            self._release(b'frame1')
+            _wait_until(lambda: len(delivered) == 1)
+            self._release(b'frame0')
+            recognizer.close()
+
+        self.assertEqual([1], [result.timestamp for result in delivered])
+        self.assertEqual(1, recognizer.results_dropped)
+
+    def test_frames_older_than_max_age_are_not_sent(self):
+        with mock.patch.object(self.client, '_send', side_effect=self._send):
+            recognizer = kairos_face.FrameRecognizer('gallery', concurrency=1, max_frame_age=0.01,
+                                                     client=self.client)
+            recognizer.submit(b'frame0')
+            _wait_until(lambda: len(self.sent_frames) == 1)
+            recognizer.submit(b'frame1')
+            time.sleep(0.05)
+            self._release(b'frame0')
+            _wait_until(lambda: recognizer.frames_dropped == 1)
+            recognizer.close()
+
+        self.assertEqual([b'frame0'], self.sent_frames)
+
+    def test_errors_are_reported_in_results(self):
+        with mock.patch.object(self.client, '_send', side_effect=kairos_face.ServiceRequestError(500, {}, {})):
+            with kairos_face.FrameRecognizer('gallery', client=self.client) as recognizer:
+                recognizer.submit(b'frame0', timestamp=0)
+                result = next(recognizer.results())
+
+        self.assertIsInstance(result.error, kairos_face.ServiceRequestError)
+        self.assertIsNone(result.response)
+
+    @responses.activate
+    def test_frames_that_cannot_be_encoded_are_reported_and_do_not_stop_the_recognizer(self):
+        responses.add(responses.POST, 'https://api.kairos.com/recognize', status=200, body='{"images": []}')
+        with kairos_face.FrameRecognizer('gallery', concurrency=1, client=self.client) as recognizer:
+            results = recognizer.results()
+            recognizer.submit(object(), timestamp=0)
+            bad = next(results)
+            recognizer.submit(b'frame1', timestamp=1)
+            good = next(results)
+
+        self.assertIsInstance(bad.error, TypeError)
+        self.assertEqual((1, {'images': []}, None), (good.timestamp, good.response, good.error))